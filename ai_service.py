@@ -1,8 +1,144 @@
 import os
+import time
+import hashlib
 import importlib
-from typing import Optional
+from collections import OrderedDict
+from typing import Callable, Iterator, Optional
 import threading
 
+from jobs import CancellationToken, JobCancelled, CANCEL_POLL_INTERVAL
+from response_cache import ResponseCache
+from token_budget import TokenCounter, PromptBudget, fit_reference, output_budget
+from reference_index import ReferenceRetriever
+
+class ClientPool:
+    """Sağlayıcı istemcilerini (sağlayıcı, model, API anahtarı özeti) anahtarıyla saklar
+
+    Model değiştirildiğinde doğru modele bağlı istemci kullanılır, ayarlar kaydedildiğinde
+    istemciler yeniden oluşturulmaz; en uzun süredir kullanılmayan istemci MAX_CLIENTS aşılınca
+    atılır. OpenAI ve Anthropic istemcileri tek bir HTTP bağlantı havuzunu (keep-alive) paylaşır.
+    """
+
+    MAX_CLIENTS = 4
+
+    def __init__(self, check_and_import):
+        self._check_and_import = check_and_import
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+        self._create_locks = {}
+        self._http_client = None
+
+    @staticmethod
+    def make_key(provider, model_name, api_key):
+        key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return provider, model_name, key_hash
+
+    def get(self, provider, model_info, api_key):
+        """İstemciyi havuzdan döndürür, yoksa oluşturur; oluşturulamazsa None döner"""
+        key = self.make_key(provider, model_info["name"], api_key)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._clients.move_to_end(key)
+            else:
+                create_lock = self._create_locks.setdefault(key, threading.Lock())
+        if client is not None:
+            if provider == "Google":
+                # Araya başka anahtarlı bir Gemini istemcisi girmiş olabilir; modül geneli anahtar yeniden ayarlanır
+                self._configure_google(api_key)
+            return client
+
+        # Ön ısıtma ile istek aynı anda gelirse istemci yalnızca bir kez oluşturulur
+        with create_lock:
+            with self._lock:
+                client = self._clients.get(key)
+            if client is None:
+                client = self._create(provider, model_info, api_key)
+                if client is None:
+                    return None
+                with self._lock:
+                    self._clients[key] = client
+                    while len(self._clients) > self.MAX_CLIENTS:
+                        evicted_key, _ = self._clients.popitem(last=False)
+                        self._create_locks.pop(evicted_key, None)
+                        print(f"API istemcisi havuzdan çıkarıldı: {evicted_key[0]} / {evicted_key[1]}")
+            elif provider == "Google":
+                self._configure_google(api_key)
+        return client
+
+    def discard(self, client):
+        """Kapatılan istemciyi havuzdan çıkarır (ör. iptal sırasında)"""
+        with self._lock:
+            for key, pooled in list(self._clients.items()):
+                if pooled is client:
+                    del self._clients[key]
+            
+            if self._http_client is not None and self._http_client.is_closed:
+                # Paylaşılan bağlantı havuzu da kapandı; ona bağlı istemciler sonraki istekte yeniden oluşturulur
+                for key in [key for key in self._clients if key[0] != "Google"]:
+                    del self._clients[key]
+                self._http_client = None
+
+    def warm(self, provider, model_info, client):
+        """İstemcinin sunucuyla bağlantısını (TLS el sıkışması dahil) önceden açar"""
+        try:
+            if provider == "Google":
+                import google.generativeai as genai
+                genai.get_model(f"models/{model_info['name']}")
+            else:
+                # Kimlik doğrulama gerektirmeyen bir istek bağlantıyı havuzda açık bırakır
+                http_client = self._shared_http_client()
+                if http_client is not None:
+                    http_client.head(str(client.base_url))
+            print(f"API bağlantısı hazır: {provider} / {model_info['name']}")
+        except Exception as e:
+            print(f"API bağlantısı önceden açılamadı ({provider}): {e}")
+
+    def _create(self, provider, model_info, api_key):
+        if provider == "Google":
+            if self._check_and_import("google.generativeai"):
+                import google.generativeai as genai
+                self._configure_google(api_key)
+                return genai.GenerativeModel(model_info['name'])
+
+        elif provider == "Anthropic":
+            if self._check_and_import("anthropic"):
+                from anthropic import Anthropic
+                http_client = self._shared_http_client()
+                if http_client is not None:
+                    return Anthropic(api_key=api_key, http_client=http_client)
+                return Anthropic(api_key=api_key)
+
+        elif provider == "OpenAI":
+            if self._check_and_import("openai"):
+                import openai
+                http_client = self._shared_http_client()
+                if http_client is not None:
+                    return openai.OpenAI(api_key=api_key, http_client=http_client)
+                return openai.OpenAI(api_key=api_key)
+        return None
+
+    @staticmethod
+    def _configure_google(api_key):
+        # Gemini anahtarı modül genelinde tutulur; farklı anahtarlı istemciler için yeniden ayarlanır
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+
+    def _shared_http_client(self):
+        """OpenAI ve Anthropic istemcilerinin paylaştığı httpx istemcisi (kapatıldıysa yeniden oluşturulur)"""
+        with self._lock:
+            if self._http_client is None or self._http_client.is_closed:
+                try:
+                    import httpx
+                except ImportError:
+                    return None
+                self._http_client = httpx.Client(
+                    timeout=httpx.Timeout(600.0, connect=10.0),
+                    limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=300.0)
+                )
+            return self._http_client
+
+
 class AIService:
     """Yapay zeka servisleri için sınıf"""
     def __init__(self, config):
@@ -13,7 +149,14 @@ class AIService:
         
         # Lazy loading için cache
         self._loaded_modules = {}
-        self._provider_clients = {}
+        self.client_pool = ClientPool(self._check_and_import)
+        
+        # Son isteğin süre ölçümleri (ilk token süresi, toplam süre, karakter sayısı)
+        self.last_metrics = {}
+        
+        # Kalıcı yanıt önbelleği ve referans metin dizinleri (ilk kullanımda oluşturulur)
+        self._response_cache = None
+        self._reference_retriever = None
 
     def _check_and_import(self, module_name: str) -> bool:
         """Gerekli modülün yüklü olup olmadığını kontrol eder ve sonucu cache'ler"""
@@ -31,7 +174,7 @@ class AIService:
             return False
 
     def initialize_client(self) -> bool:
-        """Seçili modele göre ilgili API istemcisini başlatır"""
+        """Seçili modele göre ilgili API istemcisini havuzdan alır veya oluşturur"""
         model_info = self.config.available_models.get(self.config.ai_model)
         if not model_info:
             print("Geçersiz model seçimi!")
@@ -45,56 +188,288 @@ class AIService:
             print(f"{provider} için API anahtarı bulunamadı!")
             return False
         
-        # Eğer aynı sağlayıcı için önceden oluşturulmuş bir istemci varsa, anahtarın değişip değişmediğini kontrol et
-        if provider in self._provider_clients:
-            # API anahtarı değişmişse, istemciyi yenile
-            current_client_info = getattr(self, f"_{provider.lower()}_api_key", None)
-            if current_client_info != api_key:
-                # API anahtarı değişmiş, istemciyi sıfırla
-                self._provider_clients[provider] = None
-        
-        # Eğer aynı sağlayıcı için önceden oluşturulmuş bir istemci varsa onu kullan
-        if provider in self._provider_clients and self._provider_clients[provider]:
-            self.current_client = self._provider_clients[provider]
-            return True
-        
         try:
-            if provider == "Google":
-                if self._check_and_import("google.generativeai"):
-                    import google.generativeai as genai
-                    genai.configure(api_key=api_key)
-                    client = genai.GenerativeModel(model_info['name'])
-                    self._provider_clients["Google"] = client
-                    self.current_client = client
-                    setattr(self, "_google_api_key", api_key)
-                    
-            elif provider == "Anthropic":
-                if self._check_and_import("anthropic"):
-                    from anthropic import Anthropic
-                    client = Anthropic(api_key=api_key)
-                    self._provider_clients["Anthropic"] = client
-                    self.current_client = client
-                    setattr(self, "_anthropic_api_key", api_key)
-                    
-            elif provider == "OpenAI":
-                if self._check_and_import("openai"):
-                    import openai
-                    client = openai.OpenAI(api_key=api_key)
-                    self._provider_clients["OpenAI"] = client
-                    self.current_client = client
-                    setattr(self, "_openai_api_key", api_key)
-            
+            # Anahtar veya model değiştiyse havuzda farklı bir kayda denk gelir
+            self.current_client = self.client_pool.get(provider, model_info, api_key)
             return True if self.current_client else False
             
         except Exception as e:
             print(f"API istemcisi başlatılırken hata: {e}")
             return False
+    
+    def prewarm(self):
+        """Seçili model için istemciyi oluşturur ve bağlantıyı arka planda açar
+        
+        Uygulama açılışında ve ayarlar kaydedildiğinde çağrılır; böylece ilk rapor isteği
+        istemci oluşturma ve TLS el sıkışmasını beklemez. Anahtar yoksa bir şey yapılmaz.
+        """
+        def run():
+            # Ayarlar arka planda yükleniyorsa API anahtarları okunana kadar beklenir
+            loaded = getattr(self.config, 'settings_loaded', None)
+            if loaded is not None:
+                loaded.wait(10)
+            
+            model_info = self.config.available_models.get(self.config.ai_model)
+            if not model_info or not self.config.api_keys.get(model_info["provider"]):
+                return
+            if self.initialize_client():
+                self.client_pool.warm(model_info["provider"], model_info, self.current_client)
+        
+        threading.Thread(target=run, daemon=True).start()
 
-    def generate_response(self, prompt: str) -> Optional[str]:
-        """Seçili modele göre yanıt üretir"""
-        if not self.current_client:
-            if not self.initialize_client():
-                return "API bağlantısı kurulamadı. Lütfen API anahtarını kontrol edin."
+    def _get_response_cache(self):
+        """Ayarlarda açıksa kalıcı yanıt önbelleğini döndürür"""
+        if not getattr(self.config, 'response_cache_enabled', True):
+            return None
+        if self._response_cache is None:
+            self._response_cache = ResponseCache(
+                os.path.join(self.config.cache_dir, "responses"),
+                getattr(self.config, 'response_cache_max_mb', 50) * 1024 * 1024,
+                getattr(self.config, 'response_cache_ttl_hours', 168)
+            )
+        return self._response_cache
+    
+    def generate_response(self, prompt: str, cancel_token: Optional[CancellationToken] = None,
+                          on_text: Optional[Callable[[str], None]] = None,
+                          use_cache: bool = True) -> Optional[str]:
+        """Seçili modele göre yanıt üretir
+        
+        cancel_token verilirse istek ayrı bir thread'de yapılır; iptal edildiğinde devam eden
+        HTTP isteği istemci kapatılarak kesilir ve JobCancelled fırlatılır.
+        on_text verilirse yanıt akış halinde istenir ve gelen her metin parçasıyla (isteği yapan
+        thread'den) çağrılır; dönüş değeri yine yanıtın tamamıdır.
+        
+        Aynı model ve istemle daha önce alınmış başarılı yanıt önbellekten döndürülür; aynı istek
+        zaten yapılıyorsa onun sonucu beklenir. use_cache=False önbelleği okumadan yeni yanıt
+        ister ve önbellekteki kaydı bu yanıtla değiştirir.
+        """
+        # Önceki isteğin ölçümleri bu isteğe ait sanılmasın
+        self.last_metrics = {}
+        cache = self._get_response_cache()
+        model_info = self.config.available_models.get(self.config.ai_model)
+        if cache is None or not model_info:
+            return self._request_response(prompt, cancel_token, on_text)
+        
+        # Anahtar isteğe gönderilen üretim parametrelerini içerir (bağlam boyutunu değil)
+        generation_params = self._generation_params(model_info["provider"], model_info)
+        key = cache.make_key("response", model_info["provider"], model_info["name"],
+                             sorted(generation_params.items()), prompt)
+        if not use_cache:
+            return self._request_and_store(cache, key, model_info, prompt, cancel_token, on_text)[0]
+        
+        while True:
+            cached = cache.get(key)
+            if cached:
+                print(f"Yanıt önbellekten alındı ({model_info['name']})")
+                self.last_metrics = {"model": model_info["name"], "cached": True, "ttft_s": None,
+                                     "total_s": 0.0, "chars": len(cached)}
+                if on_text:
+                    on_text(cached)
+                return cached
+            
+            leader, flight = cache.begin(key)
+            if leader:
+                shared_text = None
+                try:
+                    text, stored = self._request_and_store(cache, key, model_info, prompt, cancel_token, on_text)
+                    if stored:
+                        shared_text = text
+                    return text
+                finally:
+                    # Hata mesajı veya iptal bekleyenlere iletilmez
+                    cache.end(key, flight, shared_text)
+            
+            print("Aynı istek zaten yapılıyor, sonucu bekleniyor...")
+            wait_start = time.time()
+            text = flight.wait(cancel_token)
+            if text:
+                # Yanıt önbellekten değil, aynı anda yapılan istekten geldi
+                self.last_metrics = {"model": model_info["name"], "cached": False, "ttft_s": None,
+                                     "total_s": time.time() - wait_start, "chars": len(text)}
+                if on_text:
+                    on_text(text)
+                return text
+            # Önceki istek başarısız oldu veya iptal edildi; istek bu çağrı tarafından yeniden yapılır
+    
+    def _request_and_store(self, cache, key, model_info, prompt, cancel_token, on_text):
+        """API isteğini yapar ve yalnızca başarılı yanıtı önbelleğe yazar; (metin, önbelleğe_yazıldı) döndürür"""
+        status = {}
+        text = self._request_response(prompt, cancel_token, on_text, status)
+        # Yedek modele geçildiyse yanıt istenen modele ait değildir
+        if not text or status.get("model") != model_info["name"]:
+            return text, False
+        cache.put(key, text, provider=model_info["provider"], model=model_info["name"])
+        return text, True
+    
+    def _request_response(self, prompt: str, cancel_token: Optional[CancellationToken] = None,
+                          on_text: Optional[Callable[[str], None]] = None,
+                          status: Optional[dict] = None) -> Optional[str]:
+        """Önbelleğe bakmadan API isteği yapar; başarılıysa status["model"] yanıtı üreten model olur
+        
+        İstek tamamlandığında last_metrics, akış olsun olmasın bu isteğin ölçümleriyle doldurulur.
+        """
+        self.last_metrics = {}
+        status = status if status is not None else {}
+        start_time = time.time()
+        text = self._request_in_thread(prompt, cancel_token, on_text, status)
+        
+        # İlk token süresi yalnızca akış yanıtında ölçülür (_collect_stream); yedek modele
+        # geçildiyse seçili model yanıtı üreten modeldir
+        model_info = self.config.available_models.get(self.config.ai_model) or {}
+        self.last_metrics = {
+            "model": status.get("model") or model_info.get("name"),
+            "cached": False,
+            "ttft_s": self.last_metrics.get("ttft_s"),
+            "total_s": time.time() - start_time,
+            "chars": len(text) if text else 0
+        }
+        return text
+    
+    def _request_in_thread(self, prompt, cancel_token, on_text, status):
+        """cancel_token verilirse isteği ayrı bir thread'de yapar ve beklerken iptali kontrol eder"""
+        if cancel_token is None:
+            return self._generate_response(prompt, on_text, status)
+        
+        cancel_token.check()
+        result = {}
+        
+        def run():
+            result["text"] = self._generate_response(prompt, on_text, status, cancel_token)
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        
+        unregister = cancel_token.on_cancel(self._abort_requests)
+        try:
+            while worker.is_alive():
+                worker.join(CANCEL_POLL_INTERVAL)
+                cancel_token.check()
+        finally:
+            unregister()
+        
+        cancel_token.check()
+        return result.get("text")
+    
+    def _abort_requests(self):
+        """Devam eden API isteklerini keser
+        
+        OpenAI ve Anthropic istemcilerinin paylaşılan HTTP bağlantıları kapatılır. Gemini
+        istemcisinin (google.generativeai) kapatılacak bir bağlantısı yoktur: akış yanıtında
+        _collect_stream sonraki parçada okumayı bırakır, akışsız istek ise arka planda sonlanır
+        ve yanıtı yok sayılır. İstemci havuzdan çıkarılır ve bir sonraki istekte yeniden oluşturulur.
+        """
+        client = self.current_client
+        self.current_client = None
+        if client is None:
+            return
+        
+        close = getattr(client, "close", None)
+        if callable(close):
+            try:
+                close()
+            except Exception as e:
+                print(f"API istemcisi kapatılırken hata: {e}")
+        self.client_pool.discard(client)
+        print("Devam eden API isteği iptal edildi")
+    
+    @staticmethod
+    def _generation_params(provider: str, model_info: dict) -> dict:
+        """Sağlayıcıya istekle birlikte gönderilen üretim parametreleri"""
+        if provider == "Anthropic":
+            return {"max_tokens": output_budget(model_info)}
+        return {}
+    
+    def _stream_chunks(self, provider: str, model_info: dict, prompt: str) -> Iterator[str]:
+        """Sağlayıcının akış API'sinden gelen metin parçalarını üretir"""
+        if provider == "Google":
+            for chunk in self.current_client.generate_content(prompt, stream=True):
+                # Güvenlik filtresi gibi nedenlerle metin içermeyen parçalar atlanır
+                if chunk.candidates and chunk.candidates[0].content.parts:
+                    yield chunk.text
+        
+        elif provider == "Anthropic":
+            with self.current_client.messages.stream(
+                model=model_info["name"].lower(),
+                messages=[{"role": "user", "content": prompt}],
+                **self._generation_params(provider, model_info)
+            ) as stream:
+                yield from stream.text_stream
+        
+        elif provider == "OpenAI":
+            stream = self.current_client.chat.completions.create(
+                model=model_info["name"],
+                messages=[{"role": "user", "content": prompt}],
+                stream=True
+            )
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                # Akış erken bırakılırsa (iptal) HTTP yanıtı kapatılır
+                stream.close()
+    
+    def _collect_stream(self, provider: str, model_info: dict, prompt: str,
+                        on_text: Callable[[str], None],
+                        cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Akış yanıtını on_text ile iletir, tamamını döndürür ve ilk token süresini ölçer
+        
+        İptal her parçada kontrol edilir; iptal edilirse akış kapatılır, sonraki parçalar
+        iletilmez ve None döndürülür.
+        """
+        start_time = time.time()
+        first_token_time = None
+        parts = []
+        
+        chunks = self._stream_chunks(provider, model_info, prompt)
+        try:
+            for text in chunks:
+                if cancel_token is not None and cancel_token.cancelled:
+                    print(f"Akış yanıtı iptal edildi ({model_info['name']})")
+                    return None
+                if not text:
+                    continue
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                    print(f"İlk token süresi: {first_token_time:.2f} saniye ({model_info['name']})")
+                parts.append(text)
+                try:
+                    on_text(text)
+                except Exception as e:
+                    print(f"Akış metni iletilirken hata: {e}")
+        finally:
+            chunks.close()
+        
+        response = "".join(parts)
+        self.last_metrics = {
+            "model": model_info["name"],
+            "cached": False,
+            "ttft_s": first_token_time,
+            "total_s": time.time() - start_time,
+            "chars": len(response)
+        }
+        print(f"Yanıt süresi: {self.last_metrics['total_s']:.2f} saniye, {len(response)} karakter")
+        return response
+    
+    @staticmethod
+    def _succeeded(text, model_info, status):
+        """Başarılı yanıtı işaretler ve aynen döndürür"""
+        if status is not None and text:
+            status["model"] = model_info["name"]
+        return text
+    
+    def _generate_response(self, prompt: str, on_text: Optional[Callable[[str], None]] = None,
+                           status: Optional[dict] = None,
+                           cancel_token: Optional[CancellationToken] = None) -> Optional[str]:
+        """Seçili modele göre yanıt üretir (çağıran thread'de)
+        
+        Hata durumunda kullanıcıya gösterilecek mesaj döndürülür; status verilirse yalnızca
+        başarılı yanıtta status["model"] ayarlanır. cancel_token yalnızca akış yanıtında
+        parçalar arasında kontrol edilir; iptal asıl olarak _request_response tarafından yapılır.
+        """
+        # Seçili model ve anahtara ait istemci her istekte havuzdan alınır
+        if not self.initialize_client():
+            return "API bağlantısı kurulamadı. Lütfen API anahtarını kontrol edin."
 
         try:
             model_info = self.config.available_models.get(self.config.ai_model)
@@ -104,8 +479,11 @@ class AIService:
                 # Hata ayıklama bilgisi
                 print(f"Google API kullanılıyor, model: {model_info['name']}")
                 try:
+                    if on_text:
+                        text = self._collect_stream(provider, model_info, prompt, on_text, cancel_token)
+                        return self._succeeded(text, model_info, status)
                     response = self.current_client.generate_content(prompt)
-                    return response.text
+                    return self._succeeded(response.text, model_info, status)
                 except Exception as e:
                     error_msg = str(e)
                     print(f"Google API hatası: {error_msg}")
@@ -122,17 +500,20 @@ class AIService:
                     if hasattr(self, 'fallback_to_anthropic') and self.fallback_to_anthropic:
                         print("Claude API'ye geçiş yapılıyor...")
                         self.config.ai_model = "Claude 3 Sonnet"
-                        return self.generate_response(prompt)
+                        return self._generate_response(prompt, on_text, status, cancel_token)
                     return "API hatası: " + error_msg
                 
             elif provider == "Anthropic":
                 try:
+                    if on_text:
+                        text = self._collect_stream(provider, model_info, prompt, on_text, cancel_token)
+                        return self._succeeded(text, model_info, status)
                     response = self.current_client.messages.create(
                         model=model_info["name"].lower(),
-                        max_tokens=model_info["max_tokens"],
-                        messages=[{"role": "user", "content": prompt}]
+                        messages=[{"role": "user", "content": prompt}],
+                        **self._generation_params(provider, model_info)
                     )
-                    return response.content[0].text
+                    return self._succeeded(response.content[0].text, model_info, status)
                 except Exception as e:
                     error_msg = str(e)
                     print(f"Anthropic API hatası: {error_msg}")
@@ -145,11 +526,14 @@ class AIService:
                 
             elif provider == "OpenAI":
                 try:
+                    if on_text:
+                        text = self._collect_stream(provider, model_info, prompt, on_text, cancel_token)
+                        return self._succeeded(text, model_info, status)
                     response = self.current_client.chat.completions.create(
                         model=model_info["name"],
                         messages=[{"role": "user", "content": prompt}]
                     )
-                    return response.choices[0].message.content
+                    return self._succeeded(response.choices[0].message.content, model_info, status)
                 except Exception as e:
                     error_msg = str(e)
                     print(f"OpenAI API hatası: {error_msg}")
@@ -167,23 +551,12 @@ class AIService:
             print(f"Yanıt üretilirken hata: {error_msg}")
             return "Beklenmeyen bir hata oluştu: " + error_msg
             
-    def generate_report(self, deney_basligi: str, deneyin_yapilisi: str, referans_metin: str = "") -> Optional[str]:
-        """
-        Deney raporu oluşturur
-        
-        Args:
-            deney_basligi: Deneyin başlığı
-            deneyin_yapilisi: Deneyin yapılış adımları
-            referans_metin: Referans metin (opsiyonel)
-            
-        Returns:
-            Oluşturulan rapor metni veya hata durumunda None
-        """
-        try:
-            prompt = ""
-            if not referans_metin:
-                # Referans metin/döküman girilmemişse
-                prompt = f""""{deney_basligi}" adlı deney için bilimsel bir rapor yaz. 
+    def _build_report_prompt(self, deney_basligi: str, deneyin_yapilisi: str, referans_metin: str = "") -> str:
+        """Rapor istemini oluşturur"""
+        prompt = ""
+        if not referans_metin:
+            # Referans metin/döküman girilmemişse
+            prompt = f""""{deney_basligi}" adlı deney için bilimsel bir rapor yaz. 
 
 Aşağıdaki bilgilere dayanarak tüm bölümleri doğrudan ve nesnel biçimde hazırla:
 
@@ -206,9 +579,9 @@ Kaynakça
 4. Tüm metinler 12 punto boyutunda ve siyah renkte olmalıdır, başlıklar kalın olacaktır.
 5. Başlıklar mutlaka kendi satırlarında olmalıdır, başlık ile içerik arasında boş satır bırak.
 6. Alt başlıklar (Amaçlar, Teorik Bilgiler vb.) mutlaka KALIN ve SOLA HİZALI olmalıdır."""
-            else:
-                # Referans metin/döküman girilmişse
-                prompt = f""""{deney_basligi}" adlı deney için bilimsel bir rapor yaz.
+        else:
+            # Referans metin/döküman girilmişse
+            prompt = f""""{deney_basligi}" adlı deney için bilimsel bir rapor yaz.
 
 Aşağıdaki bilgilere dayanarak tüm bölümleri doğrudan ve nesnel biçimde hazırla:
 
@@ -234,10 +607,112 @@ Kaynakça
 4. Tüm metinler 12 punto boyutunda ve siyah renkte olmalıdır, başlıklar kalın olacaktır.
 5. Başlıklar mutlaka kendi satırlarında olmalıdır, başlık ile içerik arasında boş satır bırak.
 6. Alt başlıklar (Amaçlar, Teorik Bilgiler vb.) mutlaka KALIN ve SOLA HİZALI olmalıdır."""
+        return prompt
+    
+    def _get_reference_retriever(self):
+        if self._reference_retriever is None:
+            self._reference_retriever = ReferenceRetriever(os.path.join(self.config.cache_dir, "reference_index"))
+        return self._reference_retriever
+    
+    def _uses_retrieval(self, referans_metin: str) -> bool:
+        """Referans metin yalnızca ilgili bölümleri gönderilecek kadar uzunsa True"""
+        return (getattr(self.config, 'reference_retrieval_enabled', True) and
+                len(referans_metin) >= getattr(self.config, 'reference_retrieval_min_chars', 12000))
+    
+    def prepare_reference(self, referans_metin: str):
+        """Uzun referans metnin dizinini arka planda oluşturur (referans dosyası yüklendiğinde)"""
+        if not referans_metin or not self._uses_retrieval(referans_metin):
+            return
+        
+        def run():
+            try:
+                self._get_reference_retriever().get_index(referans_metin)
+            except Exception as e:
+                print(f"Referans dizini oluşturulurken hata: {e}")
+        
+        threading.Thread(target=run, daemon=True).start()
+    
+    def _select_reference(self, deney_basligi: str, deneyin_yapilisi: str, referans_metin: str) -> str:
+        """Uzun referans metinden deneyin başlığı ve yapılışıyla en ilgili bölümleri seçer"""
+        if not referans_metin or not self._uses_retrieval(referans_metin):
+            return referans_metin
+        try:
+            top_k = getattr(self.config, 'reference_top_k', 8)
+            selected = self._get_reference_retriever().retrieve(
+                referans_metin, f"{deney_basligi}\n{deneyin_yapilisi}", top_k
+            )
+            print(f"Referans metinden ilgili {top_k} bölüm seçildi: {len(referans_metin)} → {len(selected)} karakter")
+            return selected
+        except Exception as e:
+            print(f"Referans metinden bölüm seçilemedi, metnin tamamı kullanılacak: {e}")
+            return referans_metin
+    
+    def _fit_report_prompt(self, deney_basligi: str, deneyin_yapilisi: str, referans_metin: str = ""):
+        """Rapor istemini modelin bağlamına sığacak şekilde oluşturur; (istem, PromptBudget) döndürür
+        
+        Uzun referans metinlerden önce yalnızca deneyle ilgili bölümler seçilir; ardından yanıt için
+        output_tokens kadar yer ayrılır ve referans metin kalan bütçeye göre kırpılır.
+        Deneyin yapılışı kırpılmaz; tek başına sığmıyorsa uyarı verilir ve istek yine gönderilir.
+        """
+        model_info = self.config.available_models.get(self.config.ai_model)
+        if not model_info:
+            referans_metin = self._select_reference(deney_basligi, deneyin_yapilisi, referans_metin)
+            return self._build_report_prompt(deney_basligi, deneyin_yapilisi, referans_metin), None
+        
+        counter = TokenCounter(model_info["provider"], model_info["name"])
+        context_tokens = model_info.get("max_tokens", 4096)
+        output_tokens = output_budget(model_info)
+        
+        reference_tokens = counter.count(referans_metin)
+        fitted_reference = self._select_reference(deney_basligi, deneyin_yapilisi, referans_metin)
+        if fitted_reference:
+            # Referanslı şablonun referans dışındaki kısmı
+            fixed_tokens = counter.count(self._build_report_prompt(deney_basligi, deneyin_yapilisi, " "))
+            available = context_tokens - output_tokens - fixed_tokens
+            if available <= 0:
+                print("Uyarı: deneyin yapılışı modelin bağlamını dolduruyor, referans metin gönderilmeyecek")
+            fitted_reference = fit_reference(fitted_reference, max(available, 0), counter)
+        
+        prompt = self._build_report_prompt(deney_basligi, deneyin_yapilisi, fitted_reference)
+        budget = PromptBudget(
+            model_info, counter.count(prompt), output_tokens, context_tokens, counter.exact,
+            counter.count(fitted_reference), reference_tokens
+        )
+        if budget.input_tokens + output_tokens > context_tokens:
+            print(f"Uyarı: istem modelin bağlamını aşıyor ({budget.input_tokens} + {output_tokens} > {context_tokens} token)")
+        print(f"İstem bütçesi ({model_info['name']}): {budget.describe()}")
+        return prompt, budget
+    
+    def generate_report(self, deney_basligi: str, deneyin_yapilisi: str, referans_metin: str = "",
+                        cancel_token: Optional[CancellationToken] = None,
+                        on_text: Optional[Callable[[str], None]] = None,
+                        use_cache: bool = True,
+                        on_budget: Optional[Callable[[PromptBudget], None]] = None) -> Optional[str]:
+        """
+        Deney raporu oluşturur
+        
+        Args:
+            deney_basligi: Deneyin başlığı
+            deneyin_yapilisi: Deneyin yapılış adımları
+            referans_metin: Referans metin (opsiyonel)
+            cancel_token: İptal belirteci (opsiyonel); iptalde JobCancelled fırlatılır
+            on_text: Verilirse rapor akış halinde istenir ve gelen her metin parçasıyla çağrılır
+            use_cache: False ise önbellekteki yanıt kullanılmaz, yeni bir rapor istenir
+            on_budget: Verilirse istek gönderilmeden önce tahmini token ve maliyet özetiyle çağrılır
+            
+        Returns:
+            Oluşturulan rapor metni veya hata durumunda None
+        """
+        try:
+            prompt, budget = self._fit_report_prompt(deney_basligi, deneyin_yapilisi, referans_metin)
+            if budget and on_budget:
+                on_budget(budget)
             
             # Yanıt oluştur
-            return self.generate_response(prompt)
+            return self.generate_response(prompt, cancel_token, on_text, use_cache)
             
+        except JobCancelled:
+            raise
         except Exception as e:
             print(f"Rapor oluşturulurken hata: {e}")
             return None
@@ -0,0 +1,571 @@
+"""
+Ses Tanıma Motorları - ortak arayüz ve motor uygulamaları
+"""
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import requests
+import speech_recognition as sr
+from requests.adapters import HTTPAdapter
+from speech_recognition.recognizers import google as google_recognizer
+
+from audio_dsp import noise_floor_db
+from jobs import JobCancelled
+from model_manager import WhisperModelManager, load_whisper_model
+
+# Whisper modülünü isteğe bağlı olarak içe aktarma
+try:
+    import whisper
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
+    print("Whisper modülü bulunamadı. Ses tanıma için alternatif yöntemler kullanılacak.")
+
+# CTranslate2 tabanlı int8 Whisper motoru (isteğe bağlı)
+try:
+    import faster_whisper
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+# Ses tanıma motorlarının beklediği örnekleme hızı
+TARGET_SAMPLE_RATE = 16000
+
+# Whisper çözümleme ayarları - CPU'da hız ve bellek dengesi için
+WHISPER_TRANSCRIBE_OPTIONS = {
+    "fp16": False,      # CPU'da daha stabil çalışır
+    "temperature": 0,   # Deterministik çıktı
+    "best_of": 1,       # Daha hızlı çalışır
+    "beam_size": 1      # Daha az bellek kullanımı
+}
+
+# Google Speech servisinin varsayılan adresi (SpeechRecognition kütüphanesinin kullandığı adres)
+GOOGLE_SPEECH_URL = "http://www.google.com/speech-api/v2/recognize"
+GOOGLE_SPEECH_MAX_REQUESTS = 8  # Aynı anda açık tutulacak en fazla istek/bağlantı
+GOOGLE_SPEECH_SILENCE_MARGIN_DB = 3.0  # Gürültü tabanına bu kadar yakın parçalar gönderilmez
+
+# Süreç havuzundaki her işçinin kendi Whisper modeli (işçi başlatılırken yüklenir)
+_worker_whisper_model = None
+_worker_language = None
+
+
+def _available_memory_bytes():
+    """Sistemde kullanılabilir fiziksel belleği bayt olarak döndürür, bilinemiyorsa None"""
+    try:
+        import psutil
+        return psutil.virtual_memory().available
+    except ImportError:
+        pass
+
+    # Linux / macOS
+    try:
+        return os.sysconf('SC_AVPHYS_PAGES') * os.sysconf('SC_PAGE_SIZE')
+    except (ValueError, OSError, AttributeError):
+        pass
+
+    # Windows
+    try:
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys
+    except Exception:
+        pass
+
+    return None
+
+
+def _process_share(config):
+    """Aynı makinede aynı anda model çalıştıran süreç sayısı (ör. komut satırı işçileri)
+
+    Bellek ve çekirdekler bu sayıya bölünür; uygulamada 1'dir.
+    """
+    return max(1, getattr(config, 'concurrent_processes', 1) or 1)
+
+
+def _cancel_hooks(model, cancel_token):
+    """Whisper modelinin kodlayıcı ve çözücüsüne iptal kontrolü ekler, kaldırma tutamaçlarını döndürür
+
+    Model aynı anda çalışan işler arasında paylaşıldığından kontrol yalnızca kancayı ekleyen
+    thread'deki çağrılarda yapılır. İptalde çözümleme bir sonraki katman çağrısında JobCancelled ile kesilir.
+    """
+    if cancel_token is None:
+        return []
+    thread_id = threading.get_ident()
+
+    def check(module, inputs):
+        if threading.get_ident() == thread_id:
+            cancel_token.check()
+
+    return [model.encoder.register_forward_pre_hook(check), model.decoder.register_forward_pre_hook(check)]
+
+
+def _whisper_worker_init(model_size, download_root, language, torch_threads):
+    """Süreç havuzu işçisini başlatır ve Whisper modelini bir kez yükler"""
+    global _worker_whisper_model, _worker_language
+    _worker_language = language
+
+    # Çekirdekleri işçiler arasında paylaştır, aşırı thread oluşumunu önle
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception:
+        pass
+
+    try:
+        _worker_whisper_model = load_whisper_model(model_size, download_root)
+    except Exception as e:
+        print(f"İşçi sürecinde Whisper modeli yüklenirken hata: {e}")
+        _worker_whisper_model = None
+
+
+def _whisper_worker_transcribe(segment):
+    """Süreç havuzunda tek bir parçayı Whisper ile tanır, başarısızlıkta None döndürür"""
+    if _worker_whisper_model is None:
+        return None
+    try:
+        result = _worker_whisper_model.transcribe(segment, language=_worker_language, **WHISPER_TRANSCRIBE_OPTIONS)
+        return result["text"]
+    except Exception as e:
+        print(f"İşçi sürecinde Whisper ile ses tanıma hatası: {e}")
+        return None
+
+
+class ASRBackend:
+    """Ses tanıma motoru arayüzü
+
+    Alt sınıflar transcribe() metodunu uygular ve yeteneklerini sınıf özellikleriyle bildirir.
+    Parçalar dosya yolu veya 16 kHz float32 NumPy dizisi olarak verilir; tanıma
+    başarısız olursa None döndürülür (AudioProcessor bu durumda sıradaki motoru dener).
+    """
+    name = None
+    supports_batching = False         # transcribe_batch() parçaları tek çağrıda birlikte çözer
+    supports_streaming = False        # Ses tamamlanmadan artımlı sonuç üretebilir
+    supports_word_timestamps = False  # Kelime düzeyinde zaman damgası üretebilir
+    parallelism = "thread"            # Paralel işlemede "thread" veya "process" havuzu kullanılır
+
+    def __init__(self, config):
+        self.config = config
+
+    def is_available(self):
+        """Motorun bağımlılıkları kurulu mu"""
+        return True
+
+    @property
+    def model_id(self):
+        """Sonucu etkileyen model bilgisi (önbellek anahtarında kullanılır)"""
+        return "-"
+
+    def language(self):
+        """Whisper tabanlı motorlar için kısa dil kodu"""
+        return self.config.get_language_code().split('-')[0]  # tr-TR -> tr
+
+    def preload(self):
+        """Modeli arka planda yüklemeye başlar (model kullanmayan motorlarda bir şey yapmaz)"""
+        pass
+
+    def calibrate(self, samples, sample_rate):
+        """Dosyanın tamamından motor için gereken ölçümleri yapar ve döndürür (dosya başına bir kez)
+
+        Motor nesnesi aynı anda çalışan işler arasında paylaşıldığından ölçüm nesnede saklanmaz;
+        dönen değer o işin parçaları için transcribe()'a calibration olarak verilir.
+        """
+        return None
+
+    def transcribe(self, segment, calibration=None):
+        raise NotImplementedError
+
+    def batch_size(self):
+        """Toplu çözümlemede bir grupta işlenecek parça sayısı"""
+        return 1
+
+    def transcribe_batch(self, segments, calibration=None, cancel_token=None):
+        """Parçaları toplu olarak tanır; başarısız parçalar için None içeren liste döndürür
+
+        cancel_token iptal edilirse çözümleme yarıda bırakılır ve JobCancelled fırlatılır.
+        """
+        texts = []
+        for segment in segments:
+            if cancel_token is not None:
+                cancel_token.check()
+            texts.append(self.transcribe(segment, calibration))
+        return texts
+
+    def process_pool_spec(self, torch_threads):
+        """Süreç havuzu için (initializer, initargs, işçi fonksiyonu) üçlüsü"""
+        raise NotImplementedError
+
+
+class WhisperBackend(ASRBackend):
+    """openai-whisper (PyTorch) motoru"""
+    name = "Whisper"
+    supports_batching = True
+    supports_word_timestamps = True
+    parallelism = "process"  # PyTorch çözümlemesi GIL'i tuttuğundan süreç havuzu kullanılır
+
+    def __init__(self, config):
+        super().__init__(config)
+        # Boyut ayarlardan okunur, boşta kalınca bellekten çıkarılır
+        self.model_manager = WhisperModelManager(config)
+
+    def is_available(self):
+        return WHISPER_AVAILABLE
+
+    @property
+    def model_id(self):
+        return self.model_manager.model_size
+
+    def preload(self):
+        if WHISPER_AVAILABLE:
+            self.model_manager.preload()
+
+    def transcribe(self, segment, calibration=None):
+        """Whisper modelini kullanarak ses parçasını metne dönüştürür
+
+        segment: dosya yolu veya 16 kHz float32 NumPy dizisi (Whisper her ikisini de kabul eder)
+        """
+        try:
+            model = self.model_manager.get()
+
+            # Daha iyi performans için CPU sabit özellikleri belirle
+            # fp16 kullanmama ve optimize edilmiş düşük kaynak kullanımı
+            result = model.transcribe(
+                segment,
+                language=self.language(),
+                **WHISPER_TRANSCRIBE_OPTIONS
+            )
+
+            return result["text"]
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            print(f"Whisper ile ses tanıma hatası: {e}")
+            return None
+
+    def batch_size(self):
+        """Kullanılabilir belleğe göre Whisper toplu çözümleme boyutunu belirler"""
+        configured = getattr(self.config, 'whisper_batch_size', 0)
+        if configured:
+            return configured
+
+        # Parça başına yaklaşık bellek: kodlayıcı dikkat matrisi (ctx x ctx x head),
+        # katman aktivasyonları, çözücünün çapraz dikkat önbelleği ve log-mel girdisi (float32)
+        dims = self.model_manager.get().dims
+        ctx = dims.n_audio_ctx
+        per_item = 4 * (
+            ctx * ctx * dims.n_audio_head
+            + 8 * ctx * dims.n_audio_state
+            + 2 * dims.n_text_layer * ctx * dims.n_text_state
+            + dims.n_mels * 2 * ctx
+        )
+
+        available = _available_memory_bytes()
+        if not available:
+            return 4
+
+        # Belleğin yarısını toplu çözümlemeye ayır (aynı anda çalışan süreçlerle paylaşılır), makul sınırlar içinde tut
+        return max(1, min(32, int(available * 0.5 / _process_share(self.config) // per_item)))
+
+    def transcribe_batch(self, segments, calibration=None, cancel_token=None):
+        """Bir grup parçanın log-mel özniteliklerini tek tensörde birleştirip birlikte çözümler
+
+        30 saniyeden uzun parçalar Whisper penceresine sığmadığından tek tek tanınır.
+        Hata durumunda başarısız parçalar için None döndürülür. cancel_token iptal edilirse
+        çözümleme modelin bir sonraki katman çağrısında kesilir ve JobCancelled fırlatılır;
+        böylece iptal edilen grup çekirdekleri meşgul etmeye devam etmez.
+        """
+        import torch
+
+        texts = [None] * len(segments)
+        mels = []
+        batch_indices = []
+        hooks = []
+
+        try:
+            model = self.model_manager.get()
+            hooks = _cancel_hooks(model, cancel_token)
+
+            for index, segment in enumerate(segments):
+                audio = whisper.load_audio(segment) if isinstance(segment, str) else segment
+                if len(audio) > whisper.audio.N_SAMPLES:
+                    texts[index] = self.transcribe(segment)
+                    continue
+
+                mel = whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+                mels.append(mel)
+                batch_indices.append(index)
+
+            if not mels:
+                return texts
+
+            mel_batch = torch.stack(mels).to(model.device)
+            options = whisper.DecodingOptions(
+                language=self.language(),
+                fp16=WHISPER_TRANSCRIBE_OPTIONS["fp16"],
+                temperature=WHISPER_TRANSCRIBE_OPTIONS["temperature"],  # Açgözlü çözümleme (beam_size=1 ile eşdeğer)
+                without_timestamps=True
+            )
+            results = whisper.decode(model, mel_batch, options)
+
+            for index, result in zip(batch_indices, results):
+                # transcribe() ile aynı şekilde konuşma içermeyen pencereleri boş metin say
+                if result.no_speech_prob > 0.6 and result.avg_logprob < -1.0:
+                    texts[index] = ""
+                else:
+                    texts[index] = result.text
+
+            return texts
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            print(f"Whisper toplu çözümleme hatası, parçalar tek tek işleniyor: {e}")
+            for index in batch_indices:
+                if texts[index] is None:
+                    texts[index] = self.transcribe(segments[index])
+            return texts
+        finally:
+            for hook in hooks:
+                hook.remove()
+
+    def process_pool_spec(self, torch_threads):
+        # Her süreç kendi modelini yükler
+        initargs = (self.model_manager.model_size, self.model_manager.download_root, self.language(), torch_threads)
+        return _whisper_worker_init, initargs, _whisper_worker_transcribe
+
+
+class FasterWhisperBackend(ASRBackend):
+    """CTranslate2 (faster-whisper) motoru - int8 nicemlenmiş ağırlıklarla CPU'da çalışır
+
+    Aynı Whisper modellerini kullanır; CPU'da openai-whisper'a göre birkaç kat hızlı ve
+    daha az bellek kullanır. CTranslate2 çözümleme sırasında GIL'i bıraktığından paralel
+    parçalar thread havuzunda tek bir model üzerinden işlenir.
+    """
+    name = "Faster Whisper"
+    supports_word_timestamps = True
+    parallelism = "thread"
+
+    def __init__(self, config):
+        super().__init__(config)
+        self.model_manager = WhisperModelManager(config, loader=self._load_model, subdir="faster-whisper")
+
+    def is_available(self):
+        return FASTER_WHISPER_AVAILABLE
+
+    @property
+    def model_id(self):
+        return f"{self.model_manager.model_size}-{self._compute_type()}"
+
+    def preload(self):
+        if FASTER_WHISPER_AVAILABLE:
+            self.model_manager.preload()
+
+    def _compute_type(self):
+        return getattr(self.config, 'faster_whisper_compute_type', 'int8')
+
+    def _load_model(self, model_size, download_root):
+        # Eşzamanlı transcribe() çağrıları için işçi sayısı kadar çözümleyici ayrılır
+        workers = getattr(self.config, 'transcription_workers', 1)
+        if not workers or workers < 1:
+            workers = os.cpu_count() or 1
+
+        return faster_whisper.WhisperModel(
+            model_size,
+            device="cpu",
+            compute_type=self._compute_type(),
+            download_root=download_root,
+            cpu_threads=max(1, (os.cpu_count() or 1) // (workers * _process_share(self.config))),
+            num_workers=workers
+        )
+
+    def transcribe(self, segment, calibration=None):
+        """Ses parçasını CTranslate2 modeliyle metne dönüştürür
+
+        segment: dosya yolu veya 16 kHz float32 NumPy dizisi
+        """
+        try:
+            model = self.model_manager.get()
+
+            segments, _ = model.transcribe(
+                segment,
+                language=self.language(),
+                temperature=WHISPER_TRANSCRIBE_OPTIONS["temperature"],
+                best_of=WHISPER_TRANSCRIBE_OPTIONS["best_of"],
+                beam_size=WHISPER_TRANSCRIBE_OPTIONS["beam_size"],
+                without_timestamps=True
+            )
+            # Sonuçlar tembel üretilir; çözümleme metin birleştirilirken yapılır
+            return "".join(part.text for part in segments)
+
+        except Exception as e:
+            print(f"Faster Whisper ile ses tanıma hatası: {e}")
+            return None
+
+
+class GoogleBackend(ASRBackend):
+    """Google Speech Recognition (SpeechRecognition kütüphanesinin kullandığı ağ servisi)
+
+    Dil kodu varyantları aynı anda denenir ve ilk başarılı sonuç döndürülür. İstekler tek bir
+    requests.Session üzerinden gönderilir, böylece parçalar arasında bağlantı yeniden kullanılır.
+    İstek adresi SpeechRecognition kütüphanesinin istek oluşturucusuyla hazırlanır: ayarlarda API
+    anahtarı (Config.google_speech_api_key) yoksa kütüphanenin varsayılan anahtarı kullanılır.
+    Config.google_speech_url farklı bir servis adresi (ör. yerel bir test sunucusu) belirtebilir.
+    """
+    name = "Google Speech"
+    parallelism = "thread"  # Ağ beklemesi ağırlıklı olduğundan thread havuzu yeterli
+
+    def __init__(self, config):
+        super().__init__(config)
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def calibrate(self, samples, sample_rate):
+        """Gürültü tabanını (dBFS) ölçüp döndürür; parça başına ölçüm yapılmaz ve konuşma kırpılmaz"""
+        floor_db = noise_floor_db(samples, sample_rate)
+        print(f"Google Speech için gürültü tabanı: {floor_db:.1f} dBFS")
+        return floor_db
+
+    def _get_session(self):
+        """Parçalar ve dil varyantları arasında paylaşılan HTTP oturumunu döndürür"""
+        with self._lock:
+            if self._session is None:
+                self._session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=GOOGLE_SPEECH_MAX_REQUESTS)
+                self._session.mount("http://", adapter)
+                self._session.mount("https://", adapter)
+                self._executor = ThreadPoolExecutor(max_workers=GOOGLE_SPEECH_MAX_REQUESTS)
+            return self._session
+
+    def _language_codes(self):
+        """Denenecek dil kodlarını tekrarsız olarak döndürür"""
+        main_lang_code = self.config.get_language_code()
+        lang_codes = [main_lang_code]
+
+        # Türkçe için alternatif dil kodları
+        if main_lang_code.startswith("tr"):
+            lang_codes.extend(["tr", "tr-TR"])
+        # İngilizce için alternatif dil kodları
+        elif main_lang_code.startswith("en"):
+            lang_codes.extend(["en", "en-US", "en-GB"])
+
+        return list(dict.fromkeys(lang_codes))
+
+    def _audio_data(self, segment):
+        """Parçayı SpeechRecognition AudioData nesnesine çevirir (diziler için WAV dosyası oluşturmadan)"""
+        if isinstance(segment, np.ndarray):
+            pcm = (np.clip(segment, -1.0, 1.0) * 32767).astype(np.int16)
+            return sr.AudioData(pcm.tobytes(), TARGET_SAMPLE_RATE, 2)
+
+        with sr.AudioFile(segment) as source:
+            return sr.Recognizer().record(source)
+
+    def _is_below_noise_floor(self, audio_data, floor_db):
+        """Parçanın ortalama enerjisi ölçülen gürültü tabanına yakınsa True döndürür"""
+        if floor_db is None or audio_data.sample_width != 2:
+            return False
+
+        samples = np.frombuffer(audio_data.frame_data, dtype=np.int16).astype(np.float32) / 32768.0
+        if len(samples) == 0:
+            return True
+        level_db = 10 * np.log10(float(np.mean(samples * samples)) + 1e-10)
+        return level_db < floor_db + GOOGLE_SPEECH_SILENCE_MARGIN_DB
+
+    def _recognize(self, flac_data, sample_rate, lang_code):
+        """Tek bir dil koduyla ayarlardaki servise tanıma isteği gönderir; ses tanınamazsa None döndürür"""
+        builder = google_recognizer.create_request_builder(
+            key=getattr(self.config, 'google_speech_api_key', '') or None,
+            language=lang_code
+        )
+        builder.endpoint = getattr(self.config, 'google_speech_url', '') or GOOGLE_SPEECH_URL
+        response = self._get_session().post(
+            builder.build_url(),
+            data=flac_data,
+            headers={"Content-Type": f"audio/x-flac; rate={sample_rate}"},
+            timeout=60
+        )
+        response.raise_for_status()
+
+        # Yanıt her satırda bir JSON nesnesidir; ilk satır genellikle boş sonuç içerir
+        for line in response.text.split("\n"):
+            if not line.strip():
+                continue
+            for result in json.loads(line).get("result", []):
+                alternatives = result.get("alternative", [])
+                if alternatives and alternatives[0].get("transcript"):
+                    return alternatives[0]["transcript"]
+        return None
+
+    def transcribe(self, segment, calibration=None):
+        """Google Speech API ile ses tanıma
+
+        segment: dosya yolu veya 16 kHz float32 NumPy dizisi
+        calibration: calibrate() ile bu iş için ölçülen gürültü tabanı (dBFS)
+        """
+        try:
+            audio_data = self._audio_data(segment)
+
+            if self._is_below_noise_floor(audio_data, calibration):
+                # Boş metin başarılı sonuç sayılıp önbelleğe yazılacağından None döndürülür
+                print("Parça gürültü tabanının altında, Google Speech'e gönderilmedi")
+                return None
+
+            self._get_session()
+            flac_data = audio_data.get_flac_data(convert_width=2)
+
+            # Tüm dil kodu varyantları aynı anda denenir, ilk başarılı sonuç kullanılır
+            futures = {
+                self._executor.submit(self._recognize, flac_data, audio_data.sample_rate, lang_code): lang_code
+                for lang_code in self._language_codes()
+            }
+            for future in as_completed(futures):
+                lang_code = futures[future]
+                try:
+                    text = future.result()
+                except Exception as e:
+                    print(f"Google Speech Recognition servis hatası ({lang_code}): {e}")
+                    continue
+
+                if text:
+                    print(f"Tanıma başarılı (dil: {lang_code}): {text}")
+                    # Henüz başlamamış istekleri iptal et
+                    for other in futures:
+                        other.cancel()
+                    return text
+                print(f"{lang_code} ile ses tanınamadı")
+
+            # Tüm dil kodları denendi ama sonuç alınamadı
+            print("Hiçbir dil kodu ile ses tanınamadı")
+            return None
+
+        except Exception as e:
+            print(f"Google Speech Recognition hatası: {e}")
+            return None
+
+
+# Ayarlardaki motor adı -> motor sınıfı
+ASR_BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+    GoogleBackend.name: GoogleBackend,
+}
@@ -0,0 +1,469 @@
+"""
+Ses Sinyal İşleme Yardımcıları (NumPy)
+"""
+
+from collections import deque
+from math import gcd
+
+import numpy as np
+
+# Polifaz yeniden örnekleme için SciPy isteğe bağlıdır
+try:
+    from scipy.signal import resample_poly
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+# Bu seviyenin altındaki çerçeveler her durumda sessizlik kabul edilir (dBFS)
+ABSOLUTE_SILENCE_DB = -55.0
+
+# SciPy yokken yeniden örneklemede bir seferde işlenen çıktı örneği sayısı
+RESAMPLE_BLOCK = 1 << 20
+
+# Konuşma sayılması için gürültü tabanının en az bu kadar üstünde olmak gerekir (dB);
+# tepe seviyeye göre hesaplanan eşik bu sınırın altına inemez
+MIN_SNR_DB = 6.0
+
+
+def frame_features(samples, frame_length, block_frames=10000):
+    """Örtüşmeyen çerçeveler için enerji (dBFS) ve sıfır geçiş oranı hesaplar
+
+    Çerçeveler diziyi kopyalamadan yeniden şekillendirilerek elde edilir; bellek kullanımını
+    sınırlamak için hesaplama bloklar halinde yapılır.
+    """
+    frame_count = len(samples) // frame_length
+    energy_db = np.empty(frame_count, dtype=np.float32)
+    zcr = np.empty(frame_count, dtype=np.float32)
+
+    frames = samples[:frame_count * frame_length].reshape(frame_count, frame_length)
+    for start in range(0, frame_count, block_frames):
+        block = frames[start:start + block_frames]
+
+        # Ortalama karesel genlik (ara kopya oluşturmadan)
+        mean_square = np.einsum('ij,ij->i', block, block) / frame_length
+        energy_db[start:start + len(block)] = 10 * np.log10(mean_square + 1e-10)
+
+        signs = np.signbit(block)
+        crossings = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1)
+        zcr[start:start + len(block)] = crossings / frame_length
+
+    return energy_db, zcr
+
+
+def speech_threshold(noise_floor, peak_level, energy_margin_db=10.0, min_snr_db=MIN_SNR_DB):
+    """Gürültü tabanı ve tepe seviyeden konuşma enerji eşiğini (dBFS) hesaplar
+
+    Tamamen konuşma içeren kayıtlarda eşiğin konuşmanın üstüne çıkmaması için tepe seviyeyle
+    sınırlanır; ancak eşik hiçbir zaman gürültü tabanının min_snr_db üstünden ve mutlak sessizlik
+    seviyesinden aşağı inmez. Böylece yalnızca gürültü içeren kayıtlarda gürültü konuşma sayılmaz.
+    """
+    threshold = min(noise_floor + energy_margin_db, peak_level - 15.0)
+    return max(threshold, noise_floor + min_snr_db, ABSOLUTE_SILENCE_DB)
+
+
+def speech_mask(energy_db, zcr, energy_margin_db=10.0, zcr_threshold=0.25, min_snr_db=MIN_SNR_DB):
+    """Enerji ve sıfır geçiş oranına göre konuşma içeren çerçeveleri işaretler"""
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+
+    # Gürültü tabanı düşük enerjili çerçevelerden, tepe seviye yüksek enerjili çerçevelerden tahmin edilir
+    noise_floor = float(np.percentile(energy_db, 10))
+    peak_level = float(np.percentile(energy_db, 95))
+    threshold = speech_threshold(noise_floor, peak_level, energy_margin_db, min_snr_db)
+
+    # Ötümsüz sessizler (s, ş, f) düşük enerjili fakat yüksek sıfır geçişlidir; geniş bantlı
+    # gürültü (hışırtı) de yüksek sıfır geçişli olduğundan bu kural yalnızca gürültü tabanının
+    # belirgin şekilde üstündeki çerçevelere uygulanır
+    unvoiced_floor = max(threshold - 6.0, noise_floor + min_snr_db, ABSOLUTE_SILENCE_DB)
+    return (energy_db > threshold) | ((energy_db > unvoiced_floor) & (zcr > zcr_threshold))
+
+
+def noise_floor_db(samples, sample_rate, frame_ms=30):
+    """Kaydın gürültü tabanını (en sessiz çerçevelerin enerjisi, dBFS) tahmin eder"""
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    if len(samples) < frame_length:
+        return ABSOLUTE_SILENCE_DB
+
+    energy_db, _ = frame_features(samples, frame_length)
+    return float(np.percentile(energy_db, 10))
+
+
+def _runs(mask):
+    """Boolean dizideki ardışık True bölgelerinin başlangıç ve bitiş (hariç) indekslerini döndürür"""
+    padded = np.concatenate(([0], mask.astype(np.int8), [0]))
+    changes = np.diff(padded)
+    return np.flatnonzero(changes == 1), np.flatnonzero(changes == -1)
+
+
+def smooth_mask(mask, min_silence_frames, min_speech_frames):
+    """Kısa duraksamaları konuşmaya katar ve çok kısa konuşma parçalarını (tıklama vb.) atar"""
+    mask = mask.copy()
+
+    starts, ends = _runs(~mask)
+    for start, end in zip(starts, ends):
+        # Baştaki ve sondaki sessizlik korunur, yalnızca konuşmalar arasındaki kısa boşluklar doldurulur
+        if start > 0 and end < len(mask) and end - start < min_silence_frames:
+            mask[start:end] = True
+
+    starts, ends = _runs(mask)
+    for start, end in zip(starts, ends):
+        if end - start < min_speech_frames:
+            mask[start:end] = False
+
+    return mask
+
+
+def vad_segments(samples, sample_rate, max_segment_s=30.0, min_silence_ms=300,
+                 min_speech_ms=200, pad_ms=150, merge_gap_ms=2000, frame_ms=30):
+    """Sesi duraksamalardan keserek konuşma parçalarına böler
+
+    Dönen liste (başlangıç, bitiş) örnek indekslerinden oluşur. Her parça en fazla
+    max_segment_s saniyedir; merge_gap_ms'den uzun sessizlikler ve konuşma içermeyen
+    bölgeler hiçbir parçaya dahil edilmez.
+    """
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    if len(samples) < frame_length:
+        return []
+
+    energy_db, zcr = frame_features(samples, frame_length)
+    mask = speech_mask(energy_db, zcr)
+    mask = smooth_mask(
+        mask,
+        min_silence_frames=max(1, int(min_silence_ms / frame_ms)),
+        min_speech_frames=max(1, int(min_speech_ms / frame_ms))
+    )
+
+    pad_frames = int(pad_ms / frame_ms)
+    merge_gap_frames = int(merge_gap_ms / frame_ms)
+    max_frames = max(1, int(max_segment_s * 1000 / frame_ms) - 2 * pad_frames)
+
+    # Konuşma bölgelerini en uzun parça süresini aşmayacak şekilde grupla;
+    # böylece kesimler bölgeler arasındaki duraksamalara denk gelir
+    frame_segments = []
+    segment_start = segment_end = None
+    for start, end in zip(*_runs(mask)):
+        # Tek başına çok uzun bölgeler pencerenin ikinci yarısındaki en sessiz çerçeveden kesilir
+        while end - start > max_frames:
+            if segment_start is not None:
+                frame_segments.append((segment_start, segment_end))
+                segment_start = None
+            search_from = start + max_frames // 2
+            cut = search_from + int(np.argmin(energy_db[search_from:start + max_frames]))
+            frame_segments.append((start, cut))
+            start = cut
+
+        if segment_start is None:
+            segment_start, segment_end = start, end
+        elif end - segment_start <= max_frames and start - segment_end <= merge_gap_frames:
+            segment_end = end
+        else:
+            frame_segments.append((segment_start, segment_end))
+            segment_start, segment_end = start, end
+
+    if segment_start is not None:
+        frame_segments.append((segment_start, segment_end))
+
+    # Çerçeve indekslerini örnek indekslerine çevir, kenarlara pay ekle (parçalar çakışmaz)
+    max_samples = int(max_segment_s * sample_rate)
+    segments = []
+    previous_end = 0
+    for start, end in frame_segments:
+        sample_start = max(previous_end, (start - pad_frames) * frame_length)
+        sample_end = min(len(samples), (end + pad_frames) * frame_length, sample_start + max_samples)
+        if end == len(mask):
+            # Son bölge dosyanın sonuna kadar uzanır (tam çerçeveye sığmayan kalan örnekler dahil)
+            sample_end = min(len(samples), sample_start + max_samples)
+        if sample_end > sample_start:
+            segments.append((int(sample_start), int(sample_end)))
+            previous_end = sample_end
+
+    return segments
+
+
+def resample(samples, orig_rate, target_rate):
+    """Float32 ses dizisini hedef örnekleme hızına dönüştürür
+
+    SciPy varsa polifaz filtre, yoksa doğrusal aradeğerleme kullanılır.
+    """
+    if orig_rate == target_rate or len(samples) == 0:
+        return samples
+
+    if SCIPY_AVAILABLE:
+        divisor = gcd(int(orig_rate), int(target_rate))
+        return resample_poly(samples, target_rate // divisor, orig_rate // divisor).astype(np.float32, copy=False)
+
+    # Doğrusal aradeğerleme bloklar halinde yapılır; np.interp tüm dizi için float64 kopyalar
+    # ve konum dizileri oluşturduğundan uzun kayıtlarda belleği birkaç kat artırır
+    target_length = int(round(len(samples) * target_rate / orig_rate))
+    step = orig_rate / target_rate
+    last = len(samples) - 1
+    output = np.empty(target_length, dtype=np.float32)
+    for start in range(0, target_length, RESAMPLE_BLOCK):
+        end = min(start + RESAMPLE_BLOCK, target_length)
+        positions = np.arange(start, end, dtype=np.float64) * step
+        left = np.minimum(positions.astype(np.int64), last)
+        right = np.minimum(left + 1, last)
+        fraction = (positions - left).astype(np.float32)
+        output[start:end] = samples[left] + (samples[right] - samples[left]) * fraction
+    return output
+
+
+def _pcm_view(raw, sample_width):
+    """Ham PCM verisini kopyalamadan tamsayı dizisi olarak görür (24-bit için tek seferlik dönüşüm)"""
+    if sample_width == 1:
+        return np.frombuffer(raw, dtype=np.uint8)
+    if sample_width == 2:
+        return np.frombuffer(raw, dtype='<i2')
+    if sample_width == 4:
+        return np.frombuffer(raw, dtype='<i4')
+    if sample_width == 3:
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = packed[:, 0] | (packed[:, 1] << 8) | (packed[:, 2] << 16)
+        return np.where(values & 0x800000, values - (1 << 24), values)
+    raise ValueError(f"Desteklenmeyen örnek genişliği: {sample_width}")
+
+
+def strip_silence(samples, sample_rate, silence_thresh_db=-40.0, silence_len_ms=500, padding_ms=100,
+                  frame_ms=10):
+    """silence_len_ms'den uzun sessizlikleri (baş, son ve aradakiler) çerçeve enerjisine göre atar
+
+    pydub'ın strip_silence davranışına karşılık gelir: konuşma bölgelerinin iki yanında
+    padding_ms kadar sessizlik bırakılır. Bölgeler tek bir çıktı dizisinde birleştirilir.
+    """
+    frame_length = max(1, int(sample_rate * frame_ms / 1000))
+    if len(samples) < frame_length:
+        return samples
+
+    energy_db, _ = frame_features(samples, frame_length)
+    silent = energy_db < silence_thresh_db
+
+    # Kısa sessizlikler korunur, yalnızca silence_len_ms'den uzun olanlar atılır
+    min_silence_frames = max(1, int(silence_len_ms / frame_ms))
+    starts, ends = _runs(silent)
+    keep = np.ones(len(silent), dtype=bool)
+    for start, end in zip(starts, ends):
+        if end - start >= min_silence_frames:
+            keep[start:end] = False
+
+    if keep.all():
+        return samples
+    if not keep.any():
+        return samples[:0]
+
+    pad = int(padding_ms / frame_ms)
+    starts, ends = _runs(keep)
+    ranges = []
+    for start, end in zip(starts, ends):
+        start = max(0, start - pad) * frame_length
+        end = len(samples) if end == len(keep) else min(len(keep), end + pad) * frame_length
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    return np.concatenate([samples[start:end] for start, end in ranges])
+
+
+def normalize_for_asr(raw, sample_rate, channels, sample_width, target_rate=16000, headroom_db=1.0):
+    """Ham PCM verisini normalize edilmiş, hedef hızda float32 mono diziye çevirir (sessizlikler korunur)
+
+    Tepe normalizasyonu, mono'ya indirme ve yeniden örnekleme ara AudioSegment kopyaları
+    oluşturmadan yapılır. Sonuç [-1, 1] aralığındadır.
+    """
+    pcm = _pcm_view(raw, sample_width)
+    frame_count = len(pcm) // channels
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+    pcm = pcm[:frame_count * channels]
+
+    # Tepe seviye tüm kanallar üzerinden (pydub normalize ile aynı) tamsayı dizide ölçülür
+    if sample_width == 1:
+        peak = float(np.max(np.abs(pcm.astype(np.int16) - 128)))
+        offset, full_scale = 128.0, 128.0
+    else:
+        peak = float(max(int(pcm.max()), -int(pcm.min())))
+        offset, full_scale = 0.0, float(1 << (8 * sample_width - 1))
+
+    # Kanal ortalaması doğrudan float32 mono diziye alınır
+    samples = pcm.reshape(frame_count, channels).mean(axis=1, dtype=np.float32) if channels > 1 \
+        else pcm.astype(np.float32)
+    if offset:
+        samples -= offset
+
+    # Ölçekleme ve normalizasyon tek çarpımla
+    if peak > 0:
+        samples *= (10 ** (-headroom_db / 20)) / peak
+    else:
+        samples /= full_scale
+
+    return resample(samples, sample_rate, target_rate)
+
+
+class StreamingSegmenter:
+    """Kayıt sırasında gelen örnekleri çerçeve çerçeve izler ve kapanan konuşma parçalarını döndürür
+
+    Dosya tabanlı vad_segments ile aynı enerji/sıfır geçiş ölçütlerini kullanır; tüm kayıt
+    bilinmediğinden tepe seviye son birkaç saniyelik pencereden tahmin edilir. Gürültü tabanı ise
+    uzun süreli tutulur: penceredeki düşük enerji seviyesi düştüğünde hemen, yükseldiğinde yavaşça
+    izlenir. Böylece uzun bir sessizlikten sonra pencerede yalnızca gürültü kalsa da eşik
+    gürültünün altına inmez.
+    """
+
+    # Gürültü tabanı yükselirken her güncellemede aradaki farkın bu oranı kadar yaklaşılır
+    NOISE_RISE_RATE = 0.05
+
+    def __init__(self, sample_rate, max_segment_s=30.0, min_silence_ms=500, min_speech_ms=200,
+                 pad_ms=150, frame_ms=30, energy_margin_db=10.0, zcr_threshold=0.25, window_s=10.0,
+                 min_snr_db=MIN_SNR_DB):
+        self.frame_length = max(1, int(sample_rate * frame_ms / 1000))
+        self.min_silence_frames = max(1, int(min_silence_ms / frame_ms))
+        self.min_speech_frames = max(1, int(min_speech_ms / frame_ms))
+        self.pad_frames = int(pad_ms / frame_ms)
+        self.max_frames = max(2, int(max_segment_s * 1000 / frame_ms))
+        self.energy_margin_db = energy_margin_db
+        self.zcr_threshold = zcr_threshold
+        self.min_snr_db = min_snr_db
+
+        self._pending = np.zeros(0, dtype=np.float32)  # Tam çerçeveye ulaşmamış örnekler
+        self._preroll = deque(maxlen=max(1, self.pad_frames))  # Konuşma öncesi pay
+        self._frames = []  # Açık parçanın çerçeveleri
+        self._energies = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._history = deque(maxlen=max(10, int(window_s * 1000 / frame_ms)))
+        self._noise_floor = None
+        self._threshold = ABSOLUTE_SILENCE_DB + self.energy_margin_db
+        self._unvoiced_threshold = self._threshold
+        self._frame_count = 0
+
+    def push(self, samples):
+        """Yeni örnekleri ekler ve bu sırada kapanan parçaların listesini döndürür"""
+        data = np.concatenate((self._pending, samples.astype(np.float32, copy=False)))
+        frame_count = len(data) // self.frame_length
+        self._pending = data[frame_count * self.frame_length:].copy()
+        if frame_count == 0:
+            return []
+
+        energy_db, zcr = frame_features(data[:frame_count * self.frame_length], self.frame_length)
+        frames = data[:frame_count * self.frame_length].reshape(frame_count, self.frame_length)
+
+        closed = []
+        for frame, energy, crossing in zip(frames, energy_db, zcr):
+            segment = self._step(frame, float(energy), self._is_speech(float(energy), float(crossing)))
+            if segment is not None:
+                closed.append(segment)
+        return closed
+
+    def flush(self):
+        """Kayıt bittiğinde açık kalan son parçayı döndürür (konuşma yoksa None)"""
+        if not self._frames:
+            return None
+        if len(self._pending):
+            self._frames.append(self._pending)
+            self._energies.append(ABSOLUTE_SILENCE_DB)
+            self._pending = np.zeros(0, dtype=np.float32)
+        self._silence_run = 0
+        return self._close(len(self._frames))
+
+    def _is_speech(self, energy, crossing):
+        """Çerçevenin konuşma içerip içermediğini belirler ve eşiği periyodik olarak günceller"""
+        self._history.append(energy)
+        self._frame_count += 1
+        # Kaydın başında eşik her çerçevede, sonra her 10 çerçevede bir güncellenir
+        if self._frame_count <= 10 or self._frame_count % 10 == 0:
+            self._update_threshold()
+
+        return energy > self._threshold or (energy > self._unvoiced_threshold and crossing > self.zcr_threshold)
+
+    def _update_threshold(self):
+        history = np.fromiter(self._history, dtype=np.float32)
+        window_floor = float(np.percentile(history, 10))
+        peak_level = float(np.percentile(history, 95))
+
+        if self._noise_floor is None or window_floor < self._noise_floor:
+            self._noise_floor = window_floor
+        else:
+            self._noise_floor += (window_floor - self._noise_floor) * self.NOISE_RISE_RATE
+
+        noise_floor = self._noise_floor
+        self._threshold = speech_threshold(noise_floor, peak_level, self.energy_margin_db, self.min_snr_db)
+        self._unvoiced_threshold = max(self._threshold - 6.0, noise_floor + self.min_snr_db, ABSOLUTE_SILENCE_DB)
+
+    def _step(self, frame, energy, is_speech):
+        """Tek bir çerçeveyi işler; bir parça kapanırsa onu döndürür"""
+        if not self._frames:
+            if not is_speech:
+                self._preroll.append(frame.copy())
+                return None
+            # Yeni parça: konuşma öncesi payla birlikte başlat
+            self._frames = list(self._preroll)
+            self._energies = [ABSOLUTE_SILENCE_DB] * len(self._frames)
+            self._preroll.clear()
+            self._speech_frames = 0
+
+        self._frames.append(frame.copy())
+        self._energies.append(energy)
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= self.min_silence_frames:
+            # Duraksama: sondaki sessizliğin yalnızca pay kadarını tut
+            return self._close(len(self._frames) - max(0, self._silence_run - self.pad_frames))
+
+        if len(self._frames) >= self.max_frames:
+            # Kesintisiz konuşma: parçanın ikinci yarısındaki en sessiz çerçeveden kes
+            half = len(self._frames) // 2
+            cut = half + int(np.argmin(self._energies[half:]))
+            return self._close(max(1, cut))
+
+        return None
+
+    def _close(self, cut):
+        """Açık parçayı cut çerçevesinden keser, kalan çerçeveler yeni parçanın başı olur"""
+        frames, remainder = self._frames[:cut], self._frames[cut:]
+        remainder_energies = self._energies[cut:]
+        speech_frames = self._speech_frames
+
+        if self._silence_run > 0:
+            # Sessizlikle kapandı: kalan sessiz çerçeveler sonraki konuşmanın ön payı olur
+            self._frames, self._energies = [], []
+            self._preroll.extend(remainder)
+            self._speech_frames = 0
+        else:
+            # Konuşma sürüyor: kalan çerçevelerle yeni parça açık kalır
+            self._frames, self._energies = list(remainder), list(remainder_energies)
+            self._speech_frames = len(remainder)
+        self._silence_run = 0
+
+        if speech_frames < self.min_speech_frames or not frames:
+            return None
+        return np.concatenate(frames)
+
+
+class FixedLengthChunker:
+    """Akış halinde gelen örnekleri sabit uzunlukta parçalara böler (VAD kapalıyken)
+
+    StreamingSegmenter ile aynı push()/flush() arayüzünü kullanır.
+    """
+
+    def __init__(self, sample_rate, segment_s=30.0):
+        self.segment_length = max(1, int(sample_rate * segment_s))
+        self._pending = np.zeros(0, dtype=np.float32)
+
+    def push(self, samples):
+        """Yeni örnekleri ekler ve dolan parçaların listesini döndürür"""
+        data = np.concatenate((self._pending, samples.astype(np.float32, copy=False)))
+        count = len(data) // self.segment_length
+        closed = [data[i * self.segment_length:(i + 1) * self.segment_length] for i in range(count)]
+        self._pending = data[count * self.segment_length:].copy()
+        return closed
+
+    def flush(self):
+        """Kalan örnekleri son parça olarak döndürür (boşsa None)"""
+        if len(self._pending) == 0:
+            return None
+        tail, self._pending = self._pending, np.zeros(0, dtype=np.float32)
+        return tail
@@ -0,0 +1,323 @@
+"""
+Ses Dosyası Giriş/Çıkış Yardımcıları
+"""
+
+import json
+import os
+from collections import deque
+import shutil
+import struct
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+from audio_dsp import resample
+
+# Akış halinde çözmede bir blokta okunan süre (saniye)
+PCM_BLOCK_SECONDS = 10.0
+
+
+class RingBuffer:
+    """Önceden ayrılmış sabit kapasiteli bayt halka tamponu
+
+    Kayıt sırasında gelen bloklar buraya kopyalanır ve diske yazan taraf tarafından
+    parça parça boşaltılır; kayıt ne kadar uzun sürerse sürsün bellek kullanımı sabittir.
+    Tek yazıcı / tek okuyucu kullanımı için thread güvenlidir.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._read_pos = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.overflow_bytes = 0  # Tampon doluyken kaybedilen veri miktarı
+
+    def __len__(self):
+        return self._size
+
+    def write(self, data):
+        """Veriyi tampona ekler; sığmayan kısım atılır ve yazılan bayt sayısı döndürülür"""
+        data = memoryview(data).cast('B')
+        with self._lock:
+            length = min(len(data), self.capacity - self._size)
+            self.overflow_bytes += len(data) - length
+            write_pos = (self._read_pos + self._size) % self.capacity
+
+            first = min(length, self.capacity - write_pos)
+            self._view[write_pos:write_pos + first] = data[:first]
+            if length > first:
+                self._view[:length - first] = data[first:length]
+
+            self._size += length
+            return length
+
+    def read_into(self, sink, max_bytes=None):
+        """Tampondaki veriyi kopyalamadan sink(memoryview) çağrılarıyla boşaltır"""
+        with self._lock:
+            length = self._size if max_bytes is None else min(self._size, max_bytes)
+            read_pos = self._read_pos
+
+        first = min(length, self.capacity - read_pos)
+        if first:
+            sink(self._view[read_pos:read_pos + first])
+        if length > first:
+            sink(self._view[:length - first])
+
+        with self._lock:
+            self._read_pos = (read_pos + length) % self.capacity
+            self._size -= length
+        return length
+
+
+class WavStreamWriter:
+    """PCM verisini geldiği gibi WAV dosyasına yazar ve başlığı periyodik olarak günceller
+
+    Başlıktaki boyut alanları header_interval saniyede bir düzeltilir; süreç beklenmedik
+    şekilde sonlansa bile dosya son güncellemeye kadar geçerli bir WAV dosyası olarak kalır.
+    append=True ile daha önce bu sınıfla yazılmış bir dosyanın sonuna eklenir; dosyanın biçimi
+    farklıysa ValueError fırlatılır.
+    """
+
+    HEADER_SIZE = 44
+
+    def __init__(self, path, channels, sample_width, sample_rate, header_interval=5.0, append=False):
+        self.path = path
+        self.channels = channels
+        self.sample_width = sample_width
+        self.sample_rate = sample_rate
+        self.header_interval = header_interval
+        self.data_bytes = 0
+
+        if append and os.path.exists(path):
+            self._file = open(path, 'r+b')
+            try:
+                self._check_header()
+            except Exception:
+                self._file.close()
+                raise
+            self.data_bytes = os.path.getsize(path) - self.HEADER_SIZE
+            self._file.seek(0, os.SEEK_END)
+        else:
+            self._file = open(path, 'wb')
+            self._write_header()
+        self._last_patch = time.monotonic()
+
+    @property
+    def duration(self):
+        """Yazılan sesin süresi (saniye)"""
+        return self.data_bytes / (self.sample_rate * self.channels * self.sample_width)
+
+    def write(self, data):
+        """Ham PCM verisini dosyanın sonuna ekler"""
+        self._file.write(data)
+        self.data_bytes += len(data)
+
+        if time.monotonic() - self._last_patch >= self.header_interval:
+            self._patch_header()
+
+    def close(self):
+        """Başlığı son boyutlarla günceller ve dosyayı kapatır"""
+        if self._file.closed:
+            return
+        self._patch_header()
+        self._file.close()
+
+    def _write_header(self):
+        byte_rate = self.sample_rate * self.channels * self.sample_width
+        block_align = self.channels * self.sample_width
+        self._file.write(struct.pack(
+            '<4sI4s4sIHHIIHH4sI',
+            b'RIFF', 36 + self.data_bytes, b'WAVE',
+            b'fmt ', 16, 1, self.channels, self.sample_rate, byte_rate, block_align, self.sample_width * 8,
+            b'data', self.data_bytes
+        ))
+
+    def _check_header(self):
+        """Eklenecek dosyanın aynı biçimde yazılmış bir PCM WAV dosyası olduğunu doğrular"""
+        header = self._file.read(self.HEADER_SIZE)
+        if len(header) < self.HEADER_SIZE:
+            raise ValueError("WAV başlığı eksik")
+        riff, _, wave_id, fmt_id, fmt_size, audio_format, channels, sample_rate, _, _, bits, data_id, _ = \
+            struct.unpack('<4sI4s4sIHHIIHH4sI', header)
+        if (riff, wave_id, fmt_id, data_id) != (b'RIFF', b'WAVE', b'fmt ', b'data') or fmt_size != 16 or audio_format != 1:
+            raise ValueError("Dosya bu kaydedicinin yazdığı bir WAV dosyası değil")
+        if (channels, sample_rate, bits) != (self.channels, self.sample_rate, self.sample_width * 8):
+            raise ValueError(f"WAV biçimi farklı ({sample_rate} Hz, {channels} kanal, {bits} bit)")
+
+    def _patch_header(self):
+        """RIFF ve data boyut alanlarını yazılan veri miktarına göre düzeltir"""
+        position = self._file.tell()
+        self._file.seek(4)
+        self._file.write(struct.pack('<I', 36 + self.data_bytes))
+        self._file.seek(40)
+        self._file.write(struct.pack('<I', self.data_bytes))
+        self._file.seek(position)
+        self._file.flush()
+        try:
+            os.fsync(self._file.fileno())
+        except OSError:
+            pass
+        self._last_patch = time.monotonic()
+
+
+def ffmpeg_binaries():
+    """pydub'ın kullandığı ffmpeg ve ffprobe yollarını döndürür"""
+    try:
+        from pydub import AudioSegment
+        from pydub.utils import get_prober_name
+        return AudioSegment.converter, get_prober_name()
+    except ImportError:
+        return shutil.which("ffmpeg") or "ffmpeg", shutil.which("ffprobe") or "ffprobe"
+
+
+def _wav_layout(path):
+    """16-bit PCM WAV dosyasının (örnekleme hızı, kanal, veri başlangıcı, veri uzunluğu) bilgisini döndürür
+
+    Dosya bellek eşlemeye uygun değilse (sıkıştırılmış, farklı bit derinliği) None döner.
+    """
+    try:
+        with open(path, 'rb') as f:
+            riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+            if riff != b'RIFF' or wave_id != b'WAVE':
+                return None
+
+            fmt = None
+            while True:
+                header = f.read(8)
+                if len(header) < 8:
+                    return None
+                chunk_id, chunk_size = struct.unpack('<4sI', header)
+                if chunk_id == b'fmt ':
+                    fmt = struct.unpack('<HHIIHH', f.read(16))
+                    f.seek(chunk_size - 16 + (chunk_size & 1), os.SEEK_CUR)
+                elif chunk_id == b'data':
+                    if fmt is None:
+                        return None
+                    audio_format, channels, sample_rate, _, _, bits = fmt
+                    if audio_format not in (1, 0xFFFE) or bits != 16:
+                        return None
+                    offset = f.tell()
+                    # Yarım kalmış kayıtlarda başlıktaki boyut eksik olabilir; dosya boyutuyla sınırlanır
+                    available = os.path.getsize(path) - offset
+                    size = min(chunk_size, available) if chunk_size else available
+                    return sample_rate, channels, offset, size - size % (2 * channels)
+                else:
+                    f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    except (OSError, struct.error):
+        return None
+
+
+def is_pcm_wav(path, sample_rate, channels=1):
+    """Dosya verilen örnekleme hızı ve kanal sayısında 16-bit PCM WAV ise True döndürür
+
+    Yalnızca başlık okunur; dosya çözülmez.
+    """
+    layout = _wav_layout(path)
+    return bool(layout) and layout[0] == sample_rate and layout[1] == channels
+
+
+def probe_audio(path):
+    """Ses dosyasının (örnekleme hızı, kanal sayısı, süre) bilgisini dosyayı çözmeden okur
+
+    Bilgi alınamazsa None döner.
+    """
+    layout = _wav_layout(path)
+    if layout:
+        sample_rate, channels, _, size = layout
+        return sample_rate, channels, size / (2 * channels * sample_rate)
+
+    _, ffprobe = ffmpeg_binaries()
+    try:
+        output = subprocess.run(
+            [ffprobe, "-v", "error", "-select_streams", "a:0", "-show_entries",
+             "stream=sample_rate,channels:format=duration", "-of", "json", path],
+            capture_output=True, check=True, timeout=30
+        ).stdout
+        info = json.loads(output)
+        stream = info["streams"][0]
+        return int(stream["sample_rate"]), int(stream["channels"]), float(info["format"]["duration"])
+    except Exception as e:
+        print(f"Ses dosyası bilgisi okunamadı: {e}")
+        return None
+
+
+class PcmBlockReader:
+    """Ses dosyasını sabit boyutlu mono float32 bloklar halinde, hedef örnekleme hızında okur
+
+    16-bit PCM WAV dosyaları bellek eşlenerek (mmap) okunur; diğer biçimler ffmpeg ile bir
+    boru üzerinden çözülür ve dönüştürülür. Bellekte aynı anda yalnızca bir blok bulunur.
+    start_seconds verilirse okuma bu noktadan başlar; position okunan son noktayı (saniye) gösterir.
+    """
+
+    def __init__(self, path, target_rate, block_seconds=PCM_BLOCK_SECONDS, start_seconds=0.0):
+        self.path = path
+        self.target_rate = target_rate
+        self.block_seconds = block_seconds
+        self.start_seconds = start_seconds
+        self.position = start_seconds
+        self._layout = _wav_layout(path)
+
+        info = probe_audio(path)
+        self.duration = info[2] if info else None
+
+    def __iter__(self):
+        if self._layout:
+            return self._read_mapped()
+        return self._read_ffmpeg()
+
+    def _read_mapped(self):
+        sample_rate, channels, offset, size = self._layout
+        frame_count = size // (2 * channels)
+        if frame_count == 0:
+            return
+        pcm = np.memmap(self.path, dtype='<i2', mode='r', offset=offset, shape=(frame_count, channels))
+
+        block_frames = int(self.block_seconds * sample_rate)
+        try:
+            for start in range(int(self.start_seconds * sample_rate), frame_count, block_frames):
+                block = pcm[start:start + block_frames]
+                samples = block.mean(axis=1, dtype=np.float32) if channels > 1 else block[:, 0].astype(np.float32)
+                samples /= 32768.0
+                self.position = (start + len(block)) / sample_rate
+                yield resample(samples, sample_rate, self.target_rate)
+        finally:
+            del pcm
+
+    def _read_ffmpeg(self):
+        ffmpeg, _ = ffmpeg_binaries()
+        block_bytes = int(self.block_seconds * self.target_rate) * 2
+        process = subprocess.Popen(
+            [ffmpeg, "-nostdin", "-v", "error", "-ss", f"{self.start_seconds:.3f}", "-i", self.path,
+             "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(self.target_rate), "-"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=block_bytes
+        )
+
+        # stderr ayrı bir thread'de boşaltılır; okunmazsa uyarılarla dolan boru ffmpeg'i kilitler.
+        # Hata mesajı için yalnızca son satırlar tutulur.
+        error_lines = deque(maxlen=20)
+        stderr_thread = threading.Thread(target=lambda: error_lines.extend(process.stderr), daemon=True)
+        stderr_thread.start()
+        try:
+            while True:
+                data = process.stdout.read(block_bytes)
+                if not data:
+                    break
+                data = data[:len(data) - len(data) % 2]
+                self.position += len(data) / (2 * self.target_rate)
+                yield np.frombuffer(data, dtype='<i2').astype(np.float32) / 32768.0
+
+            if process.wait() != 0:
+                stderr_thread.join()
+                message = b"".join(error_lines).decode(errors='replace').strip()
+                raise RuntimeError(f"ffmpeg çözümleme hatası: {message}")
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            stderr_thread.join()
+            process.stderr.close()
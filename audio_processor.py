@@ -1,21 +1,209 @@
 import os
 import time
-import wave
 import threading
 import tempfile
 import shutil
-from datetime import datetime
+import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from pydub import AudioSegment
-import pyaudio
-import speech_recognition as sr
 
-# Whisper modülünü isteğe bağlı olarak içe aktarma
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
-    print("Whisper modülü bulunamadı. Ses tanıma için alternatif yöntemler kullanılacak.")
+from audio_dsp import vad_segments, resample, normalize_for_asr, strip_silence, StreamingSegmenter, FixedLengthChunker
+from audio_io import RingBuffer, WavStreamWriter, PcmBlockReader, ffmpeg_binaries, probe_audio, is_pcm_wav
+from transcription_cache import TranscriptionCache, TranscriptPrefixIndex
+from asr_backends import ASR_BACKENDS, TARGET_SAMPLE_RATE
+from jobs import CancellationToken, JobCancelled, CANCEL_POLL_INTERVAL, TempRegistry, wait_for
+
+class TranscriptionProgress:
+    """Transkripsiyon ilerleme olayı
+    
+    stage: "preparing" (ses çözülüyor/parçalanıyor), "transcribing" (parça tamamlandı)
+           veya "cached" (sonucun tamamı önbellekten geldi; total=0 ise yalnızca daha önce
+           tanınmış başlangıç kısmı, kalan parçalar ardından gelir)
+    segment / total: tamamlanan parçanın sırası ve toplam parça sayısı
+    elapsed / eta: geçen ve tahmini kalan süre (saniye); eta bilinmiyorsa None
+    text: tamamlanan parçanın metni (tanınamayan parçalarda None)
+    """
+    def __init__(self, stage, segment=0, total=0, elapsed=0.0, eta=None, text=None):
+        self.stage = stage
+        self.segment = segment
+        self.total = total
+        self.elapsed = elapsed
+        self.eta = eta
+        self.text = text
+
+
+def _pyaudio():
+    """PyAudio modülünü ilk kullanımda içe aktarır; kayıt yapmayan kullanımlar (komut satırı) için gerekmez"""
+    import pyaudio
+    return pyaudio
+
+
+# Akış modunda birlikte tanınan parçaların toplam süresi (saniye); bellekte en fazla bu kadar ses tutulur
+STREAM_WINDOW_SECONDS = 600
+
+
+def _emit_progress(progress_callback, event):
+    """İlerleme olayını bildirir; arayüz tarafındaki hatalar transkripsiyonu durdurmaz"""
+    if progress_callback is None:
+        return
+    try:
+        progress_callback(event)
+    except Exception as e:
+        print(f"İlerleme bildirimi hatası: {e}")
+
+
+class IncrementalTranscript:
+    """Daha önce tanınmış bir başlangıcın arkasına eklenen sesin tanınma durumu
+    
+    tail: tanınacak kalan ses; bounds: process_audio_file'ın bu sesten çıkardığı parça
+    sınırları (16 kHz örnek indeksleri). Parça zamanları baştaki sessizlik kırpıldığı için
+    yaklaşıktır.
+    """
+    MIN_NEW_AUDIO_MS = 500
+    
+    def __init__(self, ses, start_bytes, prefix, prefix_index, identity, known_bytes=None):
+        self.ses = ses
+        self.start_bytes = start_bytes
+        self.prefix = prefix
+        self.prefix_index = prefix_index
+        self.identity = identity
+        self.known_bytes = known_bytes
+        self.tail = ses.get_sample_slice(start_bytes // ses.frame_width) if start_bytes else ses
+        self.bounds = []
+    
+    @property
+    def prefix_text(self):
+        return self.prefix.text if self.prefix else ""
+    
+    @property
+    def has_new_audio(self):
+        return len(self.tail) >= self.MIN_NEW_AUDIO_MS
+    
+    def finish(self, segment_texts):
+        """Yeni parçaları kontrol noktası olarak kaydeder ve dosyanın tam metnini döndürür
+        
+        segment_texts: parça sırası (1'den başlar) -> metin. Başlangıcın metni bilinmiyorsa None döner.
+        """
+        new_text = " ".join(segment_texts[i] for i in sorted(segment_texts))
+        if self.prefix is None:
+            return None if self.start_bytes else new_text
+        
+        offset = self.start_bytes / (self.ses.frame_rate * self.ses.frame_width)
+        new_segments = [
+            {
+                "start": round(offset + start / TARGET_SAMPLE_RATE, 2),
+                "end": round(offset + end / TARGET_SAMPLE_RATE, 2),
+                "text": segment_texts.get(i)
+            }
+            for i, (start, end) in enumerate(self.bounds, 1)
+        ]
+        
+        if len(self.ses.raw_data) <= self.prefix.known_bytes:
+            return self.prefix.text
+        return self.prefix_index.update(self.prefix, self.ses.raw_data,
+                                        (self.ses.frame_rate, self.ses.channels, self.ses.sample_width),
+                                        new_segments, self.identity)
+    
+    def result_text(self, new_text, full_text):
+        """Çağırana döndürülecek metin: known_bytes verildiyse yalnızca sonrası, yoksa tamamı"""
+        if not self.known_bytes:
+            return full_text if full_text is not None else new_text
+        if self.prefix is None or self.start_bytes <= self.known_bytes:
+            return new_text
+        
+        # Bilinen kısımdan sonrası da önceden tanınmıştı; metni kontrol noktaları arasından alınır
+        known_text = self.prefix.text_at(self.known_bytes)
+        if known_text is not None and full_text and full_text.startswith(known_text):
+            return full_text[len(known_text):].strip()
+        return new_text
+
+
+class LiveTranscription:
+    """Kayıt sürerken kapanan konuşma parçalarını arka planda metne dönüştürür
+    
+    Kayıt döngüsü her okunan bloğu feed() ile verir; duraksamayla kapanan parçalar tek işçili
+    bir havuzda sırayla tanınır. Kayıt bitince yalnızca son (kuyruk) parça işlenmeye kalır.
+    """
+    def __init__(self, processor, sample_rate, source_path):
+        self.processor = processor
+        self.sample_rate = sample_rate
+        self.source_path = source_path
+        self.segmenter = StreamingSegmenter(
+            sample_rate,
+            max_segment_s=processor.config.audio_segment_length,
+            min_silence_ms=max(500, getattr(processor.config, 'vad_min_silence_ms', 300))
+        )
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.futures = []
+        self.calibration = None
+        self.finished = threading.Event()
+    
+    def feed(self, data):
+        """Kayıttan gelen 16-bit PCM bloğunu işler, kapanan parçaları tanıma kuyruğuna ekler"""
+        samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+        samples /= 32768.0
+        for segment in self.segmenter.push(samples):
+            self._submit(segment)
+    
+    def finish(self):
+        """Kayıt bittiğinde kuyruk parçasını ekler"""
+        try:
+            tail = self.segmenter.flush()
+            if tail is not None:
+                self._submit(tail)
+        finally:
+            self.executor.shutdown(wait=False)
+            self.finished.set()
+    
+    def _submit(self, segment):
+        """Parçayı 16 kHz'e dönüştürüp tanıma kuyruğuna ekler
+        
+        Parçalar tek tek normalize edilmez: parça başına kazanç sessiz parçaları konuşma seviyesine
+        çıkarır ve gürültü tabanı ölçümünü parçalar arasında anlamsız kılar.
+        """
+        audio = resample(segment, self.sample_rate, TARGET_SAMPLE_RATE)
+        
+        index = len(self.futures) + 1
+        if index == 1:
+            # Kayıt için gürültü tabanı ilk konuşma parçasından bir kez ölçülür
+            self.calibration = self.processor._calibrate_backends(audio, TARGET_SAMPLE_RATE)
+        self.futures.append(self.executor.submit(self._transcribe, index, audio))
+    
+    def _transcribe(self, index, audio):
+        print(f"\nCanlı tanıma: parça {index} işleniyor ({len(audio) / TARGET_SAMPLE_RATE:.1f} sn)...")
+        segment_text = self.processor._transcribe_segment(audio, calibration=self.calibration)
+        if segment_text:
+            print(f"Parça {index} metni: {segment_text}")
+        else:
+            print(f"Parça {index} için ses tanıma başarısız oldu!")
+        return segment_text
+    
+    def result(self, progress_callback=None, cancel_token=None):
+        """Kayıt bitip tüm parçalar tanınana kadar bekler ve metinleri sırayla birleştirir"""
+        cancel_token = cancel_token or CancellationToken()
+        while not self.finished.wait(CANCEL_POLL_INTERVAL):
+            cancel_token.check()
+        start_time = time.time()
+        total = len(self.futures)
+        texts = []
+        
+        # İptalde henüz başlamamış parçalar kuyruktan atılır
+        unregister = cancel_token.on_cancel(lambda: self.executor.shutdown(wait=False, cancel_futures=True))
+        try:
+            for future in self.futures:
+                texts.append(wait_for(future, cancel_token))
+                i = len(texts)
+                elapsed = time.time() - start_time
+                _emit_progress(progress_callback, TranscriptionProgress(
+                    "transcribing", i, total, elapsed, elapsed / i * (total - i), texts[-1]
+                ))
+        finally:
+            unregister()
+        
+        return " ".join(text.strip() for text in texts if text and text.strip())
+
 
 class AudioProcessor:
     """Ses işleme ve konuşma tanıma sınıfı"""
@@ -26,85 +214,258 @@ class AudioProcessor:
         # Kayıt değişkenleri
         self.recording = False
         self.paused = False
-        self.audio = pyaudio.PyAudio()
+        self._audio = None  # PortAudio ilk kayıtta veya mikrofon önceden açılırken başlatılır
+        self._audio_lock = threading.Lock()
+        self._stream_lock = threading.Lock()
         self.stream = None
-        self.frames = []
+        self._preopened_stream = None  # (akış, istenen hız, cihazın açıldığı hız)
+        self._data_ready = threading.Event()  # Halka tamponda diske yazılacak kadar veri biriktiğinde kurulur
+        self._flush_size = 0
+        self.writer = None
+        self.ring_buffer = None
         self.temp_file_path = None
+        self.temp_registry = TempRegistry(self.config.temp_dir)
+        self.session_recording_path = None  # Devam ettirilebilecek son kayıt dosyası
+        self.session_resume_bytes = 0  # Devam ettirilen kayıtta önceki kısmın uzunluğu (bayt)
         self.recording_thread = None
+        self.live_transcription = None
         
-        # Kayıt formatı ayarları
-        self.format = pyaudio.paInt16
+        # Kayıt formatı ayarları (16 kHz mono kayıt sonradan yeniden örnekleme gerektirmez)
+        self.sample_width = 2  # 16-bit PCM (PyAudio paInt16)
         self.channels = 1
-        self.rate = 44100
+        self.rate = getattr(self.config, 'recording_sample_rate', TARGET_SAMPLE_RATE)
         self.chunk = 1024
         
-        # Whisper modeli
-        self.whisper_model = None
+        # Kalıcı transkripsiyon önbelleği (ilk kullanımda oluşturulur)
+        self._transcription_cache = None
+        
+        # Ses tanıma motorları (modeller ilk kullanımda veya önceden yükleme ile yüklenir)
+        self.backends = {name: backend_class(self.config) for name, backend_class in ASR_BACKENDS.items()}
+    
+    def _backend_chain(self):
+        """Seçili motor ve ardından ayarlardaki yedek sırasıyla kullanılabilir motorları döndürür"""
+        primary = self.config.speech_recognition_engine
+        order = [primary] + [name for name in getattr(self.config, 'asr_fallback_order', []) if name != primary]
+        
+        chain = []
+        for name in order:
+            backend = self.backends.get(name)
+            if backend is None:
+                print(f"Bilinmeyen ses tanıma motoru: {name}")
+            elif not backend.is_available():
+                print(f"{name} modülü bulunamadığı için bir sonraki motor kullanılıyor.")
+            else:
+                chain.append(backend)
+        return chain
+    
+    @property
+    def audio(self):
+        """PyAudio örneği; cihaz taraması uygulama açılışını yavaşlatmasın diye ilk kullanımda oluşturulur"""
+        with self._audio_lock:
+            if self._audio is None:
+                self._audio = _pyaudio().PyAudio()
+            return self._audio
+    
+    def preopen_input_stream(self):
+        """Mikrofon akışını kayıt başlamadan arka planda açar (kayıt butonunun üzerine gelince)
         
-        # Speech Recognition optimizasyonları
-        self.recognizer = sr.Recognizer()
-        self.recognizer.operation_timeout = 60
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.energy_threshold = 3000
-        self.recognizer.pause_threshold = 1
+        Akış başlatılmadan açık bekletilir; kayıt başladığında yalnızca start_stream() çağrılır.
+        """
+        if self.recording or self._preopened_stream is not None:
+            return
+        threading.Thread(target=self._preopen_worker, daemon=True).start()
+    
+    def _preopen_worker(self):
+        with self._stream_lock:
+            if self.recording or self._preopened_stream is not None:
+                return
+            try:
+                requested_rate = getattr(self.config, 'recording_sample_rate', TARGET_SAMPLE_RATE)
+                self.rate = requested_rate
+                self._preopened_stream = (self._open_input_stream(), requested_rate, self.rate)
+                print(f"Mikrofon önceden açıldı ({self.rate} Hz)")
+            except Exception as e:
+                print(f"Mikrofon önceden açılamadı: {e}")
+    
+    def release_input_stream(self):
+        """Önceden açılmış ancak kullanılmamış mikrofon akışını kapatır"""
+        with self._stream_lock:
+            preopened, self._preopened_stream = self._preopened_stream, None
+        if preopened:
+            try:
+                preopened[0].close()
+            except Exception as e:
+                print(f"Mikrofon akışı kapatılamadı: {e}")
+    
+    def _take_input_stream(self):
+        """Önceden açılmış akışı (ayarlanan hız değişmediyse) alır, yoksa yeni akış açar"""
+        requested_rate = getattr(self.config, 'recording_sample_rate', TARGET_SAMPLE_RATE)
+        with self._stream_lock:
+            preopened, self._preopened_stream = self._preopened_stream, None
+            if preopened:
+                stream, opened_for, rate = preopened
+                if opened_for == requested_rate:
+                    self.rate = rate
+                    return stream
+                # Ayarlardaki kayıt hızı akış açıldıktan sonra değişmiş
+                stream.close()
+            self.rate = requested_rate
+            return self._open_input_stream()
+    
+    def _stream_callback(self, in_data, frame_count, time_info, status):
+        """PortAudio thread'inden çağrılır; bloğu yalnızca halka tampona kopyalar"""
+        ring_buffer = self.ring_buffer
+        if ring_buffer is not None and not self.paused:
+            ring_buffer.write(in_data)
+            if len(ring_buffer) >= self._flush_size:
+                self._data_ready.set()
+        return None, _pyaudio().paContinue
     
     def start_recording(self):
-        """Ses kaydını başlatır"""
+        """Ses kaydını başlatır ve kaydı bloklar halinde doğrudan diske yazar
+        
+        Mikrofon geri çağırma (callback) modunda okunur: PortAudio blokları halka tampona yazar,
+        bu thread yalnızca tampon dolduğunda uyanıp veriyi dosyaya ve canlı tanımaya aktarır.
+        """
         self.recording = True
         self.paused = False
-        self.frames = []
-        
-        # Zaman dampalı geçici dosya oluştur
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.temp_file_path = os.path.join(self.config.temp_dir, f"recording_{timestamp}.wav")
-        
-        # Ses akışını başlat
-        self.stream = self.audio.open(
-            format=self.format,
-            channels=self.channels,
-            rate=self.rate,
-            input=True,
-            frames_per_buffer=self.chunk
-        )
         
-        print("Kayıt başladı.")
+        # Kayıt sürerken Whisper modeli arka planda yüklenir
+        self.preload_models()
+        
+        # Ses akışını al (ayarlar arka planda yüklendiğinden hız her kayıtta yeniden okunur)
+        self.stream = self._take_input_stream()
+        
+        # Bloklar sabit boyutlu halka tampondan dosyaya aktarılır; bellek kullanımı kayıt süresinden bağımsızdır
+        bytes_per_second = self.rate * self.channels * self.sample_width
+        self._flush_size = bytes_per_second // 2
+        self._data_ready.clear()
+        self.writer = self._open_recording_writer()
+        
+        # Canlı tanıma: kapanan konuşma parçaları kayıt sürerken metne dönüştürülür
+        self.live_transcription = None
+        if getattr(self.config, 'live_transcription', True):
+            self.live_transcription = LiveTranscription(self, self.rate, self.temp_file_path)
+        
+        self.ring_buffer = RingBuffer(bytes_per_second * 2)
+        try:
+            self.stream.start_stream()
+        except Exception as e:
+            print(f"Kayıt hatası: {e}")
+            self.recording = False
         
-        # Kayıt döngüsü
+        print(f"Kayıt başladı ({self.rate} Hz, {self.channels} kanal): {self.temp_file_path}")
+        
+        # Kayıt döngüsü: veri gelene kadar (duraklatıldığında da) thread uykuda bekler
         while self.recording:
-            if not self.paused:
+            if self._data_ready.wait(CANCEL_POLL_INTERVAL * 2):
+                self._data_ready.clear()
                 try:
-                    data = self.stream.read(self.chunk)
-                    self.frames.append(data)
+                    self._drain_ring_buffer()
                 except Exception as e:
                     print(f"Kayıt hatası: {e}")
                     break
-            else:
-                # Duraklatıldığında kısa bekle
-                time.sleep(0.1)
         
-        # Kayıt bitti, ses akışını kapat
-        if self.stream:
-            self.stream.stop_stream()
-            self.stream.close()
-            self.stream = None
-        
-        # Kaydedilen ses dosyasını kaydet
-        if self.frames:
+        try:
+            # Kayıt bitti, ses akışını kapat
+            if self.stream:
+                try:
+                    self.stream.stop_stream()
+                finally:
+                    self.stream.close()
+                    self.stream = None
+            
+            # Kalan veriyi yaz ve dosyayı kapat
+            try:
+                self._drain_ring_buffer()
+            except Exception as e:
+                print(f"Kayıt hatası: {e}")
             self._save_recording()
+        finally:
+            # Canlı tanımada yalnızca son parça işlenmeye kalır; yazma başarısız olsa da
+            # sonucu bekleyen taraf serbest kalmalıdır
+            if self.live_transcription:
+                self.live_transcription.finish()
         
         print("Kayıt durduruldu.")
     
+    def _drain_ring_buffer(self):
+        """Halka tampondaki veriyi kayıt dosyasına ve canlı tanımaya aktarır"""
+        live = self.live_transcription
+        
+        def sink(data):
+            self.writer.write(data)
+            if live:
+                live.feed(data)
+        
+        self.ring_buffer.read_into(sink)
+    
+    def _open_recording_writer(self):
+        """Kayıt dosyasını açar
+        
+        continue_recording_session açıksa yeni kayıt aynı oturumun önceki kaydının sonuna eklenir;
+        işlenirken önceki kısım yeniden tanınmaz. Aksi halde zaman damgalı yeni bir dosya oluşturulur.
+        """
+        sample_width = self.sample_width
+        previous = self.session_recording_path
+        
+        if getattr(self.config, 'continue_recording_session', False) and previous and os.path.exists(previous):
+            try:
+                writer = WavStreamWriter(previous, self.channels, sample_width, self.rate, append=True)
+                self.temp_file_path = previous
+                self.session_resume_bytes = writer.data_bytes
+                print(f"Kayıt önceki kaydın sonuna ekleniyor ({writer.duration:.1f} sn sonrasından)")
+                return writer
+            except Exception as e:
+                print(f"Önceki kayda devam edilemedi, yeni kayıt başlatılıyor: {e}")
+        
+        # Zaman damgalı, benzersiz geçici dosya oluştur
+        self.temp_file_path = self.temp_registry.new_path("recording", ".wav")
+        self.session_recording_path = self.temp_file_path
+        self.session_resume_bytes = 0
+        return WavStreamWriter(self.temp_file_path, self.channels, sample_width, self.rate)
+    
+    def _open_input_stream(self):
+        """Mikrofon akışını açar; cihaz istenen örnekleme hızını desteklemiyorsa 44100 Hz'e döner"""
+        try:
+            return self.audio.open(
+                format=self.audio.get_format_from_width(self.sample_width),
+                channels=self.channels,
+                rate=self.rate,
+                input=True,
+                frames_per_buffer=self.chunk,
+                stream_callback=self._stream_callback,
+                start=False
+            )
+        except Exception as e:
+            if self.rate == 44100:
+                raise
+            print(f"{self.rate} Hz ile kayıt açılamadı ({e}), 44100 Hz kullanılıyor...")
+            self.rate = 44100
+            return self._open_input_stream()
+    
     def pause_recording(self):
-        """Ses kaydını duraklatır"""
+        """Ses kaydını duraklatır; akış durdurulur, kayıt thread'i veri gelene kadar uyur"""
         self.paused = True
+        try:
+            if self.stream and self.stream.is_active():
+                self.stream.stop_stream()
+        except Exception as e:
+            print(f"Kayıt duraklatılırken hata: {e}")
     
     def resume_recording(self):
         """Duraklatılmış ses kaydını devam ettirir"""
         self.paused = False
+        try:
+            if self.stream and self.stream.is_stopped():
+                self.stream.start_stream()
+        except Exception as e:
+            print(f"Kayda devam edilirken hata: {e}")
     
     def stop_recording(self):
         """Ses kaydını durdurur"""
         self.recording = False
+        self._data_ready.set()
         
         try:
             # Kayıt thread'i bekleme
@@ -121,59 +482,67 @@ class AudioProcessor:
             self.parent.audio_progress.set_error("Hata!")
     
     def _save_recording(self):
-        """Kaydedilen ses verilerini dosyaya kaydeder"""
+        """Tamponda kalan kayıt verisini dosyaya yazar ve WAV başlığını tamamlar"""
         try:
-            with wave.open(self.temp_file_path, 'wb') as wf:
-                wf.setnchannels(self.channels)
-                wf.setsampwidth(self.audio.get_sample_size(self.format))
-                wf.setframerate(self.rate)
-                wf.writeframes(b''.join(self.frames))
+            if not self.writer:
+                return False
             
-            print(f"Kayıt dosyaya kaydedildi: {self.temp_file_path}")
+            self.ring_buffer.read_into(self.writer.write)
+            self.writer.close()
+            
+            if self.ring_buffer.overflow_bytes:
+                print(f"Uyarı: disk yazımı yetişemediği için {self.ring_buffer.overflow_bytes} bayt kayıt verisi atlandı")
+            print(f"Kayıt dosyaya kaydedildi: {self.temp_file_path} ({self.writer.duration:.1f} sn)")
             return True
         except Exception as e:
             print(f"Kayıt dosyası kaydedilirken hata: {e}")
             return False
     
-    def _optimize_audio(self, file_path):
-        """Ses dosyasını Speech Recognition için optimize eder"""
+    def _prepare_segment(self, ses, calibration=None):
+        """AudioSegment nesnesini ses tanıma için hazırlar ve 16 kHz mono float32 dizi döndürür
+        
+        Normalizasyon (headroom=1.0), yeniden örnekleme, mono'ya indirme ve 500 ms'den uzun
+        sessizliklerin (-40 dBFS altı) atılması NumPy ile tek geçişte yapılır.
+        calibration sözlüğü verilirse motor ölçümleri sessizlikler atılmadan önce yapılıp
+        sözlüğe yazılır; atıldıktan sonra en sessiz çerçeveler konuşmaya ait olur.
+        """
+        samples = normalize_for_asr(
+            ses.raw_data, ses.frame_rate, ses.channels, ses.sample_width,
+            target_rate=TARGET_SAMPLE_RATE,
+            headroom_db=1.0
+        )
+        if calibration is not None and len(samples):
+            calibration.update(self._calibrate_backends(samples, TARGET_SAMPLE_RATE))
+        return strip_silence(samples, TARGET_SAMPLE_RATE, silence_thresh_db=-40, silence_len_ms=500)
+    
+    def _optimize_audio(self, file_path, scratch=None, calibration=None):
+        """Ses dosyasını Speech Recognition için optimize eder
+        
+        Optimize edilmiş dosya verilen iş dizinine (JobScratch), verilmezse temp klasörüne yazılır.
+        Dosya zaten 16 kHz mono 16-bit PCM WAV ise yeniden kodlanmaz, aynı yol döndürülür.
+        calibration _prepare_segment'teki gibi doldurulur (dosya yeniden kodlanmazsa boş kalır).
+        """
         try:
+            if is_pcm_wav(file_path, TARGET_SAMPLE_RATE):
+                print("Ses dosyası zaten tanıma biçiminde (16 kHz, mono, 16 bit), dönüştürme atlandı")
+                return file_path
+            
             ses = AudioSegment.from_file(file_path)
             
             # Ses özelliklerini yazdır (debug)
             print(f"Orijinal ses: {len(ses)/1000} sn, {ses.frame_rate} Hz, {ses.channels} kanal, {ses.frame_width*8} bit")
             
-            # Normalize et - ses seviyesini standartlaştır
-            # headroom=1.0 ile aşırı yükseltmeyi önle
-            normalized = ses.normalize(headroom=1.0)
-            
-            # 16000 Hz'e dönüştür (speech recognition için optimal)
-            normalized = normalized.set_frame_rate(16000)
-            
-            # Mono kanala dönüştür
-            normalized = normalized.set_channels(1)
-            
-            # 16-bit derinliğe dönüştür
-            normalized = normalized.set_sample_width(2)
-            
-            # Sessizlik kaldırma (başta ve sonda)
-            silence_threshold = -40  # dB cinsinden, daha düşük = daha hassas
-            normalized = normalized.strip_silence(silence_thresh=silence_threshold, silence_len=500)
+            samples = self._prepare_segment(ses, calibration)
             
             # Geçici optimize edilmiş dosya oluştur
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            optimize_dosya = os.path.join(
-                self.config.temp_dir, 
-                f"optimize_{timestamp}.wav"
-            )
+            optimize_dosya = (scratch or self.temp_registry).new_path("optimize", ".wav")
             
-            # Optimize edilmiş sesi kaydet
-            normalized.export(optimize_dosya, format="wav", parameters=["-ar", "16000", "-sample_fmt", "s16"])
+            # Optimize edilmiş sesi 16-bit PCM olarak kaydet
+            writer = WavStreamWriter(optimize_dosya, 1, 2, TARGET_SAMPLE_RATE)
+            writer.write((np.clip(samples, -1.0, 1.0) * 32767).astype('<i2').tobytes())
+            writer.close()
             print(f"Ses dosyası optimize edildi: {optimize_dosya}")
-            
-            # Optimize edilmiş dosya özelliklerini kontrol et
-            optimized = AudioSegment.from_file(optimize_dosya)
-            print(f"Optimize ses: {len(optimized)/1000} sn, {optimized.frame_rate} Hz, {optimized.channels} kanal, {optimized.frame_width*8} bit")
+            print(f"Optimize ses: {writer.duration} sn, {TARGET_SAMPLE_RATE} Hz, 1 kanal, 16 bit")
             
             return optimize_dosya
             
@@ -181,77 +550,579 @@ class AudioProcessor:
             print(f"Ses optimizasyonu hatası: {e}")
             return file_path
     
-    def process_audio_file(self, file_path):
-        """Ses dosyasını metne dönüştürür"""
+    def _decode_audio(self, file_path):
+        """Ses dosyasını olduğu gibi (normalize etmeden) çözer"""
+        try:
+            ses = AudioSegment.from_file(file_path)
+            print(f"Orijinal ses: {len(ses)/1000} sn, {ses.frame_rate} Hz, {ses.channels} kanal, {ses.frame_width*8} bit")
+            return ses
+        except Exception as e:
+            print(f"Ses dosyası çözülürken hata: {e}")
+            return None
+    
+    def _audio_to_array(self, ses, calibration=None):
+        """Çözülmüş sesi normalize eder ve 16 kHz mono float32 NumPy dizisine çevirir"""
         try:
-            # Önce ses dosyasını optimize et
-            print("Ses dosyası optimize ediliyor...")
-            optimized_file = self._optimize_audio(file_path)
+            # [-1, 1] aralığında float32 dizi (Whisper'ın beklediği biçim)
+            samples = self._prepare_segment(ses, calibration)
             
-            # Ses dosyasını parçalara ayır
-            print("Ses dosyası parçalara ayrılıyor...")
-            segments = self._split_audio(optimized_file)
+            print(f"Optimize ses (bellek içi): {len(samples)/TARGET_SAMPLE_RATE} sn, {TARGET_SAMPLE_RATE} Hz, 1 kanal, float32")
+            return samples
             
-            if not segments:
-                raise Exception("Ses dosyası parçalanamadı!")
+        except Exception as e:
+            print(f"Ses dosyası belleğe yüklenirken hata: {e}")
+            return None
+    
+    def _segment_bounds(self, samples, sample_rate, chunk_length=None):
+        """Parça sınırlarını (başlangıç, bitiş) örnek indeksleri olarak döndürür
+        
+        Ses etkinliği algılama (VAD) açıksa kesimler duraksamalara denk gelir ve konuşma
+        içermeyen bölgeler atlanır; kapalıysa ses sabit uzunlukta dilimlenir.
+        chunk_length: en uzun parça süresi (ms), verilmezse Config.audio_segment_length kullanılır
+        """
+        if chunk_length is None:
+            chunk_length = self.config.audio_segment_length * 1000
+        
+        if getattr(self.config, 'vad_enabled', True):
+            bounds = vad_segments(
+                samples,
+                sample_rate,
+                max_segment_s=chunk_length / 1000,
+                min_silence_ms=getattr(self.config, 'vad_min_silence_ms', 300)
+            )
+            speech_seconds = sum(end - start for start, end in bounds) / sample_rate
+            print(f"VAD: {len(bounds)} konuşma parçası bulundu, "
+                  f"{len(samples) / sample_rate - speech_seconds:.1f} sn sessizlik atlandı")
+            return bounds
+        
+        chunk_samples = int(chunk_length * sample_rate / 1000)
+        return [(i, min(i + chunk_samples, len(samples))) for i in range(0, len(samples), chunk_samples)]
+    
+    def process_audio_file(self, file_path, progress_callback=None, cancel_token=None, known_bytes=None):
+        """Ses dosyasını metne dönüştürür
+        
+        progress_callback verilirse her parça tamamlandığında TranscriptionProgress olayı ile
+        çağrılır (parçanın metni dahil); çağrı işleme thread'inden yapılır.
+        cancel_token iptal edilirse işlem parçalar arasında durur, geçici dosyalar silinir ve
+        JobCancelled fırlatılır.
+        
+        Dosyanın başı daha önce tanınmış bir dosyayla aynıysa (uzatılmış kayıt, birleştirilmiş dosya)
+        yalnızca yeni kısım tanınır ve önceki metne eklenir. known_bytes, çağıranın metnine zaten
+        sahip olduğu baştaki ham PCM uzunluğudur; verilirse yalnızca sonrasının metni döndürülür.
+        """
+        cancel_token = cancel_token or CancellationToken()
+        scratch = None
+        segments = None
+        incremental = None
+        calibration = {}
+        
+        try:
+            start_time = time.time()
+            _emit_progress(progress_callback, TranscriptionProgress("preparing"))
             
-            # Her bir parçayı işle ve metinleri birleştir
-            transcribed_text = []
-            total_segments = len(segments)
+            cache = self._get_transcription_cache()
+            result_keys = []
             
-            for i, segment in enumerate(segments, 1):
-                print(f"\nParça {i}/{total_segments} işleniyor...")
-                
-                # İlk olarak seçilen motor ile dene
-                segment_text = None
-                
-                # Seçilen motora göre ses tanıma
-                if self.config.speech_recognition_engine == "Whisper" and WHISPER_AVAILABLE:
-                    segment_text = self._transcribe_with_whisper(segment)
-                    print("Whisper ile ses tanıma denendi")
+            # Aynı dosya aynı ayarlarla daha önce işlendiyse çözümleme yapmadan sonucu döndür
+            if cache:
+                file_key = cache.make_key("file", cache.file_hash(file_path), *self._file_cache_identity())
+                cached_text = cache.get(file_key) if not known_bytes else None
+                if cached_text:
+                    print("Transkripsiyon önbellekten alındı (dosya)")
+                    _emit_progress(progress_callback, TranscriptionProgress(
+                        "cached", 1, 1, time.time() - start_time, 0.0, cached_text
+                    ))
+                    return cached_text
+                result_keys.append(file_key)
+            
+            # Çözülünce belleğe sığmayacak kadar büyük dosyalar bloklar halinde akış olarak işlenir
+            stream_start = self._stream_start_seconds(file_path, known_bytes)
+            if stream_start is not None:
+                text, fallback_used = self._transcribe_stream(file_path, progress_callback, cancel_token,
+                                                              start_time, stream_start)
+                if not text:
+                    raise Exception("Ses tanıma başarısız oldu! Hiçbir metin çıkarılamadı.")
+                if not known_bytes and not fallback_used:
+                    for key in result_keys:
+                        cache.put(key, text)
+                return text
+            
+            # Bellek içi mod: dosya yalnızca bir kez çözülür, parçalar diziye ait görünümlerdir
+            if getattr(self.config, 'in_memory_audio', True):
+                print("Ses dosyası bellek içinde çözülüyor...")
+                ses = self._decode_audio(file_path)
+                if ses is not None:
+                    incremental = self._prepare_incremental(ses, cache, known_bytes)
+                    samples = self._audio_to_array(incremental.tail, calibration) if incremental.has_new_audio else np.zeros(0, dtype=np.float32)
                 else:
-                    # Whisper mevcut değilse veya başka bir motor seçilmişse Google kullan
-                    if self.config.speech_recognition_engine == "Whisper" and not WHISPER_AVAILABLE:
-                        print("Whisper modülü bulunamadığı için Google Speech API kullanılıyor.")
-                    segment_text = self._transcribe_with_google(segment)
-                    print("Google Speech API ile ses tanıma denendi")
+                    samples = None
                 
-                # İlk yöntem başarısız olduysa, alternatif yöntemi dene
-                if segment_text is None:
-                    print("İlk tanıma yöntemi başarısız oldu, alternatif yöntem deneniyor...")
+                if samples is not None:
+                    # Farklı dosyada aynı ses (ör. yeniden kodlanmış kopya) için normalize edilmiş içerik anahtarı
+                    if cache and not incremental.start_bytes:
+                        audio_key = cache.make_key("audio", cache.audio_hash(samples), *self._file_cache_identity())
+                        cached_text = cache.get(audio_key) if not known_bytes else None
+                        if cached_text:
+                            print("Transkripsiyon önbellekten alındı (ses içeriği)")
+                            for key in result_keys:
+                                cache.put(key, cached_text)
+                            _emit_progress(progress_callback, TranscriptionProgress(
+                                "cached", 1, 1, time.time() - start_time, 0.0, cached_text
+                            ))
+                            return cached_text
+                        result_keys.append(audio_key)
                     
-                    # Eğer Whisper başarısız olduysa, Google dene
-                    if self.config.speech_recognition_engine == "Whisper" and WHISPER_AVAILABLE:
-                        segment_text = self._transcribe_with_google(segment)
-                        print("Alternatif olarak Google Speech API denendi")
-                    # Eğer Google başarısız olduysa ve Whisper mevcutsa, Whisper dene
-                    elif WHISPER_AVAILABLE:
-                        segment_text = self._transcribe_with_whisper(segment)
-                        print("Alternatif olarak Whisper denendi")
+                    if incremental.prefix_text and not known_bytes:
+                        # Önceden tanınmış kısım editöre hemen eklenebilsin
+                        _emit_progress(progress_callback, TranscriptionProgress(
+                            "cached", 0, 0, time.time() - start_time, None, incremental.prefix_text
+                        ))
+                    
+                    bounds = self._segment_bounds(samples, TARGET_SAMPLE_RATE) if len(samples) else []
+                    incremental.bounds = bounds
+                    segments = [samples[start:end] for start, end in bounds]
+                else:
+                    incremental = None
+                    print("Bellek içi işleme başarısız oldu, dosya tabanlı işleme kullanılıyor...")
+            
+            if segments is None:
+                # Ara dosyalar bu işe özel dizine yazılır; aynı anda çalışan işler birbirini etkilemez
+                scratch = self.temp_registry.job("transcribe")
+                
+                # Önce ses dosyasını optimize et
+                print("Ses dosyası optimize ediliyor...")
+                optimized_file = self._optimize_audio(file_path, scratch, calibration)
+                
+                # Ses dosyasını parçalara ayır
+                print("Ses dosyası parçalara ayrılıyor...")
+                segments, calibration = self._split_audio(optimized_file, scratch=scratch, calibration=calibration)
+            
+            if not segments and not (incremental and incremental.start_bytes):
+                raise Exception("Ses dosyası parçalanamadı veya konuşma içermiyor!")
+            cancel_token.check()
+            
+            # Her bir parçayı işle ve metinleri orijinal sırada birleştir
+            transcribed_text = []
+            segment_texts = {}
+            total_segments = len(segments)
+            
+            # Kalan süre işlenen ses süresine göre tahmin edilir (parça süreleri bilinmiyorsa parça sayısına göre)
+            durations = [len(segment) / TARGET_SAMPLE_RATE if isinstance(segment, np.ndarray) else 1.0
+                         for segment in segments]
+            total_duration = sum(durations)
+            done_duration = 0.0
+            transcribe_start = time.time()
+            
+            # Yedek motorun ürettiği metin içeren sonuç, seçili motorun dosya önbelleğine yazılmaz
+            selected_engine = self.config.speech_recognition_engine
+            fallback_used = False
+            
+            for i, segment_text, engine in self._transcribe_segments_cached(segments, cancel_token, calibration):
+                segment = segments[i - 1]
+                fallback_used = fallback_used or (segment_text is not None and engine != selected_engine)
                 
                 if segment_text:
                     transcribed_text.append(segment_text)
+                    segment_texts[i] = segment_text
                     print(f"Parça {i} metni: {segment_text}")
                 else:
                     print(f"Parça {i} için ses tanıma başarısız oldu!")
                 
-                # Geçici dosyayı temizle
-                if os.path.exists(segment):
+                done_duration += durations[i - 1]
+                now = time.time()
+                eta = (now - transcribe_start) / done_duration * (total_duration - done_duration) if done_duration else None
+                _emit_progress(progress_callback, TranscriptionProgress(
+                    "transcribing", i, total_segments, now - start_time, eta, segment_text
+                ))
+                
+                # Geçici dosyayı temizle (yalnızca dosya tabanlı modda)
+                if isinstance(segment, str) and os.path.exists(segment):
                     os.remove(segment)
+                
+                cancel_token.check()
             
-            # Optimize edilmiş dosyayı temizle
-            if os.path.exists(optimized_file) and optimized_file != file_path:
-                os.remove(optimized_file)
+            text = " ".join(transcribed_text)
+            if incremental:
+                full_text = incremental.finish(segment_texts)
+                text = incremental.result_text(text, full_text)
+            else:
+                full_text = text
             
             # Eğer hiç metin çıkarılamadıysa hata ver
-            if not transcribed_text:
+            if not text:
                 raise Exception("Ses tanıma başarısız oldu! Hiçbir metin çıkarılamadı.")
-                
-            return " ".join(transcribed_text)
             
+            if full_text and not fallback_used:
+                for key in result_keys:
+                    cache.put(key, full_text)
+            return text
+            
+        except JobCancelled:
+            print("Ses dosyası işleme iptal edildi")
+            raise
         except Exception as e:
             print(f"Ses dosyası işlenirken hata: {e}")
             return None
+        finally:
+            # Kalan parça dosyalarını ve optimize edilmiş dosyayı temizle (hata ve iptal durumunda da)
+            if scratch:
+                scratch.cleanup()
+    
+    def _stream_start_seconds(self, file_path, known_bytes=None):
+        """Dosya akış halinde işlenecekse başlangıç noktasını (saniye), işlenmeyecekse None döndürür
+        
+        Çözülmüş (ham PCM) boyutu streaming_decode_min_mb sınırını aşan dosyalar akış halinde işlenir.
+        """
+        limit_mb = getattr(self.config, 'streaming_decode_min_mb', 256)
+        if not limit_mb or limit_mb <= 0:
+            return None
+        
+        info = probe_audio(file_path)
+        if not info:
+            return None
+        sample_rate, channels, duration = info
+        bytes_per_second = sample_rate * channels * 2
+        if duration * bytes_per_second < limit_mb * 1024 * 1024:
+            return None
+        return known_bytes / bytes_per_second if known_bytes else 0.0
+    
+    def _transcribe_stream(self, file_path, progress_callback, cancel_token, start_time, start_seconds=0.0):
+        """Dosyayı bloklar halinde çözerek tanır
+        
+        Bellekte aynı anda yalnızca bir çözülmüş blok ve en fazla STREAM_WINDOW_SECONDS saniyelik
+        parça bulunur; her pencere tanınıp metni alındıktan sonra bırakılır. (metin, yedek motor
+        kullanıldı mı) döndürür.
+        """
+        reader = PcmBlockReader(file_path, TARGET_SAMPLE_RATE, start_seconds=start_seconds)
+        total_duration = max(0.0, (reader.duration or 0.0) - start_seconds)
+        print(f"Ses dosyası akış halinde işleniyor ({total_duration / 60:.1f} dk)...")
+        
+        transcribed_text = []
+        index = 0
+        transcribe_start = time.time()
+        selected_engine = self.config.speech_recognition_engine
+        fallback_used = False
+        
+        calibration = {}
+        for window in self._stream_segment_windows(reader, cancel_token, calibration):
+            for j, segment_text, engine in self._transcribe_segments_cached(window, cancel_token, calibration):
+                index += 1
+                fallback_used = fallback_used or (segment_text is not None and engine != selected_engine)
+                if segment_text:
+                    transcribed_text.append(segment_text)
+                    print(f"Parça {index} metni: {segment_text}")
+                else:
+                    print(f"Parça {index} için ses tanıma başarısız oldu!")
+                
+                # Toplam parça sayısı bilinmediğinden okunan ses süresine göre tahmin edilir
+                done = reader.position - start_seconds
+                now = time.time()
+                eta = (now - transcribe_start) / done * (total_duration - done) if done and total_duration else None
+                total = max(index, int(index * total_duration / done)) if done and total_duration else index
+                _emit_progress(progress_callback, TranscriptionProgress(
+                    "transcribing", index, total, now - start_time, eta, segment_text
+                ))
+                cancel_token.check()
+        
+        return " ".join(transcribed_text), fallback_used
+    
+    def _stream_segment_windows(self, reader, cancel_token, calibration):
+        """Okunan bloklardan kapanan parçaları toplam süresi STREAM_WINDOW_SECONDS olan gruplar halinde üretir
+        
+        İlk bloktan yapılan ölçümler calibration sözlüğüne yazılır.
+        """
+        if getattr(self.config, 'vad_enabled', True):
+            chunker = StreamingSegmenter(
+                TARGET_SAMPLE_RATE,
+                max_segment_s=self.config.audio_segment_length,
+                min_silence_ms=max(500, getattr(self.config, 'vad_min_silence_ms', 300))
+            )
+        else:
+            chunker = FixedLengthChunker(TARGET_SAMPLE_RATE, self.config.audio_segment_length)
+        
+        window = []
+        window_samples = 0
+        calibrated = False
+        for block in reader:
+            cancel_token.check()
+            if not calibrated:
+                # Gürültü tabanı dosyanın ilk bloğundan bir kez ölçülür; parçalar tanıyıcıya aynı
+                # genlikte (normalize edilmeden) verildiğinden ölçüm ve tanıma aynı ölçektedir
+                calibration.update(self._calibrate_backends(block, TARGET_SAMPLE_RATE))
+                calibrated = True
+            
+            for segment in chunker.push(block):
+                window.append(segment)
+                window_samples += len(segment)
+            
+            if window_samples >= STREAM_WINDOW_SECONDS * TARGET_SAMPLE_RATE:
+                yield window
+                window = []
+                window_samples = 0
+        
+        tail = chunker.flush()
+        if tail is not None:
+            window.append(tail)
+        if window:
+            yield window
+    
+    def _prepare_incremental(self, ses, cache, known_bytes=None):
+        """Dosyanın daha önce tanınmış başlangıcını bulur ve tanınması gereken kalan kısmı belirler"""
+        audio_format = (ses.frame_rate, ses.channels, ses.sample_width)
+        identity = self._file_cache_identity()
+        prefix_index = TranscriptPrefixIndex(cache) if cache else None
+        prefix = prefix_index.match(ses.raw_data, audio_format, identity) if prefix_index else None
+        
+        start_bytes = prefix.known_bytes if prefix else 0
+        if known_bytes and known_bytes > start_bytes:
+            # Çağıranın bildiği kısmın metni kayıtlı değil; kalan kısım tanınır ama kontrol noktası eklenemez
+            start_bytes = known_bytes - known_bytes % ses.frame_width
+            prefix = None
+        
+        if start_bytes:
+            bytes_per_second = ses.frame_rate * ses.frame_width
+            print(f"İlk {start_bytes / bytes_per_second:.1f} sn daha önce tanınmış, yalnızca kalan "
+                  f"{(len(ses.raw_data) - start_bytes) / bytes_per_second:.1f} sn işlenecek")
+        
+        return IncrementalTranscript(ses, start_bytes, prefix, prefix_index, identity, known_bytes)
+    
+    def _get_transcription_cache(self):
+        """Ayarlarda açıksa kalıcı transkripsiyon önbelleğini döndürür"""
+        if not getattr(self.config, 'transcription_cache_enabled', True):
+            return None
+        if self._transcription_cache is None:
+            self._transcription_cache = TranscriptionCache(
+                os.path.join(self.config.cache_dir, "transcripts"),
+                getattr(self.config, 'transcription_cache_max_mb', 200) * 1024 * 1024
+            )
+        return self._transcription_cache
+    
+    def _cache_identity(self, engine=None):
+        """Parça sonucunu etkileyen motor, model ve dil bilgisi (motor verilmezse seçili motor)"""
+        engine = engine or self.config.speech_recognition_engine
+        backend = self.backends.get(engine)
+        model = backend.model_id if backend else "-"
+        return (engine, model, self.config.get_language_code())
+    
+    def _file_cache_identity(self):
+        """Dosya sonucunu etkileyen bilgiler: parça kimliğine ek olarak parçalama ayarları"""
+        return self._cache_identity() + (
+            getattr(self.config, 'vad_enabled', True),
+            self.config.audio_segment_length,
+            getattr(self.config, 'vad_min_silence_ms', 300)
+        )
+    
+    def _transcribe_segments_cached(self, segments, cancel_token, calibration=None):
+        """Önbellekte bulunan parçaları atlayıp yalnızca yenileri tanır, sonuçları sırayla üretir
+        
+        Kısmen değişmiş bir dosyada değişmeyen parçaların sonuçları yeniden kullanılır.
+        (sıra, metin, motor) üçlüleri üretilir; motor metni üreten motorun adıdır. Yedek motorun
+        ürettiği metin seçili motorun değil, kendi motorunun kimliğiyle önbelleğe yazılır.
+        """
+        cache = self._get_transcription_cache()
+        if cache is None:
+            yield from self._transcribe_segments(segments, cancel_token, calibration)
+            return
+        
+        identity = self._cache_identity()
+        hashes = []
+        for segment in segments:
+            hashes.append(cache.file_hash(segment) if isinstance(segment, str) else cache.audio_hash(segment))
+        
+        results = {}
+        pending = []
+        for i, content_hash in enumerate(hashes, 1):
+            cached_text = cache.get(cache.make_key("segment", content_hash, *identity))
+            if cached_text is not None:
+                results[i] = (cached_text, identity[0])
+            else:
+                pending.append(i)
+        
+        if results:
+            print(f"{len(results)}/{len(segments)} parça önbellekten alındı")
+        
+        next_index = 1
+        if pending:
+            for j, segment_text, engine in self._transcribe_segments([segments[i - 1] for i in pending], cancel_token, calibration):
+                i = pending[j - 1]
+                if segment_text is not None:
+                    engine_identity = self._cache_identity(engine)
+                    cache.put(cache.make_key("segment", hashes[i - 1], *engine_identity), segment_text,
+                              engine=engine_identity[0], model=engine_identity[1], language=engine_identity[2])
+                results[i] = (segment_text, engine)
+                
+                # Sırası gelmiş tüm sonuçları (önbellekten gelenler dahil) üret
+                while next_index in results:
+                    yield (next_index, *results.pop(next_index))
+                    next_index += 1
+        
+        while next_index <= len(segments):
+            yield (next_index, *results.pop(next_index, (None, None)))
+            next_index += 1
+    
+    def _get_worker_count(self):
+        """Parça tanıma için kullanılacak işçi sayısını döndürür (0 = çekirdek sayısı kadar)"""
+        workers = getattr(self.config, 'transcription_workers', 1)
+        if not workers or workers < 1:
+            workers = os.cpu_count() or 1
+        return workers
+    
+    def _transcribe_segments(self, segments, cancel_token, calibration=None):
+        """Parçaları tanır ve (sıra, metin, motor) üçlülerini orijinal sırada üretir
+        
+        Toplu çözümlemeyi destekleyen motorda parçalar gruplar halinde çözülür. Tek işçide
+        parçalar sırayla işlenir; birden fazla işçide motorun bildirdiği havuz türü
+        (süreç veya thread) kullanılır. İptal durumu her parçadan önce kontrol edilir.
+        """
+        total_segments = len(segments)
+        workers = min(self._get_worker_count(), total_segments)
+        chain = self._backend_chain()
+        
+        if not chain:
+            print("Kullanılabilir ses tanıma motoru bulunamadı!")
+            for i in range(1, total_segments + 1):
+                yield i, None, None
+            return
+        
+        primary = chain[0]
+        
+        # Toplu çözümleme tek süreçte tüm çekirdekleri kullandığından havuzlara tercih edilir;
+        # toplu boyut 1'e düşerse (ör. bellek yetersiz) süreç/thread havuzu kullanılır
+        if primary.supports_batching and total_segments > 1:
+            batch_size = self._effective_batch_size(primary)
+            if batch_size > 1:
+                yield from self._transcribe_segments_batched(segments, chain, cancel_token, batch_size, calibration)
+                return
+        
+        if workers <= 1:
+            for i, segment in enumerate(segments, 1):
+                cancel_token.check()
+                print(f"\nParça {i}/{total_segments} işleniyor...")
+                yield (i, *self._transcribe_segment_source(segment, chain, calibration))
+            return
+        
+        if primary.parallelism == "process":
+            print(f"{total_segments} parça {workers} süreçte {primary.name} ile işleniyor...")
+            yield from self._transcribe_segments_in_processes(segments, workers, chain, cancel_token, calibration)
+        else:
+            print(f"{total_segments} parça {workers} thread ile {primary.name} ile işleniyor...")
+            executor = ThreadPoolExecutor(max_workers=workers)
+            # İptalde (veya çağıran taraf erken çıkarsa) bekleyen parçalar kuyruktan atılır
+            unregister = cancel_token.on_cancel(lambda: executor.shutdown(wait=False, cancel_futures=True))
+            try:
+                futures = [executor.submit(self._transcribe_segment_source, segment, chain, calibration)
+                           for segment in segments]
+                # Sonuçlar giriş sırasıyla üretilir
+                for i, future in enumerate(futures, 1):
+                    yield (i, *wait_for(future, cancel_token))
+            finally:
+                unregister()
+                executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _effective_batch_size(self, primary):
+        """Birincil motorun toplu çözümleme boyutunu döndürür; belirlenemezse 1"""
+        try:
+            return primary.batch_size()
+        except Exception as e:
+            # Model yüklenemezse parça parça işleme (ve yedek motora geçiş) davranışı korunur
+            print(f"Toplu çözümleme başlatılamadı, parçalar tek tek işlenecek: {e}")
+            return 1
+    
+    def _transcribe_segments_batched(self, segments, chain, cancel_token, batch_size, calibration=None):
+        """Parçaları birincil motorla toplu (batch) olarak tanır, başarısız parçalar için yedek motorlara geçer
+        
+        Gruplar ayrı bir thread'de çözümlenir ve beklerken iptal düzenli aralıklarla kontrol edilir.
+        İptal belirteci motora da verilir; çalışan grubun çözümlemesi modelin bir sonraki katman
+        çağrısında kesilir, sonraki gruplar başlatılmaz.
+        """
+        total_segments = len(segments)
+        primary = chain[0]
+        primary_calibration = self._calibration_for(primary, calibration)
+        
+        print(f"{total_segments} parça {primary.name} ile {batch_size}'li gruplar halinde işleniyor...")
+        
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            for start in range(0, total_segments, batch_size):
+                cancel_token.check()
+                batch = segments[start:start + batch_size]
+                print(f"\nParça {start + 1}-{start + len(batch)}/{total_segments} işleniyor...")
+                
+                texts = wait_for(executor.submit(primary.transcribe_batch, batch, primary_calibration, cancel_token), cancel_token)
+                print(f"{primary.name} ile ses tanıma denendi")
+                
+                for offset, segment_text in enumerate(texts):
+                    engine = primary.name
+                    if segment_text is None:
+                        cancel_token.check()
+                        segment_text, engine = self._transcribe_fallback(batch[offset], chain, calibration)
+                    yield start + offset + 1, segment_text, engine
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _transcribe_segments_in_processes(self, segments, workers, chain, cancel_token, calibration=None):
+        """Parçaları birincil motorun süreç havuzunda tanır, başarısız parçalar için yedek motorlara geçer
+        
+        İptal edildiğinde işçi süreçleri hemen sonlandırılır ve çekirdekler serbest kalır.
+        """
+        # Torch thread'leri çekirdeklere paylaştırılır
+        torch_threads = max(1, (os.cpu_count() or 1) // workers)
+        initializer, initargs, worker_function = chain[0].process_pool_spec(torch_threads)
+        context = multiprocessing.get_context("spawn")
+        
+        with context.Pool(processes=workers, initializer=initializer, initargs=initargs) as pool:
+            unregister = cancel_token.on_cancel(pool.terminate)
+            try:
+                # imap sonuçları giriş sırasıyla döndürür
+                results = pool.imap(worker_function, segments)
+                for i in range(1, len(segments) + 1):
+                    while True:
+                        try:
+                            segment_text = results.next(timeout=CANCEL_POLL_INTERVAL)
+                            break
+                        except multiprocessing.TimeoutError:
+                            cancel_token.check()
+                    
+                    print(f"{chain[0].name} ile ses tanıma denendi")
+                    engine = chain[0].name
+                    if segment_text is None:
+                        segment_text, engine = self._transcribe_fallback(segments[i - 1], chain, calibration)
+                    yield i, segment_text, engine
+            finally:
+                unregister()
+    
+    def _transcribe_segment(self, segment, chain=None, calibration=None):
+        """Tek bir ses parçasını seçili motorla tanır, başarısız olursa yedek motorları sırayla dener
+        
+        segment: parça dosyasının yolu veya 16 kHz float32 NumPy dizisi
+        calibration: _calibrate_backends() ile bu iş için yapılan ölçümler
+        """
+        return self._transcribe_segment_source(segment, chain, calibration)[0]
+    
+    def _transcribe_segment_source(self, segment, chain=None, calibration=None):
+        """_transcribe_segment gibi çalışır; (metin, metni üreten motorun adı) döndürür"""
+        if chain is None:
+            chain = self._backend_chain()
+        if not chain:
+            print("Kullanılabilir ses tanıma motoru bulunamadı!")
+            return None, None
+        
+        segment_text = chain[0].transcribe(segment, self._calibration_for(chain[0], calibration))
+        print(f"{chain[0].name} ile ses tanıma denendi")
+        
+        if segment_text is None:
+            return self._transcribe_fallback(segment, chain, calibration)
+        return segment_text, chain[0].name
+    
+    def _transcribe_fallback(self, segment, chain, calibration=None):
+        """Birincil motor başarısız olduğunda parçayı yedek motorlarla sırayla dener; (metin, motor) döndürür"""
+        for backend in chain[1:]:
+            print("İlk tanıma yöntemi başarısız oldu, alternatif yöntem deneniyor...")
+            segment_text = backend.transcribe(segment, self._calibration_for(backend, calibration))
+            print(f"Alternatif olarak {backend.name} denendi")
+            if segment_text is not None:
+                return segment_text, backend.name
+        return None, None
         
     def _convert_to_wav(self, file_path):
         """Ses dosyasını wav formatına dönüştürür"""
@@ -264,12 +1135,14 @@ class AudioProcessor:
                 return file_path
             
             # Geçici wav dosyası oluştur
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_path = os.path.join(self.config.temp_dir, f"converted_{timestamp}.wav")
+            output_path = self.temp_registry.new_path("converted", ".wav")
             
-            # Dönüştürme işlemi
-            audio = AudioSegment.from_file(file_path)
-            audio.export(output_path, format="wav")
+            # Dönüştürme işlemi (ffmpeg dosyayı akış halinde dönüştürür, ses belleğe yüklenmez)
+            ffmpeg, _ = ffmpeg_binaries()
+            subprocess.run(
+                [ffmpeg, "-nostdin", "-v", "error", "-y", "-i", file_path, "-acodec", "pcm_s16le", output_path],
+                capture_output=True, check=True
+            )
             
             print(f"Ses dosyası wav formatına dönüştürüldü: {output_path}")
             return output_path
@@ -278,179 +1151,129 @@ class AudioProcessor:
             print(f"Ses dosyası dönüştürülürken hata: {e}")
             return file_path  # Hata durumunda orijinal dosyayı döndür
     
-    def _split_audio(self, file_path, chunk_length=30000):
-        """Ses dosyasını 30 saniyelik parçalara böler"""
+    def _split_audio(self, file_path, chunk_length=None, scratch=None, calibration=None):
+        """Ses dosyasını en fazla audio_segment_length saniyelik parçalara böler
+        
+        Parçalar verilen iş dizinine (JobScratch), verilmezse temp klasörüne benzersiz adlarla yazılır.
+        Motor ölçümleri (calibration) optimizasyon sırasında yapılmadıysa dosyadan ölçülür.
+        (parça yolları, motor ölçümleri) döndürür.
+        """
         try:
-            ses = AudioSegment.from_file(file_path)
+            ses = AudioSegment.from_file(file_path).set_channels(1)
             parcalar = []
             
+            # Parça sınırlarını örnek düzeyinde belirle
+            samples = np.array(ses.get_array_of_samples(), dtype=np.float32)
+            samples /= float(1 << (8 * ses.sample_width - 1))
+            bounds = self._segment_bounds(samples, ses.frame_rate, chunk_length)
+            if not calibration:
+                calibration = self._calibrate_backends(samples, ses.frame_rate)
+            
             # Sesi parçalara böl
-            for i in range(0, len(ses), chunk_length):
-                parca = ses[i:i + chunk_length]
-                parca_adi = os.path.join(
-                    self.config.temp_dir,
-                    f"parca_{i//chunk_length}.wav"
-                )
+            for index, (start, end) in enumerate(bounds):
+                parca = ses[start * 1000 // ses.frame_rate:end * 1000 // ses.frame_rate]
+                parca_adi = (scratch or self.temp_registry).new_path(f"parca_{index}", ".wav")
                 parca.export(parca_adi, format="wav")
                 parcalar.append(parca_adi)
             
-            return parcalar
+            return parcalar, calibration
             
         except Exception as e:
             print(f"Ses parçalama hatası: {e}")
-            return []
+            return [], None
     
-    def _transcribe_with_whisper(self, file_path):
-        """Whisper modelini kullanarak ses dosyasını metne dönüştürür - lazy loading uygulanmış"""
-        try:
-            # Whisper mevcut değilse çalışmaz
-            if not WHISPER_AVAILABLE:
-                print("Whisper modülü bulunamadığı için bu fonksiyon kullanılamaz.")
-                return None
-                
-            # Lazy loading - Modeli yalnızca ilk kullanımda yükle 
-            if not hasattr(self, 'whisper_model') or self.whisper_model is None:
-                print("Whisper modeli yükleniyor... (ilk kullanım)")
-                # Modelin kaydedilip kaydedilmediğini kontrol et
-                model_size = "base"  # Hız ve bellek dengesini sağlar
-                whisper_cache_dir = os.path.join(self.config.base_dir, "models", "whisper")
-                os.makedirs(whisper_cache_dir, exist_ok=True)
-                
-                try:
-                    # Özel önbellek dizini ile modeli yükle
-                    self.whisper_model = whisper.load_model(model_size, download_root=whisper_cache_dir)
-                    print("Whisper modeli yüklendi")
-                except Exception as e:
-                    print(f"Whisper modeli yüklenirken hata: {e}")
-                    # Hata durumunda varsayılan konumdan yüklemeyi dene
-                    self.whisper_model = whisper.load_model(model_size)
-                    print("Whisper modeli varsayılan konumdan yüklendi")
-            
-            # Ses dosyasını tanı
-            lang_code = self.config.get_language_code().split('-')[0]  # tr-TR -> tr
-            
-            # Daha iyi performans için CPU sabit özellikleri belirle
-            # fp16 kullanmama ve optimize edilmiş düşük kaynak kullanımı
-            result = self.whisper_model.transcribe(
-                file_path, 
-                language=lang_code,
-                fp16=False,     # CPU'da daha stabil çalışır
-                temperature=0,  # Deterministik çıktı
-                best_of=1,      # Daha hızlı çalışır
-                beam_size=1     # Daha az bellek kullanımı
-            )
-            
-            return result["text"]
-            
-        except Exception as e:
-            print(f"Whisper ile ses tanıma hatası: {e}")
-            return None
+    def _calibrate_backends(self, samples, sample_rate):
+        """Gürültü tabanı gibi dosya düzeyindeki ölçümleri motorlara bir kez yaptırır
+        
+        Motorlar aynı anda çalışan işler arasında paylaşıldığından ölçümler motor adına göre
+        bir sözlükte döndürülür ve işin parçalarıyla birlikte motorlara verilir.
+        """
+        return {backend.name: backend.calibrate(samples, sample_rate) for backend in self._backend_chain()}
+    
+    @staticmethod
+    def _calibration_for(backend, calibration):
+        """Ölçüm sözlüğünden motorun kendi ölçümünü döndürür"""
+        return calibration.get(backend.name) if calibration else None
     
-    def _transcribe_with_google(self, file_path):
-        """Google Speech API ile ses tanıma"""
+    def preload_models(self):
+        """Seçili motorun modelini arka planda yüklemeye başlar"""
+        chain = self._backend_chain()
+        if chain:
+            chain[0].preload()
+    
+    def attach_audio_file(self, file_path):
+        """Kullanıcının seçtiği ses dosyasını kopyalamadan işlenecek dosya olarak ayarlar
+        
+        Dosya mümkünse temp klasörüne sabit bağlantı (hardlink) ile bağlanır; böylece orijinal
+        taşınsa bile işlenebilir ve temizlikte yalnızca bağlantı silinir. Bağlantı kurulamazsa
+        (farklı disk, desteklemeyen dosya sistemi) orijinal dosya doğrudan kullanılır.
+        Bağlanan yolu döndürür.
+        """
+        name, ext = os.path.splitext(os.path.basename(file_path))
+        link_path = self.temp_registry.new_path(name, ext)
         try:
-            # Tanıma işlemi için ayarlar
-            self.recognizer.energy_threshold = 300  # Daha düşük değer = daha hassas
-            self.recognizer.dynamic_energy_threshold = True
-            self.recognizer.pause_threshold = 0.8  # Konuşma arasındaki duraksamalar için tolerans
-            self.recognizer.phrase_threshold = 0.3  # Daha düşük değer = daha uzun cümleler
-            
-            # Dosyayı yükle ve işle
-            with sr.AudioFile(file_path) as source:
-                # Gürültü düzeyini ayarla
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                # Ses verisini kaydet
-                audio_data = self.recognizer.record(source)
-                
-                # Farklı dil kodları deneme listesi oluştur
-                main_lang_code = self.config.get_language_code()
-                lang_codes = [main_lang_code]
-                
-                # Türkçe için alternatif dil kodları
-                if main_lang_code.startswith("tr"):
-                    lang_codes.extend(["tr", "tr-TR"])
-                # İngilizce için alternatif dil kodları
-                elif main_lang_code.startswith("en"):
-                    lang_codes.extend(["en", "en-US", "en-GB"])
-                
-                # Her dil kodu için dene
-                for lang_code in lang_codes:
-                    try:
-                        text = self.recognizer.recognize_google(
-                            audio_data,
-                            language=lang_code
-                        )
-                        print(f"Tanıma başarılı (dil: {lang_code}): {text}")
-                        return text
-                    except sr.UnknownValueError:
-                        print(f"{lang_code} ile ses tanınamadı, alternatif deneniyor...")
-                        continue
-                    except sr.RequestError as e:
-                        print(f"Google Speech Recognition servis hatası ({lang_code}): {e}")
-                        break
-                
-                # Tüm dil kodları denendi ama sonuç alınamadı
-                print("Hiçbir dil kodu ile ses tanınamadı")
-                return None
-                
-        except sr.UnknownValueError:
-            print("Google Speech Recognition ses tanıyamadı")
-            return None
-        except sr.RequestError as e:
-            print(f"Google Speech Recognition servis hatası: {e}")
-            return None
-        except Exception as e:
-            print(f"Google Speech Recognition hatası: {e}")
-            return None
+            os.link(file_path, link_path)
+            path = link_path
+        except OSError:
+            self.temp_registry.unregister(link_path)
+            path = file_path
+        
+        # Biçim yalnızca başlıktan okunur; dosya çözülmez
+        info = probe_audio(path)
+        if info:
+            sample_rate, channels, duration = info
+            print(f"Ses dosyası hazır: {path} ({duration:.1f} sn, {sample_rate} Hz, {channels} kanal)")
+        
+        self.temp_file_path = path
+        return path
     
-    def process_last_recording(self):
-        """Son kaydedilen ses dosyasını işler ve metne dönüştürür"""
+    def process_last_recording(self, progress_callback=None, cancel_token=None):
+        """Son kaydedilen ses dosyasını işler ve metne dönüştürür
+        
+        progress_callback ve cancel_token process_audio_file ile aynı şekilde kullanılır.
+        Kayıt önceki kaydın devamıysa yalnızca yeni kısmın metni döndürülür.
+        """
         try:
             if not self.temp_file_path or not os.path.exists(self.temp_file_path):
                 raise Exception("İşlenecek ses dosyası bulunamadı!")
             
+            # Kayıt sırasında canlı tanıma yapıldıysa sonucu kullan
+            live = self.live_transcription
+            if live and live.source_path == self.temp_file_path:
+                print("Canlı tanıma sonuçları bekleniyor...")
+                text = live.result(progress_callback, cancel_token)
+                if text:
+                    return text
+                print("Canlı tanıma metin üretmedi, kayıt dosyadan işleniyor...")
+            
+            # Devam ettirilen kayıtta önceki kısmın metni editörde zaten var
+            known_bytes = None
+            if self.temp_file_path == self.session_recording_path and self.session_resume_bytes:
+                known_bytes = self.session_resume_bytes
+            
             # Ses dosyasını işle
-            text = self.process_audio_file(self.temp_file_path)
+            text = self.process_audio_file(self.temp_file_path, progress_callback, cancel_token, known_bytes)
             if not text:
                 raise Exception("Ses dosyası metne dönüştürülemedi!")
                 
             return text
             
+        except JobCancelled:
+            # İptal edilen canlı tanımanın kuyruğu kapatıldı; kayıt tekrar işlenirse baştan çözülür
+            self.live_transcription = None
+            raise
         except Exception as e:
             print(f"Son kayıt işlenirken hata: {e}")
             return None
         
     def cleanup_temp_files(self, older_than_hours=24):
-        """Belirli bir süreden daha eski geçici dosyaları temizler"""
+        """Belirli bir süreden daha eski geçici dosyaları ve yarım kalmış iş dizinlerini temizler
+        
+        Yalnızca geçici dosya manifestindeki kayıtlara bakılır; temp klasörü taranmaz.
+        """
         try:
-            import time
-            from datetime import datetime, timedelta
-            
-            # Şu andan belirtilen saat kadar öncesini hesapla
-            cutoff_time = time.time() - (older_than_hours * 3600)
-            temp_dir = self.config.temp_dir
-            
-            # Temp dizinini kontrol et
-            if not os.path.exists(temp_dir):
-                return
-                
             print(f"{older_than_hours} saatten eski geçici dosyalar temizleniyor...")
-            deleted_count = 0
-            
-            for filename in os.listdir(temp_dir):
-                file_path = os.path.join(temp_dir, filename)
-                
-                # Sadece dosyaları kontrol et
-                if os.path.isfile(file_path):
-                    # Dosya oluşturma zamanını kontrol et
-                    file_time = os.path.getctime(file_path)
-                    if file_time < cutoff_time:
-                        try:
-                            os.remove(file_path)
-                            deleted_count += 1
-                        except Exception as e:
-                            print(f"Dosya silinirken hata: {e}")
-            
+            deleted_count = self.temp_registry.cleanup(older_than_hours)
             print(f"{deleted_count} geçici dosya temizlendi.")
             
         except Exception as e:
@@ -0,0 +1,426 @@
+"""
+Raporcu Ses Tanıma Performans Ölçümü
+
+Üretilmiş test sesleri (konuşmaya benzer sinyal + sessizlik aralıkları) üzerinde ses işleme
+aşamalarını tek tek ve uçtan uca çalıştırır. Her aşama için süre, gerçek zaman oranı (RTF),
+tepe bellek (RSS) ve diske yazılan geçici veri miktarı JSON olarak raporlanır; sürümler
+arasındaki performans gerilemeleri bu dosyalar karşılaştırılarak görülebilir.
+
+Google Speech ağ servisi yerine yerel bir taklit sunucu kullanılır (sabit gecikmeyle sabit metin döndürür).
+
+Kullanım:
+    python benchmark.py                                  # 1 dk, 10 dk ve 1 saatlik sesler
+    python benchmark.py --durations 60 --engines Whisper "Google Speech"
+    python benchmark.py --output sonuc.json
+"""
+
+import os
+import sys
+import json
+import time
+import wave
+import shutil
+import argparse
+import platform
+import threading
+from datetime import datetime
+from types import SimpleNamespace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from pydub import AudioSegment
+
+from config import Config
+from audio_processor import AudioProcessor
+from asr_backends import TARGET_SAMPLE_RATE
+from audio_io import PcmBlockReader
+from jobs import CancellationToken
+
+STAGES = ["prepare", "optimize", "split", "load_array", "split_array", "stream_segments", "whisper", "google", "process_audio_file"]
+
+# Taklit Google sunucusunun döndürdüğü sabit metin
+STUB_TRANSCRIPT = "deney düzeneği hazırlandı ve ölçümler alındı"
+
+
+def generate_fixture(path, duration_s, sample_rate=44100, seed=0):
+    """Konuşmaya benzer bölümler ve aralarında sessizlik içeren 16-bit mono WAV dosyası üretir
+
+    Konuşma bölümleri harmonikli, perdesi değişen bir ses kaynağı ile hece hızında (4 Hz)
+    genlik zarfı ve sürtünmeli ses benzeri gürültüden oluşur. Dosya bölüm bölüm yazıldığından
+    uzun sürelerde bellek kullanımı sabittir.
+    """
+    rng = np.random.default_rng(seed)
+    total_samples = int(duration_s * sample_rate)
+    written = 0
+
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+
+        while written < total_samples:
+            for length_s, speech in ((rng.uniform(2.0, 8.0), True), (rng.uniform(0.3, 2.0), False)):
+                length = min(int(length_s * sample_rate), total_samples - written)
+                if length <= 0:
+                    break
+
+                # Arka plan gürültüsü her yerde bulunur
+                block = rng.normal(0.0, 0.003, length)
+                if speech:
+                    t = np.arange(length) / sample_rate
+                    f0 = rng.uniform(100, 220) * (1 + 0.15 * np.sin(2 * np.pi * rng.uniform(0.3, 0.8) * t))
+                    phase = 2 * np.pi * np.cumsum(f0) / sample_rate
+                    voiced = sum(np.sin(k * phase) / k for k in range(1, 9))
+                    envelope = np.clip(np.sin(2 * np.pi * rng.uniform(3.0, 5.0) * t), 0, None) ** 0.5
+                    fricative = rng.normal(0.0, 1.0, length) * (envelope < 0.2)
+                    block += rng.uniform(0.1, 0.3) * (envelope * voiced * 0.6 + fricative * 0.1)
+
+                wf.writeframes((np.clip(block, -1.0, 1.0) * 32767).astype(np.int16).tobytes())
+                written += length
+
+
+class _StubGoogleHandler(BaseHTTPRequestHandler):
+    """Google Speech v2 yanıt biçiminde sabit metin döndüren taklit sunucu"""
+    protocol_version = "HTTP/1.1"  # Bağlantıların yeniden kullanılabilmesi için
+    latency = 0.3
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.latency)
+
+        body = (
+            '{"result":[]}\n'
+            + json.dumps({
+                "result": [{"alternative": [{"transcript": STUB_TRANSCRIPT, "confidence": 0.9}], "final": True}],
+                "result_index": 0
+            }, ensure_ascii=False)
+            + "\n"
+        ).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_google(latency_s):
+    """Taklit Google sunucusunu rastgele bir yerel portta başlatır ve adresini döndürür"""
+    handler = type("StubGoogleHandler", (_StubGoogleHandler,), {"latency": latency_s})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/speech-api/v2/recognize"
+
+
+class ResourceMonitor:
+    """Bir aşama süresince tepe bellek kullanımını, geçici dizin boyutunu ve disk yazımını ölçer
+
+    psutil kuruluysa süreç ve alt süreçlerin (Whisper işçileri) toplam RSS değeri örneklenir;
+    değilse işletim sisteminin bildirdiği süreç ömrü boyunca tepe değer kullanılır.
+    """
+
+    def __init__(self, temp_dir, interval=0.05):
+        self.temp_dir = temp_dir
+        self.interval = interval
+        self.peak_rss = 0
+        self.temp_peak = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._process = None
+        self._write_start = None
+
+        try:
+            import psutil
+            self._process = psutil.Process()
+        except ImportError:
+            pass
+
+    def _rss(self):
+        if self._process is None:
+            try:
+                import resource
+                peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+                # Linux kilobayt, macOS bayt olarak bildirir
+                return peak if sys.platform == "darwin" else peak * 1024
+            except (ImportError, AttributeError):
+                return 0
+
+        total = 0
+        for process in [self._process] + self._process.children(recursive=True):
+            try:
+                total += process.memory_info().rss
+            except Exception:
+                continue
+        return total
+
+    def _write_bytes(self):
+        if self._process is None:
+            return None
+        try:
+            total = self._process.io_counters().write_bytes
+            for child in self._process.children(recursive=True):
+                try:
+                    total += child.io_counters().write_bytes
+                except Exception:
+                    continue
+            return total
+        except Exception:
+            return None
+
+    def _temp_size(self):
+        total = 0
+        for root, _, files in os.walk(self.temp_dir):
+            for name in files:
+                try:
+                    total += os.path.getsize(os.path.join(root, name))
+                except OSError:
+                    continue
+        return total
+
+    def _sample(self):
+        self.peak_rss = max(self.peak_rss, self._rss())
+        self.temp_peak = max(self.temp_peak, self._temp_size() - self._temp_start)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self):
+        self._temp_start = self._temp_size()
+        self._write_start = self._write_bytes()
+        self._sample()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self._sample()
+
+        write_end = self._write_bytes()
+        self.disk_write_bytes = (
+            write_end - self._write_start
+            if write_end is not None and self._write_start is not None else None
+        )
+        return False
+
+
+def run_stage(results, name, audio_duration, temp_dir, function, *args):
+    """Aşamayı ölçerek çalıştırır, sonucu results sözlüğüne yazar ve fonksiyonun dönüşünü verir"""
+    print(f"  - {name}...", flush=True)
+    error = None
+    value = None
+
+    start = time.perf_counter()
+    with ResourceMonitor(temp_dir) as monitor:
+        try:
+            value = function(*args)
+        except Exception as e:
+            error = str(e)
+    wall = time.perf_counter() - start
+
+    results[name] = {
+        "wall_s": round(wall, 3),
+        "rtf": round(wall / audio_duration, 5) if audio_duration else None,
+        "peak_rss_bytes": monitor.peak_rss,
+        "temp_peak_bytes": monitor.temp_peak,
+        "disk_write_bytes": monitor.disk_write_bytes,
+    }
+    if error:
+        results[name]["error"] = error
+    print(f"    {wall:.2f} sn (RTF {results[name]['rtf']})", flush=True)
+    return value
+
+
+def transcribe_all(backend, segments, calibration=None):
+    """Parçaları tek tek tanır ve tanınan parça sayısını döndürür"""
+    return sum(1 for segment in segments if backend.transcribe(segment, calibration))
+
+
+def pydub_prepare(ses):
+    """Önceki pydub zinciri (normalize, set_frame_rate, set_channels, set_sample_width, strip_silence); karşılaştırma için"""
+    normalized = ses.normalize(headroom=1.0)
+    normalized = normalized.set_frame_rate(TARGET_SAMPLE_RATE).set_channels(1).set_sample_width(2)
+    normalized = normalized.strip_silence(silence_thresh=-40, silence_len=500)
+    samples = np.frombuffer(normalized.raw_data, dtype=np.int16).astype(np.float32)
+    samples /= 32768.0
+    return samples
+
+
+def load_array(processor, fixture_path, calibration):
+    """Dosyayı process_audio_file'ın bellek içi yolundaki gibi bir kez çözüp 16 kHz float32 diziye çevirir"""
+    ses = processor._decode_audio(fixture_path)
+    return processor._audio_to_array(ses, calibration) if ses is not None else None
+
+
+def split_array(processor, samples):
+    """process_audio_file gibi parça sınırlarını bulur ve diziye ait görünümleri döndürür"""
+    return [samples[start:end] for start, end in processor._segment_bounds(samples, TARGET_SAMPLE_RATE)]
+
+
+def stream_segments(processor, fixture_path):
+    """Dosyayı akış halinde çözüp parçalar ve parça sayısını döndürür (tanıma yapılmaz)"""
+    reader = PcmBlockReader(fixture_path, TARGET_SAMPLE_RATE)
+    return sum(len(window) for window in processor._stream_segment_windows(reader, CancellationToken(), {}))
+
+
+def benchmark_fixture(processor, fixture_path, duration_s, stages, engines):
+    """Bir test sesi üzerinde seçili aşamaları çalıştırır"""
+    config = processor.config
+    temp_dir = config.temp_dir
+    results = {}
+
+    if "prepare" in stages:
+        # Aynı çözülmüş ses üzerinde pydub zinciri ile NumPy ön işlemesi karşılaştırılır
+        ses = AudioSegment.from_file(fixture_path)
+        legacy = run_stage(results, "prepare_pydub", duration_s, temp_dir, pydub_prepare, ses)
+        prepared = run_stage(results, "prepare_numpy", duration_s, temp_dir, processor._prepare_segment, ses)
+        if results["prepare_numpy"]["wall_s"]:
+            results["prepare_numpy"]["speedup"] = round(
+                results["prepare_pydub"]["wall_s"] / results["prepare_numpy"]["wall_s"], 2
+            )
+        if legacy is not None and prepared is not None:
+            results["prepare_numpy"]["output_seconds"] = round(len(prepared) / TARGET_SAMPLE_RATE, 2)
+            results["prepare_pydub"]["output_seconds"] = round(len(legacy) / TARGET_SAMPLE_RATE, 2)
+        del ses, legacy, prepared
+
+    if "optimize" in stages or "split" in stages:
+        with processor.temp_registry.job("benchmark") as scratch:
+            optimized = run_stage(results, "optimize", duration_s, temp_dir,
+                                  processor._optimize_audio, fixture_path, scratch)
+            if "split" in stages and optimized:
+                parts, _ = run_stage(results, "split", duration_s, temp_dir,
+                                     processor._split_audio, optimized, None, scratch) or ([], None)
+                results["split"]["segments"] = len(parts)
+
+    segments = []
+    calibration = {}
+    if {"load_array", "split_array", "whisper", "google"} & set(stages):
+        samples = run_stage(results, "load_array", duration_s, temp_dir, load_array, processor, fixture_path, calibration)
+        if samples is not None:
+            segments = run_stage(results, "split_array", duration_s, temp_dir, split_array, processor, samples) or []
+            results["split_array"]["segments"] = len(segments)
+
+    if "stream_segments" in stages:
+        count = run_stage(results, "stream_segments", duration_s, temp_dir, stream_segments, processor, fixture_path)
+        results["stream_segments"]["segments"] = count
+
+    if "whisper" in stages and "Whisper" in engines:
+        backend = processor.backends["Whisper"]
+        if backend.is_available():
+            run_stage(results, "whisper_model_load", duration_s, temp_dir, backend.model_manager.get)
+            recognized = run_stage(results, "whisper", duration_s, temp_dir, transcribe_all, backend, segments)
+            results["whisper"]["recognized_segments"] = recognized
+        else:
+            results["whisper"] = {"skipped": "Whisper modülü bulunamadı"}
+
+    if "google" in stages and "Google Speech" in engines and segments:
+        backend = processor.backends["Google Speech"]
+        recognized = run_stage(results, "google", duration_s, temp_dir, transcribe_all, backend, segments,
+                               processor._calibration_for(backend, calibration))
+        results["google"]["recognized_segments"] = recognized
+
+    if "process_audio_file" in stages:
+        for engine in engines:
+            config.speech_recognition_engine = engine
+            name = f"process_audio_file[{engine}]"
+            text = run_stage(results, name, duration_s, temp_dir, processor.process_audio_file, fixture_path)
+            results[name]["text_chars"] = len(text or "")
+
+    return results
+
+
+def format_duration(seconds):
+    """60 -> 1m, 3600 -> 1h"""
+    if seconds % 3600 == 0:
+        return f"{seconds // 3600}h"
+    if seconds % 60 == 0:
+        return f"{seconds // 60}m"
+    return f"{seconds}s"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raporcu ses tanıma performans ölçümü")
+    parser.add_argument("--durations", type=int, nargs="+", default=[60, 600, 3600],
+                        help="Test seslerinin süreleri (saniye)")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES,
+                        help="Çalıştırılacak aşamalar")
+    parser.add_argument("--engines", nargs="+", default=["Whisper", "Google Speech"],
+                        help="Uçtan uca ölçümde kullanılacak motorlar")
+    parser.add_argument("--fixture-rate", type=int, default=44100,
+                        help="Test seslerinin örnekleme hızı (Hz)")
+    parser.add_argument("--google-latency-ms", type=int, default=300,
+                        help="Taklit Google sunucusunun yanıt gecikmesi")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="transcription_workers ayarını geçersiz kılar")
+    parser.add_argument("--work-dir", default=None,
+                        help="Test sesleri ve geçici dosyalar için dizin")
+    parser.add_argument("--output", default=None, help="JSON raporun yazılacağı dosya")
+    args = parser.parse_args()
+
+    config = Config(async_load=False)
+    work_dir = args.work_dir or os.path.join(config.base_dir, "benchmark")
+    fixtures_dir = os.path.join(work_dir, "fixtures")
+    os.makedirs(fixtures_dir, exist_ok=True)
+
+    # Ölçümler uygulamanın geçici dosyalarını ve önbelleğini etkilemez; önbellek her çalıştırmada soğuktur
+    config.temp_dir = os.path.join(work_dir, "temp")
+    shutil.rmtree(config.temp_dir, ignore_errors=True)
+    os.makedirs(config.temp_dir, exist_ok=True)
+    config.transcription_cache_enabled = False
+    config.live_transcription = False
+    if args.workers is not None:
+        config.transcription_workers = args.workers
+
+    server, config.google_speech_url = start_stub_google(args.google_latency_ms / 1000)
+    processor = AudioProcessor(SimpleNamespace(config=config))
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+        "settings": {
+            "whisper_model_size": config.whisper_model_size,
+            "transcription_workers": config.transcription_workers,
+            "whisper_batch_size": config.whisper_batch_size,
+            "vad_enabled": config.vad_enabled,
+            "audio_segment_length": config.audio_segment_length,
+            "in_memory_audio": config.in_memory_audio,
+            "fixture_rate": args.fixture_rate,
+            "google_latency_ms": args.google_latency_ms,
+        },
+        "fixtures": []
+    }
+
+    try:
+        for duration_s in args.durations:
+            name = format_duration(duration_s)
+            fixture_path = os.path.join(fixtures_dir, f"fixture_{name}_{args.fixture_rate}.wav")
+            if not os.path.exists(fixture_path):
+                print(f"Test sesi üretiliyor: {fixture_path}", flush=True)
+                generate_fixture(fixture_path, duration_s, args.fixture_rate)
+
+            print(f"\n{name} test sesi ölçülüyor...", flush=True)
+            report["fixtures"].append({
+                "name": name,
+                "duration_s": duration_s,
+                "file_bytes": os.path.getsize(fixture_path),
+                "stages": benchmark_fixture(processor, fixture_path, duration_s, args.stages, args.engines)
+            })
+    finally:
+        server.shutdown()
+
+    output = args.output or os.path.join(work_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nSonuçlar kaydedildi: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,46 +19,72 @@ class Config:
     def _initialize_base_settings(self):
         """Temel ayarları yükle"""
         # AI Model seçenekleri
+        # max_tokens: bağlam penceresi, output_tokens: yanıta ayrılan bütçe,
+        # input_price / output_price: 1 milyon token başına USD (maliyet tahmini için)
         self.available_models = {
             "Gemini 2.0 Flash": {
                 "name": "gemini-2.0-flash",
                 "provider": "Google",
-                "max_tokens": 30720
+                "max_tokens": 30720,
+                "output_tokens": 8192,
+                "input_price": 0.1,
+                "output_price": 0.4
             },
             "Gemini 2.5 Flash": {
                 "name": "gemini-2.5-flash-preview-05-20",
                 "provider": "Google", 
-                "max_tokens": 30720
+                "max_tokens": 30720,
+                "output_tokens": 8192,
+                "input_price": 0.15,
+                "output_price": 0.6
             },
             "Gemini 2.5 Pro": {
                 "name": "gemini-2.5-pro-preview-05-06",
                 "provider": "Google",
-                "max_tokens": 30720
+                "max_tokens": 30720,
+                "output_tokens": 8192,
+                "input_price": 1.25,
+                "output_price": 10.0
             },
             "Claude 3 Opus": {
                 "name": "claude-3-opus",
                 "provider": "Anthropic",
-                "max_tokens": 200000
+                "max_tokens": 200000,
+                "output_tokens": 4096,
+                "input_price": 15.0,
+                "output_price": 75.0
             },
             "Claude 3 Sonnet": {
                 "name": "claude-3-sonnet",
                 "provider": "Anthropic",
-                "max_tokens": 100000
+                "max_tokens": 100000,
+                "output_tokens": 4096,
+                "input_price": 3.0,
+                "output_price": 15.0
             },
             "GPT-4 Turbo": {
                 "name": "gpt-4-turbo-preview",
                 "provider": "OpenAI",
-                "max_tokens": 128000
+                "max_tokens": 128000,
+                "output_tokens": 4096,
+                "input_price": 10.0,
+                "output_price": 30.0
             },
             "GPT-4": {
                 "name": "gpt-4",
                 "provider": "OpenAI",
-                "max_tokens": 8192
+                "max_tokens": 8192,
+                "output_tokens": 2048,
+                "input_price": 30.0,
+                "output_price": 60.0
             },
             "GPT-3.5 Turbo": {
                 "name": "gpt-3.5-turbo",
                 "provider": "OpenAI",
-                "max_tokens": 4096
+                "max_tokens": 4096,
+                "output_tokens": 1024,
+                "input_price": 0.5,
+                "output_price": 1.5
             }
         }
 
@@ -71,10 +97,34 @@ class Config:
             "Anthropic": "",
             "OpenAI": ""
         }
+        self.stream_responses = True  # Rapor metnini model ürettikçe parça parça göster
+        self.response_cache_enabled = True  # Aynı model ve istem için alınmış yanıtı diskten yeniden kullan
+        self.response_cache_ttl_hours = 168  # Önbellekteki yanıtın geçerlilik süresi (0 = süresiz)
+        self.response_cache_max_mb = 50  # Yanıt önbelleği boyut sınırı; aşılınca en eski kayıtlar silinir
+        self.reference_retrieval_enabled = True  # Uzun referans metinden yalnızca deneyle ilgili bölümleri gönder
+        self.reference_retrieval_min_chars = 12000  # Bu uzunluktan kısa referans metinler olduğu gibi gönderilir
+        self.reference_top_k = 8  # Uzun referans metinden seçilecek bölüm sayısı
         
-        self.speech_recognition_engine = "Whisper"
+        self.speech_recognition_engine = "Whisper"  # Whisper, Faster Whisper veya Google Speech
+        self.asr_fallback_order = ["Whisper", "Google Speech"]  # Seçili motor başarısız olursa sırayla denenecek motorlar
+        self.google_speech_url = "http://www.google.com/speech-api/v2/recognize"  # Testte yerel bir tanıma sunucusu verilebilir
+        self.google_speech_api_key = ""  # Google Speech API anahtarı (boşsa SpeechRecognition kütüphanesinin varsayılanı)
         self.language = "Türkçe"
-        self.audio_segment_length = 30  # saniye
+        self.audio_segment_length = 30  # saniye (VAD açıkken en uzun parça süresi)
+        self.vad_enabled = True  # Parçaları duraksamalardan kes, sessiz bölgeleri atla
+        self.vad_min_silence_ms = 300  # Kesim için gereken en kısa duraksama (ms)
+        self.in_memory_audio = True  # Ses dosyasını bir kez çözüp parçaları bellekte işle
+        self.streaming_decode_min_mb = 256  # Çözülmüş boyutu bunu aşan dosyalar bloklar halinde akış olarak işlenir (0 = kapalı)
+        self.live_transcription = True  # Kayıt sürerken kapanan konuşma parçalarını arka planda tanı
+        self.continue_recording_session = False  # Açılırsa yeni kayıt önceki kaydın sonuna eklenir ve yalnızca yeni kısım tanınır
+        self.recording_sample_rate = 16000  # Mikrofon kayıt hızı (Hz); 16000 tanıma için yeniden örnekleme gerektirmez
+        self.transcription_cache_enabled = True  # Aynı ses için transkripsiyonu diskten yeniden kullan
+        self.transcription_cache_max_mb = 200  # Önbellek boyut sınırı; aşılınca en eski kayıtlar silinir
+        self.transcription_workers = 1  # Paralel parça tanıma işçi sayısı (1 = sıralı, 0 = çekirdek sayısı)
+        self.whisper_batch_size = 0  # Whisper toplu çözümleme boyutu (0 = belleğe göre otomatik, 1 = kapalı)
+        self.whisper_model_size = "base"  # tiny, base, small, medium, large
+        self.whisper_idle_unload_minutes = 10  # Kullanılmayan model bu süre sonra bellekten çıkarılır (0 = hiçbir zaman)
+        self.faster_whisper_compute_type = "int8"  # Faster Whisper ağırlık türü (int8, int8_float32, float32)
         
         # YENİ: Kullanıcı arayüzü ayarları
         self.theme = "Sistem"  # Sistem, Koyu veya Açık
@@ -84,6 +134,7 @@ class Config:
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.audio_dir = os.path.join(self.base_dir, "audio_files")
         self.temp_dir = os.path.join(self.base_dir, "temp")
+        self.cache_dir = os.path.join(self.base_dir, "cache")
         self.config_file = os.path.join(self.base_dir, "settings.json")
         self.templates_dir = os.path.join(self.base_dir, "templates")
         
@@ -91,14 +142,21 @@ class Config:
         self.active_template = "standard"  # Varsayılan şablon
         self.templates = {}  # Şablonlar bu sözlükte saklanacak
         
+        # Kayıtlı ayarlar okunduğunda kurulur (arka planda yüklemede bekleyenler için)
+        self.settings_loaded = threading.Event()
+        
         # Kritik klasörleri oluştur
         os.makedirs(self.audio_dir, exist_ok=True)
         os.makedirs(self.temp_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
         os.makedirs(self.templates_dir, exist_ok=True)
     
     def _load_additional_settings(self):
         """Ek ayarları arka planda yükle"""
-        self.load_settings()
+        try:
+            self.load_settings()
+        finally:
+            self.settings_loaded.set()
         self.load_templates()
     
     def load_settings(self):
@@ -116,10 +174,34 @@ class Config:
                 for provider in self.api_keys:
                     if provider in saved_api_keys:
                         self.api_keys[provider] = saved_api_keys[provider]
+                self.stream_responses = settings.get('stream_responses', self.stream_responses)
+                self.response_cache_enabled = settings.get('response_cache_enabled', self.response_cache_enabled)
+                self.response_cache_ttl_hours = settings.get('response_cache_ttl_hours', self.response_cache_ttl_hours)
+                self.response_cache_max_mb = settings.get('response_cache_max_mb', self.response_cache_max_mb)
+                self.reference_retrieval_enabled = settings.get('reference_retrieval_enabled', self.reference_retrieval_enabled)
+                self.reference_retrieval_min_chars = settings.get('reference_retrieval_min_chars', self.reference_retrieval_min_chars)
+                self.reference_top_k = settings.get('reference_top_k', self.reference_top_k)
                 
                 self.speech_recognition_engine = settings.get('speech_recognition_engine', self.speech_recognition_engine)
+                self.asr_fallback_order = settings.get('asr_fallback_order', self.asr_fallback_order)
+                self.google_speech_url = settings.get('google_speech_url', self.google_speech_url)
+                self.google_speech_api_key = settings.get('google_speech_api_key', self.google_speech_api_key)
                 self.language = settings.get('language', self.language)
                 self.audio_segment_length = settings.get('audio_segment_length', self.audio_segment_length)
+                self.vad_enabled = settings.get('vad_enabled', self.vad_enabled)
+                self.vad_min_silence_ms = settings.get('vad_min_silence_ms', self.vad_min_silence_ms)
+                self.in_memory_audio = settings.get('in_memory_audio', self.in_memory_audio)
+                self.streaming_decode_min_mb = settings.get('streaming_decode_min_mb', self.streaming_decode_min_mb)
+                self.live_transcription = settings.get('live_transcription', self.live_transcription)
+                self.continue_recording_session = settings.get('continue_recording_session', self.continue_recording_session)
+                self.recording_sample_rate = settings.get('recording_sample_rate', self.recording_sample_rate)
+                self.transcription_cache_enabled = settings.get('transcription_cache_enabled', self.transcription_cache_enabled)
+                self.transcription_cache_max_mb = settings.get('transcription_cache_max_mb', self.transcription_cache_max_mb)
+                self.transcription_workers = settings.get('transcription_workers', self.transcription_workers)
+                self.whisper_batch_size = settings.get('whisper_batch_size', self.whisper_batch_size)
+                self.whisper_model_size = settings.get('whisper_model_size', self.whisper_model_size)
+                self.whisper_idle_unload_minutes = settings.get('whisper_idle_unload_minutes', self.whisper_idle_unload_minutes)
+                self.faster_whisper_compute_type = settings.get('faster_whisper_compute_type', self.faster_whisper_compute_type)
                 
                 # YENİ: Kullanıcı arayüzü ayarlarını yükle
                 self.theme = settings.get('theme', self.theme)
@@ -139,9 +221,33 @@ class Config:
             settings = {
                 'ai_model': self.ai_model,
                 'api_keys': self.api_keys,
+                'stream_responses': self.stream_responses,
+                'response_cache_enabled': self.response_cache_enabled,
+                'response_cache_ttl_hours': self.response_cache_ttl_hours,
+                'response_cache_max_mb': self.response_cache_max_mb,
+                'reference_retrieval_enabled': self.reference_retrieval_enabled,
+                'reference_retrieval_min_chars': self.reference_retrieval_min_chars,
+                'reference_top_k': self.reference_top_k,
                 'speech_recognition_engine': self.speech_recognition_engine,
+                'asr_fallback_order': self.asr_fallback_order,
+                'google_speech_url': self.google_speech_url,
+                'google_speech_api_key': self.google_speech_api_key,
                 'language': self.language,
                 'audio_segment_length': self.audio_segment_length,
+                'vad_enabled': self.vad_enabled,
+                'vad_min_silence_ms': self.vad_min_silence_ms,
+                'in_memory_audio': self.in_memory_audio,
+                'streaming_decode_min_mb': self.streaming_decode_min_mb,
+                'live_transcription': self.live_transcription,
+                'continue_recording_session': self.continue_recording_session,
+                'recording_sample_rate': self.recording_sample_rate,
+                'transcription_cache_enabled': self.transcription_cache_enabled,
+                'transcription_cache_max_mb': self.transcription_cache_max_mb,
+                'transcription_workers': self.transcription_workers,
+                'whisper_batch_size': self.whisper_batch_size,
+                'whisper_model_size': self.whisper_model_size,
+                'whisper_idle_unload_minutes': self.whisper_idle_unload_minutes,
+                'faster_whisper_compute_type': self.faster_whisper_compute_type,
                 'window': getattr(self, 'window_settings', {"geometry": "1200x800", "state": "normal"}),
                 'theme': self.theme,
                 'font_size': self.font_size,
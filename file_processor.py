@@ -366,19 +366,20 @@ class FileProcessor:
     def save_as_pdf(self, text_content, output_path, metadata=None, config_instance=None):
         """Metni PDF dosyası olarak kaydeder"""
         try:
-            # Önce DOCX olarak kaydet
-            temp_dir = tempfile.gettempdir()
-            temp_docx = os.path.join(temp_dir, "temp_report.docx")
+            # Önce DOCX olarak kaydet (aynı anda yapılan dışa aktarımlar çakışmasın diye benzersiz adla)
+            temp_handle, temp_docx = tempfile.mkstemp(prefix="rapor_", suffix=".docx")
+            os.close(temp_handle)
             
-            # DOCX dosyasını oluştur - aynı config örneğini ilet
-            self.save_as_docx(text_content, temp_docx, metadata, config_instance)
-            
-            # DOCX'i PDF'e dönüştür
-            self.convert_docx_to_pdf(temp_docx, output_path)
-            
-            # Geçici dosyayı sil
-            if os.path.exists(temp_docx):
-                os.remove(temp_docx)
+            try:
+                # DOCX dosyasını oluştur - aynı config örneğini ilet
+                self.save_as_docx(text_content, temp_docx, metadata, config_instance)
+                
+                # DOCX'i PDF'e dönüştür
+                self.convert_docx_to_pdf(temp_docx, output_path)
+            finally:
+                # Geçici dosyayı sil
+                if os.path.exists(temp_docx):
+                    os.remove(temp_docx)
                 
             return True
         except Exception as e:
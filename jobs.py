@@ -0,0 +1,304 @@
+"""
+Arka Plan İşleri - iptal belirteci, iş başına geçici çalışma dizinleri ve yardımcıları
+"""
+
+import errno
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import CancelledError as FutureCancelledError
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import datetime
+
+# Dosya kilidi işletim sistemine göre seçilir
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+# İptal durumunun bekleme sırasında kontrol edilme aralığı (saniye)
+CANCEL_POLL_INTERVAL = 0.25
+
+# Windows'ta manifest kilidi alınamazsa denemeler arası bekleme ve en uzun bekleme süresi (saniye)
+LOCK_RETRY_INTERVAL = 0.1
+LOCK_TIMEOUT = 60.0
+
+
+class JobCancelled(Exception):
+    """İş kullanıcı tarafından iptal edildiğinde fırlatılır"""
+
+
+class CancellationToken:
+    """Uzun süren bir işin (transkripsiyon, rapor oluşturma) iptal edilmesini sağlar
+
+    İş adımlar arasında check() çağırır. İptal anında hemen durdurulması gereken kaynaklar
+    (süreç havuzu, HTTP istemcisi) on_cancel() ile kaydedilir; cancel() bunları çağıran
+    thread'de hemen kapatır, böylece çekirdekler bir sonraki iş için serbest kalır.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def cancel(self):
+        """İşi iptal eder ve kayıtlı kapatma fonksiyonlarını çağırır"""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"İptal sırasında kaynak kapatılamadı: {e}")
+
+    def check(self):
+        """İş iptal edildiyse JobCancelled fırlatır"""
+        if self._event.is_set():
+            raise JobCancelled("İşlem iptal edildi")
+
+    def on_cancel(self, callback):
+        """İptalde çağrılacak fonksiyonu kaydeder ve kaydı silen bir fonksiyon döndürür
+
+        İş zaten iptal edildiyse fonksiyon hemen çağrılır.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+
+                def unregister():
+                    with self._lock:
+                        if callback in self._callbacks:
+                            self._callbacks.remove(callback)
+                return unregister
+
+        callback()
+        return lambda: None
+
+
+def wait_for(future, cancel_token):
+    """Future sonucunu beklerken iptal durumunu düzenli aralıklarla kontrol eder
+
+    İptal sırasında havuz kapatılınca bekleyen future'lar da iptal edilir; bu durumda
+    CancelledError yerine JobCancelled fırlatılır.
+    """
+    while True:
+        try:
+            return future.result(timeout=CANCEL_POLL_INTERVAL)
+        except FutureTimeoutError:
+            cancel_token.check()
+        except FutureCancelledError:
+            cancel_token.check()
+            raise
+
+
+class ManifestLock:
+    """Hem aynı süreçteki thread'ler hem de farklı süreçler arasında geçerli kilit
+
+    with bloğunda kilit dosyası üzerinde işletim sisteminin özel kilidi (POSIX'te flock,
+    Windows'ta msvcrt.locking) tutulur; süreç çökerse kilit işletim sistemince bırakılır.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.Lock()
+        self._file = None
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        try:
+            self._file = open(self.path, "a+b")
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_windows()
+        except Exception:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._thread_lock.release()
+            raise
+        return self
+
+    def _lock_windows(self):
+        """msvcrt kilidini yalnızca başka bir süreç tuttuğu sürece, LOCK_TIMEOUT'a kadar yeniden dener"""
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            self._file.seek(0)
+            try:
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError as e:
+                # msvcrt kilit çakışmasını EACCES/EDEADLOCK ile bildirir; diğer hatalar beklemekle düzelmez
+                if e.errno not in (errno.EACCES, errno.EDEADLOCK):
+                    raise
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Manifest kilidi {LOCK_TIMEOUT:.0f} saniyede alınamadı: {self.path}") from e
+            time.sleep(LOCK_RETRY_INTERVAL)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            else:
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+        finally:
+            self._file.close()
+            self._file = None
+            self._thread_lock.release()
+
+
+class TempRegistry:
+    """Geçici dosyaların kaydını tutar
+
+    Her dosya benzersiz bir adla oluşturulur ve oluşturulma zamanı temp klasöründeki küçük bir
+    manifest dosyasına yazılır. Temizlik yalnızca manifestteki süresi dolmuş kayıtlara bakar;
+    klasörün tamamı taranmaz. İşlere özel dosyalar job() ile açılan JobScratch dizinlerinde tutulur.
+
+    Aynı temp klasörünü birden fazla süreç (ör. komut satırı işçileri) kullanabildiğinden
+    manifest her okuma-değiştirme-yazma döngüsünde bir kilit dosyasıyla süreçler arasında kilitlenir.
+    """
+
+    MANIFEST_NAME = "manifest.json"
+    LOCK_NAME = "manifest.lock"
+    JOBS_DIR_NAME = "jobs"
+
+    def __init__(self, root):
+        self.root = root
+        self.jobs_dir = os.path.join(root, self.JOBS_DIR_NAME)
+        self.manifest_path = os.path.join(root, self.MANIFEST_NAME)
+        self.lock_path = os.path.join(root, self.LOCK_NAME)
+        self._lock = ManifestLock(self.lock_path)
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def new_path(self, prefix, suffix=""):
+        """Temp klasöründe benzersiz bir dosya yolu oluşturur ve kaydeder"""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(self.root, f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}")
+        self.register(path)
+        return path
+
+    def register(self, path):
+        """Var olan bir dosyayı (ör. kopyalanan görsel) temizlik için kaydeder"""
+        with self._lock:
+            entries = self._read_manifest()
+            entries[os.path.relpath(path, self.root)] = time.time()
+            self._write_manifest(entries)
+
+    def unregister(self, path):
+        with self._lock:
+            entries = self._read_manifest()
+            if entries.pop(os.path.relpath(path, self.root), None) is not None:
+                self._write_manifest(entries)
+
+    def job(self, kind):
+        """Bir iş için benzersiz bir çalışma dizini açar"""
+        return JobScratch(self, kind)
+
+    def cleanup(self, older_than_hours=24):
+        """Manifestteki süresi dolmuş dosya ve iş dizinlerini siler, silinen kayıt sayısını döndürür"""
+        cutoff_time = time.time() - older_than_hours * 3600
+        deleted_count = 0
+
+        with self._lock:
+            if not os.path.exists(self.manifest_path):
+                # Manifest öncesinden kalan dosyalar bir kez kaydedilir, sonraki temizliklerde süreleri dolunca silinir
+                entries = self._adopt_untracked_files()
+            else:
+                entries = self._read_manifest()
+
+            for name, created in list(entries.items()):
+                if created >= cutoff_time:
+                    continue
+                path = os.path.join(self.root, name)
+                try:
+                    if os.path.isdir(path):
+                        shutil.rmtree(path)
+                    elif os.path.exists(path):
+                        os.remove(path)
+                    del entries[name]
+                    deleted_count += 1
+                except Exception as e:
+                    print(f"Geçici dosya silinirken hata: {e}")
+
+            self._write_manifest(entries)
+        return deleted_count
+
+    def _adopt_untracked_files(self):
+        entries = {}
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name in (self.MANIFEST_NAME, self.LOCK_NAME) or path == self.jobs_dir:
+                continue
+            try:
+                entries[name] = os.path.getctime(path)
+            except OSError:
+                pass
+        for name in os.listdir(self.jobs_dir):
+            path = os.path.join(self.jobs_dir, name)
+            try:
+                entries[os.path.relpath(path, self.root)] = os.path.getctime(path)
+            except OSError:
+                pass
+        return entries
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, entries):
+        # Yarım yazılmış manifest bırakmamak için önce geçici dosyaya yazılır
+        temp_path = f"{self.manifest_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.manifest_path)
+        except OSError as e:
+            print(f"Geçici dosya manifesti yazılamadı: {e}")
+
+
+class JobScratch:
+    """Tek bir işe ait geçici çalışma dizini
+
+    Dizin adı benzersizdir, böylece aynı anda çalışan işler birbirinin dosyalarının üzerine yazmaz.
+    with bloğu veya cleanup() ile dizin tüm içeriğiyle silinir; uygulama çökerse dizin
+    manifestte kalır ve sonraki açılışta süresi dolunca temizlenir.
+    """
+
+    def __init__(self, registry, kind):
+        self.registry = registry
+        self.path = tempfile.mkdtemp(prefix=f"{kind}_", dir=registry.jobs_dir)
+        self._counter = itertools.count()
+        registry.register(self.path)
+
+    def new_path(self, prefix, suffix=""):
+        """Çalışma dizininde benzersiz bir dosya yolu döndürür"""
+        return os.path.join(self.path, f"{prefix}_{next(self._counter)}{suffix}")
+
+    def cleanup(self):
+        """Çalışma dizinini siler ve manifestten çıkarır"""
+        shutil.rmtree(self.path, ignore_errors=True)
+        self.registry.unregister(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.cleanup()
@@ -1,6 +1,7 @@
 import os
 import sys
 import threading
+import multiprocessing
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import customtkinter as ctk
@@ -15,10 +16,14 @@ from config import Config
 from audio_processor import AudioProcessor
 from file_processor import FileProcessor
 from ai_service import AIService
+from jobs import CancellationToken, JobCancelled
 from utils import center_window
 from version import __version__
 from update_checker import UpdateChecker
 
+# Akış halinde gelen rapor metninin editöre toplu eklenme aralığı (ms)
+STREAM_INSERT_INTERVAL_MS = 80
+
 class RaporApp(ctk.CTk):
     def __init__(self):
         super().__init__()
@@ -122,6 +127,9 @@ class RaporApp(ctk.CTk):
         self.file_processor = FileProcessor()
         self.ai_service = AIService(self.config)
         
+        # API anahtarı varsa istemci ve TLS bağlantısı ilk rapor isteğinden önce hazırlanır
+        self.ai_service.prewarm()
+        
         # Başlangıçta geçici dosyaları temizle (72 saatten eski dosyalar)
         threading.Thread(target=self.audio_processor.cleanup_temp_files, args=(72,), daemon=True).start()
         
@@ -267,6 +275,10 @@ class RaporApp(ctk.CTk):
         )
         self.record_btn.grid(row=0, column=0, padx=5, pady=5, sticky="ew")
         
+        # İmleç veya klavye odağı butona gelince mikrofon arka planda açılır, kayıt anında başlar
+        self.record_btn.bind("<Enter>", lambda event: self.audio_processor.preopen_input_stream())
+        self.record_btn.bind("<FocusIn>", lambda event: self.audio_processor.preopen_input_stream())
+        
         self.pause_btn = ctk.CTkButton(
             self.audio_buttons_frame,
             text="⏸️ Duraklat",
@@ -372,10 +384,23 @@ class RaporApp(ctk.CTk):
         )
         self.save_pdf_btn.grid(row=0, column=1, padx=5, pady=5, sticky="ew")
         
+        # İşaretliyse aynı girdilerle daha önce oluşturulmuş rapor yerine yeni rapor istenir
+        self.fresh_report_var = tk.BooleanVar(value=False)
+        self.fresh_report_check = ctk.CTkCheckBox(
+            self.save_buttons_frame,
+            text="Önbelleği atla (yeni rapor)",
+            variable=self.fresh_report_var
+        )
+        self.fresh_report_check.grid(row=0, column=2, padx=5, pady=5, sticky="e")
+        
         # Kayıt durumu değişkenleri
         self.recording = False
         self.paused = False
         
+        # Devam eden işlerin iptal belirteçleri
+        self.audio_job_token = None
+        self.report_job_token = None
+        
         # Sonuç çerçevesi
         self.create_result_frame()
     
@@ -573,21 +598,19 @@ class RaporApp(ctk.CTk):
         )
         
         if file_path:
-            # Dosyayı temp klasörüne kopyala
-            file_name = os.path.basename(file_path)
-            temp_path = os.path.join(self.config.temp_dir, file_name)
+            # Dosya hazırlanırken Whisper modeli arka planda yüklenir
+            self.audio_processor.preload_models()
             
             # İlerleme göstergesini güncelle
             self.audio_progress.set_status("Ses Dosyası Yükleniyor...")
             self.audio_progress.start_indeterminate()
             
-            def copy_file():
+            def attach_file():
                 try:
-                    shutil.copy2(file_path, temp_path)
+                    # Dosya kopyalanmaz; temp klasörüne bağlanır veya doğrudan kullanılır
+                    self.audio_processor.attach_audio_file(file_path)
                     
                     def update_ui():
-                        # Dosya yolunu sakla ve butonları güncelle
-                        self.audio_processor.temp_file_path = temp_path
                         self.audio_progress.set_status("Ses Dosyası Hazır")
                         self.audio_progress.stop()
                         self.process_audio_btn.configure(state="normal")
@@ -595,13 +618,13 @@ class RaporApp(ctk.CTk):
                     self.after(0, update_ui)
                 except Exception as e:
                     def show_error():
-                        messagebox.showerror("Hata", f"Dosya kopyalanırken bir hata oluştu: {str(e)}")
+                        messagebox.showerror("Hata", f"Dosya yüklenirken bir hata oluştu: {str(e)}")
                         self.audio_progress.set_error("Dosya Yüklenemedi!")
                     
                     self.after(0, show_error)
             
-            # Arka planda kopyalama işlemini yap
-            threading.Thread(target=copy_file, daemon=True).start()
+            # Başlık okuma (ffprobe) arayüzü bekletmesin diye arka planda yapılır
+            threading.Thread(target=attach_file, daemon=True).start()
 
     def process_recorded_audio(self):
         """Kaydedilmiş sesi işler"""
@@ -609,26 +632,65 @@ class RaporApp(ctk.CTk):
             # İlerleme göstergesini güncelle
             self.audio_progress.set_status("Ses Dosyası İşleniyor...")
             self.audio_progress.start_indeterminate()
-            self.process_audio_btn.configure(state="disabled")
+            
+            # İşlem sürerken buton iptal butonuna dönüşür
+            cancel_token = CancellationToken()
+            self.audio_job_token = cancel_token
+            self.process_audio_btn.configure(state="normal", text="⏹️ İptal", command=self.cancel_audio_job)
+            
+            def restore_button():
+                if self.audio_job_token is cancel_token:
+                    self.audio_job_token = None
+                self.process_audio_btn.configure(state="normal", text="🔄 Ses İşle", command=self.process_recorded_audio)
+            
+            # Parça metinleri tamamlandıkça editöre eklenir; kullanıcı kalan kısım işlenirken düzenleyebilir
+            stream_state = {"total": 0, "inserted": False}
+            
+            def show_progress(event):
+                if cancel_token.cancelled:
+                    return
+                if event.stage == "preparing":
+                    self.audio_progress.set_status("Ses dosyası hazırlanıyor...")
+                    return
+                
+                if event.stage == "cached" and not event.total:
+                    # Dosyanın daha önce tanınmış başlangıcı; yalnızca yeni kısım işlenecek
+                    self.audio_progress.set_status("Önceden tanınan kısım eklendi, yeni kısım işleniyor...")
+                    if event.text and event.text.strip():
+                        self.append_procedure_text(event.text.strip(), continuation=stream_state["inserted"])
+                        stream_state["inserted"] = True
+                    return
+                
+                if event.total != stream_state["total"]:
+                    stream_state["total"] = event.total
+                    self.audio_progress.start_determinate(event.total)
+                self.audio_progress.set_current_step(event.segment)
+                
+                status = f"Parça {event.segment}/{event.total} işlendi"
+                if event.eta:
+                    status += f" - kalan süre ~{int(event.eta) // 60}:{int(event.eta) % 60:02d}"
+                self.audio_progress.set_status(status)
+                
+                if event.text and event.text.strip():
+                    self.append_procedure_text(event.text.strip(), continuation=stream_state["inserted"])
+                    stream_state["inserted"] = True
+            
+            def on_progress(event):
+                self.after(0, lambda: show_progress(event))
             
             def process_audio():
                 try:
-                    # İlerleme göstergesini güncelle
-                    self.audio_progress.set_status("Ses dosyası işleniyor...")
-                    self.audio_progress.start_indeterminate()
-                    
                     # Son kaydedilen ses dosyasını işle
-                    text = self.audio_processor.process_last_recording()
+                    text = self.audio_processor.process_last_recording(
+                        progress_callback=on_progress,
+                        cancel_token=cancel_token
+                    )
                     
                     def update_ui():
                         if text:
-                            # Metni prosedür alanına ekle
-                            current_text = self.procedure_text.get("1.0", tk.END).strip()
-                            if current_text:
-                                text_to_add = f"\n{text}"
-                            else:
-                                text_to_add = text
-                            self.procedure_text.insert(tk.END, text_to_add)
+                            # Metin parça parça eklenmediyse (ör. ilerleme olayı gelmediyse) tamamını ekle
+                            if not stream_state["inserted"]:
+                                self.append_procedure_text(text)
                             
                             # İlerleme göstergesini güncelle
                             self.audio_progress.set_success("Ses Başarıyla İşlendi")
@@ -651,16 +713,23 @@ class RaporApp(ctk.CTk):
                             if result:
                                 self.open_settings()
                         
-                        self.process_audio_btn.configure(state="normal")
+                        restore_button()
                     
                     self.after(0, update_ui)
                     
+                except JobCancelled:
+                    def show_cancelled():
+                        self.audio_progress.set_error("İptal edildi")
+                        restore_button()
+                    
+                    self.after(0, show_cancelled)
+                    
                 except Exception as e:
                     def show_error():
                         error_msg = str(e)
                         messagebox.showerror("Hata", f"Ses işlenirken bir hata oluştu: {error_msg}")
                         self.audio_progress.set_error("Hata: " + error_msg)
-                        self.process_audio_btn.configure(state="normal")
+                        restore_button()
                     
                     self.after(0, show_error)
             
@@ -669,12 +738,35 @@ class RaporApp(ctk.CTk):
         except Exception as e:
             messagebox.showerror("Hata", f"Ses işleme başlatılamadı: {str(e)}")
             self.audio_progress.set_error("Hata!")
-            self.process_audio_btn.configure(state="normal")
+            self.audio_job_token = None
+            self.process_audio_btn.configure(state="normal", text="🔄 Ses İşle", command=self.process_recorded_audio)
             
         except Exception as e:
             messagebox.showerror("Hata", f"Beklenmeyen bir hata oluştu: {str(e)}")
             self.process_audio_btn.configure(state="normal")
 
+    def cancel_audio_job(self):
+        """Devam eden ses işleme işini iptal eder"""
+        if self.audio_job_token:
+            self.audio_progress.set_status("İptal ediliyor...")
+            self.process_audio_btn.configure(state="disabled")
+            # Süreç havuzu kapatma gibi bloklayabilen işlemler arayüzü dondurmasın
+            threading.Thread(target=self.audio_job_token.cancel, daemon=True).start()
+
+    def append_procedure_text(self, text, continuation=False):
+        """Metni prosedür alanının sonuna ekler
+        
+        continuation: aynı transkripsiyonun devamıysa boşlukla, değilse yeni satırda eklenir
+        """
+        current_text = self.procedure_text.get("1.0", tk.END).strip()
+        if not current_text:
+            text_to_add = text
+        elif continuation:
+            text_to_add = f" {text}"
+        else:
+            text_to_add = f"\n{text}"
+        self.procedure_text.insert(tk.END, text_to_add)
+    
     def upload_reference_file(self):
         """Referans dosyası yükleme"""
         file_path = filedialog.askopenfilename(
@@ -701,6 +793,9 @@ class RaporApp(ctk.CTk):
                         # Metin boşsa direkt ekle
                         self.reference_text.insert("1.0", text_content)
                     
+                    # Uzun referanslar için erişim dizini rapor istenmeden önce arka planda hazırlanır
+                    self.ai_service.prepare_reference(self.reference_text.get("1.0", tk.END).strip())
+                    
                     messagebox.showinfo("Bilgi", "Referans dosyası başarıyla yüklendi.")
                 else:
                     messagebox.showwarning("Uyarı", "Dosyadan metin çıkarılamadı. Farklı bir dosya deneyin.")
@@ -742,7 +837,15 @@ class RaporApp(ctk.CTk):
             return
         
         # Durum güncelleme
-        self.generate_btn.configure(state="disabled", text="Rapor Oluşturuluyor...")
+        # İşlem sürerken buton iptal butonuna dönüşür
+        cancel_token = CancellationToken()
+        self.report_job_token = cancel_token
+        self.generate_btn.configure(state="normal", text="⏹️ İptal Et", command=self.cancel_report_job)
+        
+        def restore_button():
+            if self.report_job_token is cancel_token:
+                self.report_job_token = None
+            self.generate_btn.configure(state="normal", text="Rapor Oluştur", command=self.generate_report)
         
         # AI İlerleme göstergesini güncelle
         self.ai_progress.reset()
@@ -750,6 +853,42 @@ class RaporApp(ctk.CTk):
         self.ai_progress.start_indeterminate()
         self.update_idletasks()
         
+        # Tk değişkenleri arka plan thread'inden okunmaz
+        use_fresh_report = self.fresh_report_var.get()
+        
+        # Akış halinde gelen metin biriktirilir ve editöre belirli aralıklarla tek seferde eklenir
+        stream_state = {"pending": [], "scheduled": False, "started": False, "finished": False}
+        stream_lock = threading.Lock()
+        
+        def flush_stream():
+            with stream_lock:
+                text = "".join(stream_state["pending"])
+                stream_state["pending"] = []
+                stream_state["scheduled"] = False
+            if not text or stream_state["finished"] or cancel_token.cancelled:
+                return
+            if not stream_state["started"]:
+                stream_state["started"] = True
+                self.result_text.delete("1.0", tk.END)
+                self.ai_progress.set_status(f"{self.config.ai_model} raporu yazıyor...")
+            self.result_text.insert(tk.END, text)
+            self.result_text.see(tk.END)
+        
+        def on_text(text):
+            with stream_lock:
+                stream_state["pending"].append(text)
+                if stream_state["scheduled"]:
+                    return
+                stream_state["scheduled"] = True
+            self.after(STREAM_INSERT_INTERVAL_MS, flush_stream)
+        
+        def on_budget(budget):
+            # Tahmini token ve maliyet istek gönderilmeden önce gösterilir
+            def show_budget():
+                if not stream_state["started"] and not cancel_token.cancelled:
+                    self.ai_progress.set_status(f"{self.config.ai_model} ile rapor oluşturuluyor ({budget.describe()})")
+            self.after(0, show_budget)
+        
         # Arka planda rapor oluştur
         def generate_in_background():
             try:
@@ -757,7 +896,13 @@ class RaporApp(ctk.CTk):
                 start_time = time.time()
                 
                 # Yapay zeka ile rapor oluştur
-                report = self.ai_service.generate_report(deney_basligi, deneyin_yapilisi, referans_metin)
+                report = self.ai_service.generate_report(
+                    deney_basligi, deneyin_yapilisi, referans_metin,
+                    cancel_token=cancel_token,
+                    on_text=on_text if getattr(self.config, 'stream_responses', True) else None,
+                    use_cache=not use_fresh_report,
+                    on_budget=on_budget
+                )
                 
                 # Geçen süreyi hesapla
                 elapsed_time = time.time() - start_time
@@ -765,6 +910,8 @@ class RaporApp(ctk.CTk):
                 
                 # UI thread'inde sonuçları güncelle
                 def update_ui():
+                    # Akışla eklenen ham metin biçimlendirilmiş raporla değiştirilir
+                    stream_state["finished"] = True
                     if report and not report.startswith("API hatası") and not report.startswith("Beklenmeyen bir hata"):
                         # Eğer raporun başında bir açıklama veya teşekkür varsa kaldır
                         # Direkt olarak başlıkla başlamasını sağla
@@ -849,7 +996,13 @@ class RaporApp(ctk.CTk):
                         # Kaydetme butonlarını etkinleştir
                         self.save_docx_btn.configure(state="normal")
                         self.save_pdf_btn.configure(state="normal")
-                        self.ai_progress.set_success(f"Rapor {elapsed_time:.1f} saniyede oluşturuldu")
+                        status = f"Rapor {elapsed_time:.1f} saniyede oluşturuldu"
+                        ttft = self.ai_service.last_metrics.get("ttft_s")
+                        if self.ai_service.last_metrics.get("cached"):
+                            status = "Rapor önbellekten alındı"
+                        elif stream_state["started"] and ttft is not None:
+                            status += f" (ilk metin {ttft:.1f} sn)"
+                        self.ai_progress.set_success(status)
                     else:
                         error_msg = report if report else "Bilinmeyen bir hata oluştu."
                         self.result_text.delete("1.0", tk.END)
@@ -857,10 +1010,17 @@ class RaporApp(ctk.CTk):
                         self.ai_progress.set_error("Rapor oluşturulamadı!")
                         messagebox.showerror("Hata", f"Rapor oluşturulurken bir sorun oluştu:\n\n{error_msg}")
                     
-                    self.generate_btn.configure(state="normal", text="Rapor Oluştur")
+                    restore_button()
                 
                 self.after(0, update_ui)
                 
+            except JobCancelled:
+                def show_cancelled():
+                    self.ai_progress.set_error("İptal edildi")
+                    restore_button()
+                
+                self.after(0, show_cancelled)
+                
             except Exception as e:
                 def show_error():
                     error_msg = str(e)
@@ -868,13 +1028,20 @@ class RaporApp(ctk.CTk):
                     self.result_text.delete("1.0", tk.END)
                     self.result_text.insert("1.0", f"Hata: {error_msg}\n\nLütfen ayarlarınızı kontrol edin ve tekrar deneyin.")
                     messagebox.showerror("Hata", f"Rapor oluşturulurken bir hata oluştu: {error_msg}")
-                    self.generate_btn.configure(state="normal", text="Rapor Oluştur")
+                    restore_button()
                 
                 self.after(0, show_error)
         
         # Arka planda çalıştır
         threading.Thread(target=generate_in_background, daemon=True).start()
     
+    def cancel_report_job(self):
+        """Devam eden rapor oluşturma işini iptal eder"""
+        if self.report_job_token:
+            self.ai_progress.set_status("İptal ediliyor...")
+            self.generate_btn.configure(state="disabled")
+            self.report_job_token.cancel()
+    
     def save_report_as(self, format_type):
         """Oluşturulan raporu belirli bir formatta dosyaya kaydetme"""
         deney_basligi = self.title_entry.get().strip()
@@ -985,8 +1152,9 @@ class RaporApp(ctk.CTk):
                 img_filename = f"img_{timestamp}_{os.path.basename(file_path)}"
                 img_dest = os.path.join(self.config.temp_dir, img_filename)
                 
-                # Dosyayı kopyala
+                # Dosyayı kopyala ve geçici dosya temizliği için kaydet
                 shutil.copy2(file_path, img_dest)
+                self.audio_processor.temp_registry.register(img_dest)
                 
                 # Raporun sonuna görsel bilgisi ekle
                 cursor_pos = self.result_text.index(tk.INSERT)
@@ -1280,6 +1448,14 @@ class RaporApp(ctk.CTk):
                 self.audio_processor.recording = False  # Doğrudan recording değişkenini false yap
                 # Kayıt thread'inin tamamlanmasını bekleme (bloke etmemek için)
             
+            # Önceden açılmış ancak kullanılmamış mikrofon akışını kapat
+            self.audio_processor.release_input_stream()
+            
+            # Devam eden transkripsiyon ve rapor işlerini iptal et (süreç havuzu kapatılır)
+            for token in (getattr(self, 'audio_job_token', None), getattr(self, 'report_job_token', None)):
+                if token:
+                    token.cancel()
+            
             # Mevcut pencere durumunu kaydet
             if sys.platform == 'win32':
                 current_state = "zoomed" if self.state() == 'zoomed' else "normal"
@@ -1313,6 +1489,9 @@ class RaporApp(ctk.CTk):
 
 
 def main():
+    # Paketlenmiş (PyInstaller) sürümde süreç havuzu işçilerinin doğru başlaması için
+    multiprocessing.freeze_support()
+    
     # Uygulama klasörlerini oluştur
     os.makedirs("audio_files", exist_ok=True)
     os.makedirs("temp", exist_ok=True)
@@ -0,0 +1,178 @@
+"""
+Whisper Model Yöneticisi - önceden yükleme, boşta bellekten çıkarma ve bellek eşlemeli yükleme
+"""
+
+import gc
+import os
+import threading
+import time
+
+# Whisper modülünü isteğe bağlı olarak içe aktarma
+try:
+    import whisper
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
+
+WHISPER_MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+
+# Bu süreçte SHA256 doğrulaması yapılmış model dosyaları (yeniden yüklemede tekrar okunmaz)
+_verified_checkpoints = set()
+_verify_lock = threading.Lock()
+
+
+def _checkpoint_path(model_size, download_root):
+    """Model dosyasının yolunu döndürür; dosya yoksa indirir, ilk kullanımda bütünlüğünü doğrular"""
+    url = whisper._MODELS[model_size]
+    path = os.path.join(download_root, os.path.basename(url))
+
+    with _verify_lock:
+        if path not in _verified_checkpoints:
+            # whisper._download dosya varsa içeriğini doğrular, yoksa indirir
+            path = whisper._download(url, download_root, in_memory=False)
+            _verified_checkpoints.add(path)
+    return path
+
+
+def load_whisper_model(model_size, download_root, device="cpu"):
+    """Whisper modelini ağırlıkları bellek eşlemeli (mmap) açarak yükler
+
+    Ağırlıklar dosyadan kopyalanmak yerine işletim sisteminin sayfa önbelleğinden eşlenir;
+    böylece yeniden yükleme ucuzdur ve aynı modeli kullanan süreçler belleği paylaşır.
+    Herhangi bir adım başarısız olursa whisper.load_model ile standart yüklemeye dönülür.
+    """
+    try:
+        import torch
+        from whisper.model import ModelDimensions, Whisper
+
+        checkpoint = torch.load(
+            _checkpoint_path(model_size, download_root),
+            map_location=device,
+            mmap=True,
+            weights_only=True
+        )
+        model = Whisper(ModelDimensions(**checkpoint["dims"]))
+        # assign=True eşlenmiş tensörleri kopyalamadan modele bağlar
+        model.load_state_dict(checkpoint["model_state_dict"], assign=True)
+
+        alignment_heads = getattr(whisper, "_ALIGNMENT_HEADS", {}).get(model_size)
+        if alignment_heads is not None:
+            model.set_alignment_heads(alignment_heads)
+
+        return model.to(device)
+    except Exception as e:
+        print(f"Bellek eşlemeli model yüklemesi başarısız, standart yükleme kullanılıyor: {e}")
+
+    try:
+        return whisper.load_model(model_size, download_root=download_root)
+    except Exception as e:
+        print(f"Whisper modeli yüklenirken hata: {e}")
+        # Hata durumunda varsayılan konumdan yüklemeyi dene
+        return whisper.load_model(model_size)
+
+
+class WhisperModelManager:
+    """Whisper modelinin yaşam döngüsünü yönetir
+
+    - Model boyutu Config.whisper_model_size ayarından okunur
+    - preload() modeli arka planda yüklemeye başlar (kayıt başlarken / dosya yüklenirken)
+    - Model whisper_idle_unload_minutes boyunca kullanılmazsa bellekten çıkarılır
+
+    loader(model_size, download_root) farklı Whisper uygulamalarının (ör. CTranslate2)
+    aynı yaşam döngüsüyle yönetilmesini sağlar; model dosyaları models/<subdir> altında tutulur.
+    """
+
+    def __init__(self, config, loader=load_whisper_model, subdir="whisper"):
+        self.config = config
+        self.loader = loader
+        self.subdir = subdir
+        self._model = None
+        self._loaded_size = None
+        self._lock = threading.Lock()
+        self._preload_thread = None
+        self._idle_timer = None
+        self._last_used = time.monotonic()
+
+    @property
+    def model_size(self):
+        """Ayarlardaki model boyutu"""
+        size = getattr(self.config, 'whisper_model_size', 'base')
+        return size if size in WHISPER_MODEL_SIZES else 'base'
+
+    @property
+    def download_root(self):
+        """Model dosyalarının saklandığı dizin"""
+        path = os.path.join(self.config.base_dir, "models", self.subdir)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def is_loaded(self):
+        return self._model is not None and self._loaded_size == self.model_size
+
+    def get(self):
+        """Modeli döndürür; yüklü değilse (veya boyut değiştiyse) yükler"""
+        with self._lock:
+            if not self.is_loaded():
+                self._load()
+            self._touch()
+            return self._model
+
+    def preload(self):
+        """Modeli arka planda yüklemeye başlar; zaten yüklüyse veya yükleniyorsa bir şey yapmaz"""
+        if self.is_loaded():
+            return
+        if self._preload_thread and self._preload_thread.is_alive():
+            return
+
+        def run():
+            try:
+                self.get()
+            except Exception as e:
+                print(f"Whisper modeli önceden yüklenemedi: {e}")
+
+        self._preload_thread = threading.Thread(target=run, daemon=True)
+        self._preload_thread.start()
+
+    def unload(self):
+        """Modeli bellekten çıkarır"""
+        with self._lock:
+            if self._model is None:
+                return
+            self._model = None
+            self._loaded_size = None
+            if self._idle_timer:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+        gc.collect()
+        print("Whisper modeli bellekten çıkarıldı (boşta kaldı)")
+
+    def _load(self):
+        model_size = self.model_size
+        print(f"Whisper modeli yükleniyor ({model_size})...")
+        start_time = time.time()
+
+        # Boyut değiştiyse eski modeli yenisi yüklenmeden bırak
+        self._model = None
+        self._model = self.loader(model_size, self.download_root)
+        self._loaded_size = model_size
+
+        print(f"Whisper modeli {time.time() - start_time:.1f} saniyede yüklendi")
+
+    def _touch(self):
+        """Son kullanım zamanını günceller ve boşta bekleme zamanlayıcısını yeniden kurar"""
+        self._last_used = time.monotonic()
+
+        idle_minutes = getattr(self.config, 'whisper_idle_unload_minutes', 10)
+        if not idle_minutes or idle_minutes <= 0:
+            return
+
+        if self._idle_timer:
+            self._idle_timer.cancel()
+        self._idle_timer = threading.Timer(idle_minutes * 60, self._unload_if_idle)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _unload_if_idle(self):
+        idle_minutes = getattr(self.config, 'whisper_idle_unload_minutes', 10)
+        if idle_minutes and time.monotonic() - self._last_used >= idle_minutes * 60:
+            self.unload()
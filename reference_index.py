@@ -0,0 +1,234 @@
+"""
+Referans Metin Erişim Dizini - uzun referans belgelerinden deneyle ilgili bölümleri BM25 ile seçer
+"""
+
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from token_budget import OMISSION_MARKER
+
+# Parça uzunluğu ve ardışık parçaların örtüşmesi (kelime)
+CHUNK_WORDS = 180
+CHUNK_OVERLAP = 40
+
+# BM25 parametreleri
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Türkçe eklerin etkisini azaltmak için kelimelerin yalnızca ilk harfleri karşılaştırılır
+STEM_LENGTH = 6
+
+STOPWORDS = {
+    "ve", "ile", "bir", "bu", "şu", "da", "de", "ki", "için", "gibi", "olan", "olarak", "daha",
+    "çok", "en", "ise", "veya", "ya", "her", "kadar", "sonra", "önce", "göre", "ama", "fakat",
+    "the", "of", "and", "to", "in", "is", "for", "on", "with", "as", "by", "an", "are", "be",
+}
+
+_WORD_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    """Metni küçük harfe çevrilmiş, kısaltılmış (kök benzeri) terimlere ayırır"""
+    # Türkçe büyük I/İ harfleri str.lower() ile doğru dönüşmez
+    text = text.replace("I", "ı").replace("İ", "i").lower()
+    return [word[:STEM_LENGTH] for word in _WORD_PATTERN.findall(text)
+            if len(word) > 1 and word not in STOPWORDS and not word.isdigit()]
+
+
+def chunk_spans(text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """Metni örtüşen kelime pencerelerine böler, (başlangıç, bitiş) karakter aralıklarını döndürür"""
+    words = [match.span() for match in re.finditer(r"\S+", text)]
+    if not words:
+        return []
+
+    spans = []
+    step = max(1, chunk_words - overlap)
+    for start in range(0, len(words), step):
+        end = min(start + chunk_words, len(words))
+        spans.append((words[start][0], words[end - 1][1]))
+        if end == len(words):
+            break
+    return spans
+
+
+class ReferenceIndex:
+    """Tek bir referans metnin parçaları üzerinde BM25 dizini
+
+    Terim frekansları seyrek (COO) biçimde NumPy dizilerinde tutulur: her (parça, terim) çifti
+    için bir kayıt. Sorgu puanı yalnızca sorgu terimlerinin kayıtları üzerinden hesaplanır.
+    """
+
+    def __init__(self, spans, vocabulary, doc_ids, term_ids, term_freqs, doc_lengths):
+        self.spans = spans
+        self.vocabulary = vocabulary
+        self.doc_ids = doc_ids
+        self.term_ids = term_ids
+        self.term_freqs = term_freqs
+        self.doc_lengths = doc_lengths
+
+        # Sorgu sırasında terim kayıtlarını hızlı bulmak için kayıtlar terime göre sıralanır
+        order = np.argsort(term_ids, kind="stable")
+        self.doc_ids, self.term_ids, self.term_freqs = doc_ids[order], term_ids[order], term_freqs[order]
+        self._term_starts = np.searchsorted(self.term_ids, np.arange(len(vocabulary) + 1))
+
+        doc_count = len(spans)
+        doc_freqs = np.diff(self._term_starts)
+        self._idf = np.log1p((doc_count - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        average_length = float(doc_lengths.mean()) if doc_count else 0.0
+        self._length_norm = (BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(average_length, 1.0))).astype(np.float32)
+
+    @classmethod
+    def build(cls, text):
+        spans = chunk_spans(text)
+        vocabulary = {}
+        doc_ids, term_ids, term_freqs, doc_lengths = [], [], [], []
+
+        for doc_id, (start, end) in enumerate(spans):
+            terms = tokenize(text[start:end])
+            doc_lengths.append(len(terms))
+            counts = {}
+            for term in terms:
+                term_id = vocabulary.setdefault(term, len(vocabulary))
+                counts[term_id] = counts.get(term_id, 0) + 1
+            doc_ids.extend([doc_id] * len(counts))
+            term_ids.extend(counts.keys())
+            term_freqs.extend(counts.values())
+
+        return cls(
+            spans, vocabulary,
+            np.array(doc_ids, dtype=np.int32),
+            np.array(term_ids, dtype=np.int32),
+            np.array(term_freqs, dtype=np.float32),
+            np.array(doc_lengths, dtype=np.float32)
+        )
+
+    def scores(self, query):
+        """Her parça için sorguya göre BM25 puanını döndürür"""
+        scores = np.zeros(len(self.spans), dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self._term_starts[term_id], self._term_starts[term_id + 1]
+            docs = self.doc_ids[start:end]
+            freqs = self.term_freqs[start:end]
+            scores[docs] += self._idf[term_id] * freqs * (BM25_K1 + 1) / (freqs + self._length_norm[docs])
+        return scores
+
+    def top_passages(self, text, query, top_k):
+        """Sorguyla en ilgili top_k parçayı belgedeki sırasıyla, örtüşenleri birleştirerek döndürür"""
+        scores = self.scores(query)
+        if not len(scores) or not scores.max() > 0:
+            # Sorgu terimleri belgede geçmiyorsa belgenin başı kullanılır
+            selected = list(range(min(top_k, len(self.spans))))
+        else:
+            # Eşit puanlarda önceki parça seçilir (aynı girdi her zaman aynı sonucu verir)
+            ranked = np.lexsort((np.arange(len(scores)), -scores))
+            selected = sorted(int(i) for i in ranked[:top_k] if scores[i] > 0)
+
+        passages = []
+        current_start, current_end = None, None
+        for index in selected:
+            start, end = self.spans[index]
+            if current_end is not None and start <= current_end:
+                current_end = max(current_end, end)
+                continue
+            if current_end is not None:
+                passages.append(text[current_start:current_end])
+            current_start, current_end = start, end
+        if current_end is not None:
+            passages.append(text[current_start:current_end])
+        return passages
+
+    def save(self, path):
+        """Dizini (metin olmadan) sıkıştırılmış .npz dosyasına yazar"""
+        vocabulary = sorted(self.vocabulary, key=self.vocabulary.get)
+        temp_path = f"{path}.{threading.get_ident()}.tmp.npz"
+        np.savez_compressed(
+            temp_path,
+            spans=np.array(self.spans, dtype=np.int64).reshape(-1, 2),
+            vocabulary=np.array(vocabulary, dtype=str),
+            doc_ids=self.doc_ids, term_ids=self.term_ids, term_freqs=self.term_freqs,
+            doc_lengths=self.doc_lengths
+        )
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            vocabulary = {term: i for i, term in enumerate(data["vocabulary"].tolist())}
+            return cls(
+                [tuple(span) for span in data["spans"].tolist()], vocabulary,
+                data["doc_ids"], data["term_ids"], data["term_freqs"], data["doc_lengths"]
+            )
+
+
+class ReferenceRetriever:
+    """Referans metinler için dizinleri metin özetine göre bellekte ve diskte önbelleğe alır"""
+
+    MEMORY_ENTRIES = 4
+    DISK_ENTRIES = 50
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def text_hash(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def get_index(self, text):
+        """Metnin dizinini önbellekten döndürür, yoksa oluşturup kaydeder"""
+        key = self.text_hash(text)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+                return index
+
+            path = os.path.join(self.cache_dir, f"{key}.npz")
+            index = None
+            if os.path.exists(path):
+                try:
+                    index = ReferenceIndex.load(path)
+                    os.utime(path, None)
+                except Exception as e:
+                    print(f"Referans dizini okunamadı, yeniden oluşturuluyor: {e}")
+
+            if index is None:
+                index = ReferenceIndex.build(text)
+                try:
+                    index.save(path)
+                    self._prune()
+                except Exception as e:
+                    print(f"Referans dizini kaydedilemedi: {e}")
+                print(f"Referans dizini oluşturuldu: {len(index.spans)} parça, {len(index.vocabulary)} terim")
+
+            self._indexes[key] = index
+            while len(self._indexes) > self.MEMORY_ENTRIES:
+                self._indexes.popitem(last=False)
+            return index
+
+    def _prune(self):
+        """Diskte DISK_ENTRIES'ten fazla dizin varsa en uzun süredir kullanılmayanları siler"""
+        paths = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith(".npz")]
+        if len(paths) <= self.DISK_ENTRIES:
+            return
+        paths.sort(key=os.path.getmtime)
+        for path in paths[:len(paths) - self.DISK_ENTRIES]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def retrieve(self, text, query, top_k):
+        """Referans metinden sorguyla ilgili bölümleri seçip birleştirir"""
+        passages = self.get_index(text).top_passages(text, query, top_k)
+        return f"\n\n{OMISSION_MARKER}\n\n".join(passage.strip() for passage in passages)
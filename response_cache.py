@@ -0,0 +1,76 @@
+"""
+Yapay Zeka Yanıtları İçin Kalıcı Önbellek
+"""
+
+import os
+import threading
+import time
+
+from transcription_cache import TranscriptionCache
+from jobs import CANCEL_POLL_INTERVAL
+
+
+class InFlightRequest:
+    """Devam eden bir isteğin sonucunu aynı isteği bekleyenlerle paylaşır"""
+
+    def __init__(self):
+        self._done = threading.Event()
+        self.text = None
+
+    def finish(self, text):
+        self.text = text
+        self._done.set()
+
+    def wait(self, cancel_token=None):
+        """İstek bitene kadar bekler; başarısız olduysa None döndürür"""
+        while not self._done.wait(CANCEL_POLL_INTERVAL):
+            if cancel_token is not None:
+                cancel_token.check()
+        return self.text
+
+
+class ResponseCache(TranscriptionCache):
+    """Yanıtları (sağlayıcı, model, istem, üretim parametreleri) özetiyle diskte saklar
+
+    Kayıtlar ttl_hours saat sonra geçersiz sayılır ve okunurken silinir; toplam boyut sınırı
+    TranscriptionCache ile aynı şekilde en uzun süredir kullanılmayanlar silinerek korunur.
+    Aynı anahtar için aynı anda gelen istekler begin() ile tek bir API çağrısında birleştirilir.
+    """
+
+    LABEL = "Yanıt"
+
+    def __init__(self, cache_dir, max_bytes, ttl_hours=168):
+        super().__init__(cache_dir, max_bytes)
+        self.ttl_seconds = ttl_hours * 3600
+        self._in_flight = {}
+        self._flight_lock = threading.Lock()
+
+    def get_entry(self, key):
+        entry = super().get_entry(key)
+        if entry and self.ttl_seconds > 0 and time.time() - entry.get("created", 0) > self.ttl_seconds:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            return None
+        return entry
+
+    def begin(self, key):
+        """(lider_mi, InFlightRequest) döndürür
+
+        Lider isteği yapar ve sonunda end() çağırır; diğerleri InFlightRequest.wait() ile sonucu bekler.
+        """
+        with self._flight_lock:
+            flight = self._in_flight.get(key)
+            if flight is not None:
+                return False, flight
+            flight = InFlightRequest()
+            self._in_flight[key] = flight
+            return True, flight
+
+    def end(self, key, flight, text):
+        """Lider isteği tamamlar; text None ise bekleyenler isteği kendileri yeniden dener"""
+        with self._flight_lock:
+            if self._in_flight.get(key) is flight:
+                del self._in_flight[key]
+        flight.finish(text)
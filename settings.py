@@ -2,6 +2,9 @@ import tkinter as tk
 import customtkinter as ctk
 from tkinter import messagebox
 
+from asr_backends import ASR_BACKENDS
+from model_manager import WHISPER_MODEL_SIZES
+
 class SettingsWindow(ctk.CTkToplevel):
     def __init__(self, parent):
         super().__init__(parent)
@@ -113,7 +116,7 @@ class SettingsWindow(ctk.CTkToplevel):
         self.speech_engine_var = tk.StringVar()
         self.speech_engine_combobox = ctk.CTkComboBox(
             self.inner_settings_frame,
-            values=["Whisper", "Google Speech"],
+            values=list(ASR_BACKENDS.keys()),
             variable=self.speech_engine_var,
             width=250
         )
@@ -121,6 +124,33 @@ class SettingsWindow(ctk.CTkToplevel):
         
         current_row += 1
         
+        # Whisper Modeli (büyük modeller daha doğru ama daha yavaş ve bellek yoğun)
+        self.whisper_model_label = ctk.CTkLabel(self.inner_settings_frame, text="Whisper Modeli:")
+        self.whisper_model_label.grid(row=current_row, column=0, sticky="w", padx=5, pady=5)
+        
+        self.whisper_model_var = tk.StringVar()
+        self.whisper_model_combobox = ctk.CTkComboBox(
+            self.inner_settings_frame,
+            values=WHISPER_MODEL_SIZES,
+            variable=self.whisper_model_var,
+            width=250,
+            state="readonly"
+        )
+        self.whisper_model_combobox.grid(row=current_row, column=1, sticky="ew", padx=5, pady=5)
+        
+        current_row += 1
+        
+        # Kayıt oturumu: yeni kayıt önceki kaydın sonuna eklenir, önceki kısım yeniden tanınmaz
+        self.continue_session_var = tk.BooleanVar(value=False)
+        self.continue_session_check = ctk.CTkCheckBox(
+            self.inner_settings_frame,
+            text="Yeni kaydı önceki kaydın sonuna ekle",
+            variable=self.continue_session_var
+        )
+        self.continue_session_check.grid(row=current_row, column=0, columnspan=2, sticky="w", padx=5, pady=5)
+        
+        current_row += 1
+        
         # 4. Dil
         self.language_label = ctk.CTkLabel(self.inner_settings_frame, text="Dil:")
         self.language_label.grid(row=current_row, column=0, sticky="w", padx=5, pady=5)
@@ -321,6 +351,8 @@ class SettingsWindow(ctk.CTkToplevel):
         
         # Ses tanıma motoru
         self.speech_engine_var.set(config.speech_recognition_engine)
+        self.whisper_model_var.set(config.whisper_model_size)
+        self.continue_session_var.set(config.continue_recording_session)
         
         # Dil
         self.language_var.set(config.language)
@@ -353,6 +385,8 @@ class SettingsWindow(ctk.CTkToplevel):
                 self.parent.config.api_keys[provider] = self.api_key_var.get()
             
             self.parent.config.speech_recognition_engine = self.speech_engine_var.get()
+            self.parent.config.whisper_model_size = self.whisper_model_var.get()
+            self.parent.config.continue_recording_session = self.continue_session_var.get()
             self.parent.config.language = self.language_var.get()
             
             # YENİ: Tema ve yazı tipi ayarlarını kaydet
@@ -373,12 +407,9 @@ class SettingsWindow(ctk.CTkToplevel):
               # Ayarları kaydet
             self.parent.config.save_settings()
             
-            # AI servisini tamamen yeniden başlat
-            self.parent.ai_service.current_client = None
-            # Önceki sağlayıcı önbelleğini temizle
-            provider = self.parent.config.get_current_provider()
-            if provider in self.parent.ai_service._provider_clients:
-                self.parent.ai_service._provider_clients[provider] = None
+            # İstemci havuzu model ve anahtara göre ayrıldığından istemciler atılmaz;
+            # yeni seçim için istemci ve bağlantı arka planda hazırlanır
+            self.parent.ai_service.prewarm()
             
             # YENİ: Tema ve yazı tipi değişikliklerini uygula
             self.parent.apply_theme_settings()
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from audio_dsp import StreamingSegmenter, vad_segments
+
+SAMPLE_RATE = 16000
+
+
+def _noise(seconds, level, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(int(seconds * SAMPLE_RATE)) * level).astype(np.float32)
+
+
+def _tone(seconds, amplitude=0.3, frequency=220.0):
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+@pytest.mark.parametrize("level", [0.001, 0.003, 0.01])
+def test_vad_segments_noise_only_returns_nothing(level):
+    assert vad_segments(_noise(20, level), SAMPLE_RATE) == []
+
+
+@pytest.mark.parametrize("level", [0.003, 0.01])
+def test_vad_segments_finds_speech_over_noise(level):
+    samples = _noise(12, level)
+    samples[4 * SAMPLE_RATE:7 * SAMPLE_RATE] += _tone(3)
+
+    segments = vad_segments(samples, SAMPLE_RATE)
+
+    assert len(segments) == 1
+    start, end = segments[0]
+    assert abs(start - 4 * SAMPLE_RATE) < 0.3 * SAMPLE_RATE
+    assert abs(end - 7 * SAMPLE_RATE) < 0.3 * SAMPLE_RATE
+
+
+def _stream(segmenter, samples, block_s=0.1):
+    block = int(block_s * SAMPLE_RATE)
+    segments = []
+    for start in range(0, len(samples), block):
+        segments.extend(segmenter.push(samples[start:start + block]))
+    last = segmenter.flush()
+    if last is not None:
+        segments.append(last)
+    return segments
+
+
+@pytest.mark.parametrize("level", [0.001, 0.003, 0.01])
+def test_streaming_segmenter_long_silence_does_not_emit_noise(level):
+    # Uzun sessizlikte pencerede yalnızca gürültü kalır; eşik gürültünün altına inmemeli
+    samples = _noise(72, level)
+    samples[1 * SAMPLE_RATE:6 * SAMPLE_RATE] += _tone(5)
+    samples[66 * SAMPLE_RATE:71 * SAMPLE_RATE] += _tone(5)
+
+    segments = _stream(StreamingSegmenter(SAMPLE_RATE), samples)
+
+    assert len(segments) == 2
+    for segment in segments:
+        assert 4.5 * SAMPLE_RATE < len(segment) < 6 * SAMPLE_RATE
+
+
+@pytest.mark.parametrize("level", [0.001, 0.01])
+def test_streaming_segmenter_noise_only_returns_nothing(level):
+    assert _stream(StreamingSegmenter(SAMPLE_RATE), _noise(30, level)) == []
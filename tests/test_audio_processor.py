@@ -0,0 +1,47 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from audio_processor import AudioProcessor
+from jobs import CancellationToken, JobCancelled
+
+
+class SlowBackend:
+    name = "Whisper"
+    model_id = "test"
+    supports_batching = False
+    parallelism = "thread"
+
+    def is_available(self):
+        return True
+
+    def transcribe(self, segment, calibration=None):
+        time.sleep(0.05)
+        return "metin"
+
+
+def _processor(workers):
+    processor = AudioProcessor.__new__(AudioProcessor)
+    processor.config = SimpleNamespace(
+        speech_recognition_engine="Whisper",
+        asr_fallback_order=["Whisper"],
+        transcription_workers=workers
+    )
+    processor.backends = {"Whisper": SlowBackend()}
+    return processor
+
+
+def test_cancel_during_pooled_transcription_raises_job_cancelled():
+    segments = [np.zeros(1600, dtype=np.float32) for _ in range(20)]
+    cancel_token = CancellationToken()
+    timer = threading.Timer(0.15, cancel_token.cancel)
+    timer.start()
+    try:
+        with pytest.raises(JobCancelled):
+            for _ in _processor(2)._transcribe_segments(segments, cancel_token):
+                pass
+    finally:
+        timer.cancel()
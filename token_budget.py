@@ -0,0 +1,174 @@
+"""
+İstem Token Bütçesi - istek gönderilmeden önce token sayımı, referans metni kırpma ve maliyet tahmini
+"""
+
+import re
+import threading
+
+# Token sayımı için modele özel kodlayıcı bulunamazsa kullanılan tiktoken kodlaması
+DEFAULT_ENCODING = "cl100k_base"
+
+# OpenAI dışındaki sağlayıcıların tokenlaştırıcısı yerel olarak bulunmadığından tahmin bu oranla büyütülür
+ESTIMATE_MARGIN = {"OpenAI": 1.0, "Anthropic": 1.15, "Google": 1.15}
+
+# tiktoken yoksa yaklaşık karakter/token oranı
+CHARS_PER_TOKEN = 3.0
+
+# Referans metinden seçilen bölümler arasına konan atlama işareti (ayrı bir paragraf olarak)
+OMISSION_MARKER = "[...]"
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+_tiktoken_missing = False
+
+
+def _get_encoding(provider, model_name):
+    """Model için tiktoken kodlayıcısını döndürür; tiktoken yüklü değilse None"""
+    global _tiktoken_missing
+    if _tiktoken_missing:
+        return None
+
+    name = model_name if provider == "OpenAI" else DEFAULT_ENCODING
+    with _encodings_lock:
+        if name in _encodings:
+            return _encodings[name]
+        try:
+            import tiktoken
+        except ImportError:
+            print("tiktoken modülü yüklü değil, token sayısı karakter sayısından tahmin edilecek")
+            _tiktoken_missing = True
+            return None
+
+        try:
+            encoding = tiktoken.encoding_for_model(name) if provider == "OpenAI" else tiktoken.get_encoding(name)
+        except KeyError:
+            encoding = tiktoken.get_encoding(DEFAULT_ENCODING)
+        _encodings[name] = encoding
+        return encoding
+
+
+class TokenCounter:
+    """Seçili sağlayıcı ve model için metnin token sayısını hesaplar veya tahmin eder"""
+
+    def __init__(self, provider, model_name):
+        self.provider = provider
+        self.margin = ESTIMATE_MARGIN.get(provider, 1.15)
+        self._encoding = _get_encoding(provider, model_name)
+
+    @property
+    def exact(self):
+        """Sayım modelin kendi tokenlaştırıcısıyla yapılıyorsa True"""
+        return self._encoding is not None and self.provider == "OpenAI"
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self._encoding is None:
+            return int(len(text) / CHARS_PER_TOKEN * self.margin) + 1
+        return int(len(self._encoding.encode(text, disallowed_special=())) * self.margin + 0.5)
+
+    def truncate(self, text, max_tokens):
+        """Metnin en fazla max_tokens token tutan baş kısmını döndürür"""
+        if max_tokens <= 0:
+            return ""
+        if self._encoding is None:
+            return text[:int(max_tokens / self.margin * CHARS_PER_TOKEN)]
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return self._encoding.decode(tokens[:int(max_tokens / self.margin)])
+
+
+class PromptBudget:
+    """Bir istek için token bütçesinin özeti"""
+
+    def __init__(self, model_info, input_tokens, output_tokens, context_tokens, exact,
+                 reference_tokens=0, original_reference_tokens=0):
+        self.model_name = model_info["name"]
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.context_tokens = context_tokens
+        self.exact = exact
+        self.reference_tokens = reference_tokens
+        self.original_reference_tokens = original_reference_tokens
+
+        # Fiyatlar 1 milyon token başına USD; çıktı için ayrılan bütçenin tamamı kullanılmış sayılır
+        input_price = model_info.get("input_price")
+        output_price = model_info.get("output_price")
+        if input_price is None or output_price is None:
+            self.max_cost = None
+        else:
+            self.max_cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+
+    @property
+    def trimmed(self):
+        return self.reference_tokens < self.original_reference_tokens
+
+    def describe(self):
+        """Kullanıcıya gösterilecek kısa özet"""
+        prefix = "" if self.exact else "~"
+        text = f"{prefix}{self.input_tokens} token girdi, {self.output_tokens} token çıktı payı"
+        if self.max_cost is not None:
+            text += f", en fazla ~${self.max_cost:.3f}"
+        if self.trimmed:
+            text += f" (referans {self.original_reference_tokens} → {self.reference_tokens} token kırpıldı)"
+        return text
+
+
+def output_budget(model_info):
+    """Yanıt için ayrılan token sayısı (bağlamın yarısını geçmez)"""
+    context = model_info.get("max_tokens", 4096)
+    return min(model_info.get("output_tokens", 4096), context // 2)
+
+
+def _paragraphs(text):
+    """Metni boşlukları sadeleştirilmiş, tekrarları atılmış paragraflara böler (sıra korunur)
+
+    Bölümler arasındaki atlama işaretleri tekrar sayılmaz; her biri yerinde kalır.
+    """
+    seen = set()
+    paragraphs = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = re.sub(r"[ \t]+", " ", paragraph).strip()
+        if paragraph == OMISSION_MARKER:
+            # Art arda veya başta kalan işaretler bir şey ayırmaz
+            if paragraphs and paragraphs[-1] != OMISSION_MARKER:
+                paragraphs.append(paragraph)
+        elif paragraph and paragraph not in seen:
+            seen.add(paragraph)
+            paragraphs.append(paragraph)
+    return paragraphs
+
+
+def fit_reference(reference, budget_tokens, counter):
+    """Referans metni token bütçesine sığacak şekilde kırpar
+
+    Öncelik sırası sabittir, aynı girdi her zaman aynı sonucu verir:
+    1. Fazla boşluklar ve birebir tekrarlanan paragraflar atılır (içerik kaybı yok).
+    2. Paragraflar belgedeki sırayla, bütçe dolana kadar eklenir.
+    3. Sığmayan ilk paragraf son tam cümlesine kadar kısaltılır; sonraki paragraflar atılır.
+    """
+    if not reference or counter.count(reference) <= budget_tokens:
+        return reference
+
+    kept = []
+    used = 0
+    separator_tokens = counter.count("\n\n")
+    for paragraph in _paragraphs(reference):
+        tokens = counter.count(paragraph) + (separator_tokens if kept else 0)
+        if used + tokens <= budget_tokens:
+            kept.append(paragraph)
+            used += tokens
+            continue
+
+        remaining = budget_tokens - used - (separator_tokens if kept else 0)
+        partial = counter.truncate(paragraph, remaining)
+        sentence_end = max(partial.rfind(". "), partial.rfind(".\n"))
+        if sentence_end > 0:
+            partial = partial[:sentence_end + 1]
+        if partial.strip():
+            kept.append(partial.strip())
+        break
+
+    # Sonda kalan atlama işareti ardından bir bölüm gelmediği için atılır
+    while kept and kept[-1] == OMISSION_MARKER:
+        kept.pop()
+    return "\n\n".join(kept)
@@ -0,0 +1,236 @@
+"""
+Raporcu Toplu Transkripsiyon (Komut Satırı)
+
+Bir dizindeki (alt dizinler dahil) tüm ses dosyalarını arayüz açmadan metne dönüştürür ve
+her dosyanın yanına uzantısı dahil aynı adla .txt ve .json transkript yazar (a.wav -> a.wav.txt).
+Çıktıları girdiden yeni olan ve aynı motor/model/dil ile üretilmiş dosyalar atlanır. Sonunda
+toplam ses süresi ve işleme hızı özetlenir.
+
+Ayarlar (motor, model, parçalama, önbellek...) uygulamanın settings.json dosyasından okunur;
+--engine ve --language yalnızca bu çalıştırma için geçersiz kılar, ayarlar kaydedilmez.
+
+Kullanım:
+    python transcribe_cli.py kayitlar/
+    python transcribe_cli.py kayitlar/ --workers 4 --engine "Faster Whisper"
+    python transcribe_cli.py kayitlar/ --formats txt --force
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+from datetime import datetime
+from types import SimpleNamespace
+
+from config import Config
+from audio_processor import AudioProcessor
+from audio_io import probe_audio
+from asr_backends import ASR_BACKENDS
+
+# Arayüzdeki "Ses Dosyası Yükle" penceresiyle aynı uzantılar
+AUDIO_EXTENSIONS = [".wav", ".mp3", ".ogg", ".m4a"]
+OUTPUT_FORMATS = ["txt", "json"]
+
+# İşçi süreçte bir kez oluşturulan ses işleyici
+_processor = None
+
+
+def create_processor(engine=None, language=None, nested_workers=True, processes=1):
+    """Ayarları yükleyip arayüzsüz bir AudioProcessor oluşturur
+
+    processes: aynı anda model çalıştıran işçi süreç sayısı; bellek ve çekirdekler bu sayıya bölünür
+    """
+    config = Config(async_load=False)
+    if engine:
+        config.speech_recognition_engine = engine
+    if language:
+        config.language = language
+    # Dosyalar tek tek işlendiğinden kayıt ve canlı tanıma kullanılmaz
+    config.live_transcription = False
+    config.continue_recording_session = False
+    if not nested_workers:
+        # Süreç havuzu işçileri kendi alt süreçlerini başlatamaz; parça tanıma sıralı yapılır
+        config.transcription_workers = 1
+    config.concurrent_processes = processes
+    return AudioProcessor(SimpleNamespace(config=config))
+
+
+def transcript_identity(processor):
+    """Transkripti etkileyen motor, model ve dil bilgisi"""
+    engine, model, language = processor._cache_identity()
+    return {"engine": engine, "model": model, "language": language}
+
+
+def _worker_init(engine, language, processes):
+    global _processor
+    # Çekirdekleri işçiler arasında paylaştır, aşırı thread oluşumunu önle
+    try:
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // processes))
+    except Exception:
+        pass
+    _processor = create_processor(engine, language, nested_workers=False, processes=processes)
+
+
+def _worker_transcribe(path):
+    return transcribe_file(_processor, path)
+
+
+def transcribe_file(processor, path):
+    """Tek bir dosyayı metne dönüştürür; (yol, metin, süre, hata) döndürür"""
+    start = time.time()
+    try:
+        text = processor.process_audio_file(path)
+        error = None if text else "Ses tanıma başarısız oldu"
+    except Exception as e:
+        text, error = None, str(e)
+    return path, text, time.time() - start, error
+
+
+def find_audio_files(root, extensions, recursive=True):
+    """Dizindeki desteklenen ses dosyalarını sıralı olarak döndürür"""
+    found = []
+    for directory, subdirs, files in os.walk(root):
+        subdirs.sort()
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in extensions:
+                found.append(os.path.join(directory, name))
+        if not recursive:
+            break
+    return found
+
+
+def output_paths(path, formats):
+    """Çıktı yolları; uzantı korunur (a.wav -> a.wav.txt) ki aynı adlı a.wav ve a.mp3 çakışmasın"""
+    return {fmt: f"{path}.{fmt}" for fmt in formats}
+
+
+def is_up_to_date(path, formats, identity):
+    """Tüm çıktılar girdiden yeni ve JSON'daki motor/model/dil güncel ayarlarla aynıysa True"""
+    source_mtime = os.path.getmtime(path)
+    outputs = output_paths(path, formats)
+    for output in outputs.values():
+        if not os.path.exists(output) or os.path.getmtime(output) < source_mtime:
+            return False
+
+    if "json" in outputs:
+        try:
+            with open(outputs["json"], 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if any(previous.get(key) != value for key, value in identity.items()):
+            return False
+    return True
+
+
+def write_outputs(path, text, formats, identity, duration, elapsed):
+    """Transkripti girdinin yanına .txt ve/veya .json olarak yazar"""
+    outputs = output_paths(path, formats)
+    if "txt" in outputs:
+        with open(outputs["txt"], 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+    if "json" in outputs:
+        with open(outputs["json"], 'w', encoding='utf-8') as f:
+            json.dump({
+                "source": os.path.basename(path),
+                "text": text,
+                **identity,
+                "duration_s": round(duration, 2) if duration else None,
+                "processing_s": round(elapsed, 2),
+                "created": datetime.now().isoformat(timespec="seconds"),
+            }, f, ensure_ascii=False, indent=2)
+
+
+def audio_duration(path):
+    info = probe_audio(path)
+    return info[2] if info else 0.0
+
+
+def format_seconds(seconds):
+    """3725 -> 1:02:05"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Raporcu toplu ses transkripsiyonu")
+    parser.add_argument("directory", help="Ses dosyalarının bulunduğu dizin")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Aynı anda işlenecek dosya sayısı (her işçi modeli ayrı yükler)")
+    parser.add_argument("--engine", choices=list(ASR_BACKENDS.keys()), default=None,
+                        help="Ayarlardaki ses tanıma motorunu geçersiz kılar")
+    parser.add_argument("--language", choices=["Türkçe", "İngilizce"], default=None,
+                        help="Ayarlardaki dili geçersiz kılar")
+    parser.add_argument("--formats", nargs="+", choices=OUTPUT_FORMATS, default=OUTPUT_FORMATS,
+                        help="Yazılacak transkript biçimleri")
+    parser.add_argument("--extensions", nargs="+", default=AUDIO_EXTENSIONS,
+                        help="İşlenecek dosya uzantıları")
+    parser.add_argument("--no-recursive", action="store_true", help="Alt dizinlere inme")
+    parser.add_argument("--force", action="store_true", help="Güncel çıktısı olan dosyaları da yeniden işle")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Dizin bulunamadı: {args.directory}")
+
+    extensions = {ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in args.extensions}
+    files = find_audio_files(args.directory, extensions, recursive=not args.no_recursive)
+
+    # Ana süreçteki işleyici kimlik bilgisi için (ve tek işçide tanıma için) kullanılır; model ilk tanımada yüklenir
+    processor = create_processor(args.engine, args.language)
+    identity = transcript_identity(processor)
+
+    pending = [path for path in files if args.force or not is_up_to_date(path, args.formats, identity)]
+    skipped = len(files) - len(pending)
+    print(f"{len(files)} ses dosyası bulundu, {skipped} dosyanın çıktısı güncel, {len(pending)} dosya işlenecek "
+          f"({identity['engine']}, {identity['model']}, {identity['language']})", flush=True)
+
+    durations = {path: audio_duration(path) for path in pending}
+    done, failed = [], []
+    start = time.time()
+
+    def handle(result, index):
+        path, text, elapsed, error = result
+        name = os.path.relpath(path, args.directory)
+        if error:
+            failed.append(path)
+            print(f"[{index}/{len(pending)}] HATA {name}: {error}", flush=True)
+            return
+        write_outputs(path, text, args.formats, identity, durations[path], elapsed)
+        done.append(path)
+        speed = durations[path] / elapsed if elapsed else 0.0
+        print(f"[{index}/{len(pending)}] {name}: {format_seconds(durations[path])} ses, "
+              f"{elapsed:.1f} sn ({speed:.1f}x)", flush=True)
+
+    try:
+        if args.workers <= 1 or len(pending) <= 1:
+            for index, path in enumerate(pending, 1):
+                handle(transcribe_file(processor, path), index)
+        else:
+            # Her işçi süreç kendi modelini bir kez yükler ve sıradaki dosyaları alır
+            context = multiprocessing.get_context("spawn")
+            with context.Pool(processes=args.workers, initializer=_worker_init,
+                              initargs=(args.engine, args.language, args.workers)) as pool:
+                for index, result in enumerate(pool.imap_unordered(_worker_transcribe, pending), 1):
+                    handle(result, index)
+    except KeyboardInterrupt:
+        print("\nİptal edildi", flush=True)
+
+    wall = time.time() - start
+    audio_seconds = sum(durations[path] for path in done)
+    print("\nÖzet:")
+    print(f"  İşlenen: {len(done)}, atlanan: {skipped}, başarısız: {len(failed)}")
+    print(f"  Toplam ses: {format_seconds(audio_seconds)}, geçen süre: {format_seconds(wall)}")
+    if wall > 0 and done:
+        print(f"  Hız: {audio_seconds / wall:.1f}x gerçek zaman, {len(done) / wall * 3600:.0f} dosya/saat")
+    for path in failed:
+        print(f"  Başarısız: {os.path.relpath(path, args.directory)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Ses İçeriğine Göre Anahtarlanan Kalıcı Transkripsiyon Önbelleği
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+
+import numpy as np
+
+
+class TranscriptionCache:
+    """Transkripsiyon sonuçlarını diskte saklar; toplam boyut sınırı aşılınca en eski kullanılanları siler
+
+    Her kayıt ayrı bir JSON dosyasıdır. Son kullanım zamanı dosyanın değiştirilme zamanında
+    tutulur, böylece LRU sırası için ayrı bir dizin dosyası gerekmez.
+    """
+
+    # Günlük mesajlarında kullanılan önbellek adı
+    LABEL = "Transkripsiyon"
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes = None  # İlk yazmada hesaplanır
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def audio_hash(samples):
+        """NumPy ses dizisinin içerik özetini döndürür"""
+        return hashlib.sha256(memoryview(np.ascontiguousarray(samples)).cast('B')).hexdigest()
+
+    @staticmethod
+    def file_hash(file_path, block_size=1024 * 1024):
+        """Dosyanın ham içeriğinin özetini bloklar halinde okuyarak hesaplar"""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(block_size), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(*parts):
+        """Anahtar bileşenlerinden (içerik özeti, motor, model, dil...) tek bir anahtar üretir"""
+        return hashlib.sha256("|".join(str(part) for part in parts).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """Önbellekteki metni döndürür, yoksa None"""
+        entry = self.get_entry(key)
+        return entry.get("text") if entry else None
+
+    def get_entry(self, key):
+        """Önbellek kaydının tamamını (metin ve ek bilgiler) döndürür, yoksa None"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # LRU için son kullanım zamanını güncelle
+            os.utime(path, None)
+            return entry
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Önbellek kaydı okunamadı ({key[:12]}): {e}")
+            return None
+
+    def put(self, key, text, **metadata):
+        """Metni önbelleğe yazar (yarım kalmış yazımlar okunmasın diye geçici dosya üzerinden)"""
+        if text is None:
+            return
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({"text": text, "created": time.time(), **metadata}, f, ensure_ascii=False)
+
+            previous_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(temp_path, path)
+            self._account(os.path.getsize(path) - previous_size)
+        except Exception as e:
+            print(f"Önbelleğe yazılamadı ({key[:12]}): {e}")
+
+    def _account(self, delta):
+        """Toplam boyutu günceller, sınır aşıldıysa en eski kayıtları siler"""
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += delta
+
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """(yol, boyut, son kullanım) üçlülerini döndürür"""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    entries.append((path, stat.st_size, stat.st_mtime))
+                except OSError:
+                    continue
+        return entries
+
+    def _evict(self):
+        """Toplam boyut sınırın %90'ının altına inene kadar en uzun süredir kullanılmayanları siler"""
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        removed = 0
+
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                continue
+
+        self._total_bytes = total
+        if removed:
+            print(f"{self.LABEL} önbelleğinden {removed} eski kayıt silindi")
+
+
+class PrefixMatch:
+    """Yeni dosyanın önceden tanınmış başlangıç kısmı
+
+    known_bytes: transkripsiyonu bilinen ham PCM uzunluğu, text: bu kısmın metni,
+    segments: bu kısımdaki parçalar ({"start", "end", "text"}, saniye cinsinden)
+    """
+
+    def __init__(self, key, known_bytes, text, segments, checkpoints, digest):
+        self.key = key
+        self.known_bytes = known_bytes
+        self.text = text
+        self.segments = segments
+        self.checkpoints = checkpoints
+        self.digest = digest
+
+    def text_at(self, byte_offset):
+        """Tam olarak byte_offset noktasındaki kontrol noktasının metni, yoksa None"""
+        for checkpoint in self.checkpoints:
+            if checkpoint["bytes"] == byte_offset:
+                return checkpoint["text"]
+        return None
+
+
+class TranscriptPrefixIndex:
+    """Uzayan kayıtlar için transkripsiyonları kontrol noktalarıyla saklar
+
+    Kayıt, çözülmüş ham PCM verisinin ilk HEAD_SECONDS saniyesinin özetiyle anahtarlanır ve
+    her işlemin sonunda (bayt uzunluğu, baştan o noktaya kadar özet, o noktaya kadarki metin)
+    kontrol noktası ekler. Aynı başlangıca sahip daha uzun bir dosyada en uzun eşleşen
+    kontrol noktasına kadar olan metin yeniden kullanılır; yalnızca sonrası tanınır.
+    """
+
+    HEAD_SECONDS = 2.0
+    MAX_CHECKPOINTS = 32
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def _key(self, raw, audio_format, identity):
+        frame_rate, channels, sample_width = audio_format
+        head_bytes = int(self.HEAD_SECONDS * frame_rate) * channels * sample_width
+        head_hash = hashlib.sha256(raw[:head_bytes]).hexdigest()
+        return self.cache.make_key("prefix", head_hash, *audio_format, *identity)
+
+    def match(self, raw, audio_format, identity):
+        """raw ile başlayan en uzun bilinen kısmı döndürür
+
+        Eşleşme yoksa known_bytes=0 olan boş bir PrefixMatch döner; update() ile kayıt oluşturulur.
+        """
+        raw = memoryview(raw).cast('B')
+        key = self._key(raw, audio_format, identity)
+        entry = self.cache.get_entry(key) or {}
+
+        digest = hashlib.sha256()
+        position = 0
+        best = {"bytes": 0, "text": ""}
+        matched = []
+        for checkpoint in sorted(entry.get("checkpoints", []), key=lambda cp: cp["bytes"]):
+            if checkpoint["bytes"] > len(raw):
+                break
+            candidate = digest.copy()
+            candidate.update(raw[position:checkpoint["bytes"]])
+            if candidate.hexdigest() != checkpoint["hash"]:
+                # Farklı bir devamın kontrol noktaları; sonrakiler de eşleşmez
+                break
+            digest, position, best = candidate, checkpoint["bytes"], checkpoint
+            matched.append(checkpoint)
+
+        frame_rate, channels, sample_width = audio_format
+        known_seconds = best["bytes"] / (frame_rate * channels * sample_width)
+        segments = [segment for segment in entry.get("segments", []) if segment["end"] <= known_seconds + 1e-3]
+        return PrefixMatch(key, best["bytes"], best["text"], segments, matched, digest)
+
+    def update(self, prefix, raw, audio_format, new_segments, identity):
+        """Dosyanın tamamı için kontrol noktası ekler
+
+        new_segments: bilinen kısımdan sonra tanınan parçalar (dosya başına göre saniye)
+        """
+        raw = memoryview(raw).cast('B')
+        digest = prefix.digest.copy()
+        digest.update(raw[prefix.known_bytes:])
+
+        segments = prefix.segments + [segment for segment in new_segments if segment.get("text")]
+        text = " ".join(part for part in [prefix.text] + [segment["text"] for segment in new_segments] if part)
+        checkpoints = prefix.checkpoints + [{"bytes": len(raw), "hash": digest.hexdigest(), "text": text}]
+        if len(checkpoints) > self.MAX_CHECKPOINTS:
+            checkpoints = checkpoints[-self.MAX_CHECKPOINTS:]
+
+        self.cache.put(
+            prefix.key, text,
+            checkpoints=checkpoints, segments=segments,
+            engine=identity[0], model=identity[1], language=identity[2]
+        )
+        return text